@@ -3,6 +3,7 @@ from flask_restx import Api
 from .config import Config
 
 def create_app():
+    Config.create_directories()
     app = Flask(__name__)
     app.config.from_object(Config)
     app.config['SWAGGER_UI_DOC_EXPANSION'] = 'list'
@@ -55,11 +56,13 @@ def create_app():
     from .controllers.anomaly_controller import api as anomaly_ns, anomaly_bp
     from .controllers.validation_controller import validation_bp, api as validation_api
     from .controllers.home_controller import home_bp
+    from .controllers.export_controller import api as export_ns
 
     # Register REST API namespaces
     api.add_namespace(rulebook_ns)
     api.add_namespace(anomaly_ns)
     api.add_namespace(validation_api)
+    api.add_namespace(export_ns)
 
     # Register template rendering blueprints
     app.register_blueprint(home_bp)  # Register home blueprint first (root route)
@@ -69,4 +72,10 @@ def create_app():
     
     # Initialize API with app
     api.init_app(app)
+
+    # Register maintenance commands
+    from .cli import rule_cache_cli, catalog_cli, model_cli
+    app.cli.add_command(rule_cache_cli)
+    app.cli.add_command(catalog_cli)
+    app.cli.add_command(model_cli)
     return app 
\ No newline at end of file
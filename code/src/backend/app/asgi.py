@@ -0,0 +1,83 @@
+"""ASGI deployment mode.
+
+Rulebook uploads are served natively on the event loop: the PDF is saved in a
+thread and rule generation runs as a task awaiting Gemini, so one process can
+hold hundreds of ingestions in flight. Every other route is the Flask app,
+run on ASGI_WSGI_THREADS threads beside the loop, which keeps CPU-bound
+validation and scoring off it.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5001 --workers 4
+"""
+import asyncio
+from datetime import datetime
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import FileStorage
+from . import create_app
+from .config import Config
+from .services.registry import get_job_service, get_rulebook_service
+from .utils.file_handler import is_pdf
+from .utils.serialization import dumps
+from .utils.upload import UploadTooLarge
+
+
+def _json(body, status: int = 200) -> Response:
+    return Response(dumps(body), status_code=status, media_type='application/json')
+
+
+async def upload_rulebook(request: Request) -> Response:
+    """Upload a new regulatory rulebook PDF file (the async twin of RulebookUpload.post)"""
+    if int(request.headers.get('content-length') or 0) > Config.MAX_CONTENT_LENGTH:
+        return _json({'message': f"File exceeds the maximum size of {Config.MAX_CONTENT_LENGTH} bytes"}, 413)
+
+    try:
+        async with request.form(max_files=1) as form:
+            upload = form.get('file')
+            rulebook_name = form.get('rulebook_name')
+
+            if not isinstance(upload, UploadFile):
+                return _json({'message': 'No file provided'}, 400)
+
+            # The rulebook service reads uploads through werkzeug's FileStorage interface
+            file = FileStorage(stream=upload.file, filename=upload.filename, content_type=upload.content_type)
+            if not await asyncio.to_thread(is_pdf, file):
+                return _json({'message': 'File must be a PDF'}, 400)
+
+            if not rulebook_name:
+                return _json({'message': 'Rulebook name is required'}, 400)
+
+            description = f"Regulatory framework for {rulebook_name}"
+            rulebook_service = await asyncio.to_thread(get_rulebook_service)
+            rulebook = await asyncio.to_thread(rulebook_service.register_rulebook, file, rulebook_name, description)
+
+        job_service = await asyncio.to_thread(get_job_service)
+        job = await job_service.submit_async('rule_generation', rulebook['uuid'],
+                                             rulebook_service.process_rulebook_async, rulebook['uuid'])
+    except UploadTooLarge as e:
+        return _json({'message': str(e)}, 413)
+    except Exception as e:
+        return _json({'message': f"Error creating rulebook: {str(e)}"}, 500)
+
+    if isinstance(rulebook.get('created_at'), datetime):
+        rulebook['created_at'] = rulebook['created_at'].isoformat()
+
+    return _json({
+        'success': True,
+        'message': 'Rulebook uploaded successfully and queued for processing',
+        'rulebook': rulebook,
+        'job': job,
+        'status_url': f"/rulebooks/jobs/{job['job_id']}"
+    }, 202)
+
+
+def create_asgi_app(flask_app=None) -> Starlette:
+    """ASGI application serving ``flask_app`` (create_app() by default) with async rulebook ingestion"""
+    flask_app = flask_app or create_app()
+    return Starlette(routes=[
+        Route('/rulebooks/upload-pdf', upload_rulebook, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=Config.ASGI_WSGI_THREADS))
+    ])
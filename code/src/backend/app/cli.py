@@ -0,0 +1,97 @@
+import click
+from flask.cli import AppGroup
+
+rule_cache_cli = AppGroup('rule-cache', help='Manage the generated rule cache.')
+
+
+@rule_cache_cli.command('warm')
+@click.argument('pdf_paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+def warm_rule_cache(pdf_paths):
+    """Generate and cache rules for the given PDF files."""
+    from .services.registry import get_rule_generator
+
+    generator = get_rule_generator()
+    for pdf_path in pdf_paths:
+        rules = generator.generate_rules_sync(pdf_path)
+        click.echo(f"{pdf_path}: {len(rules)} rules cached")
+
+
+@rule_cache_cli.command('purge')
+def purge_rule_cache():
+    """Remove every cached rule list."""
+    from .services.rule_cache import RuleGenerationCache
+
+    removed = RuleGenerationCache().purge()
+    click.echo(f"Removed {removed} cache entries")
+
+
+@rule_cache_cli.command('stats')
+def rule_cache_stats():
+    """Show rule cache size and entry count."""
+    from .services.rule_cache import RuleGenerationCache
+
+    stats = RuleGenerationCache().stats()
+    click.echo(f"{stats['entries']} entries, {stats['size_bytes']} of {stats['max_bytes']} bytes")
+
+
+catalog_cli = AppGroup('catalog', help='Manage the rulebook catalog index.')
+
+
+@catalog_cli.command('rebuild')
+def rebuild_catalog():
+    """Re-index every rulebook folder into the catalog."""
+    from .services.rulebook_catalog import RulebookCatalog
+
+    indexed = RulebookCatalog().rebuild()
+    click.echo(f"Indexed {indexed} rulebooks")
+
+
+model_cli = AppGroup('model', help='Train and publish anomaly detection models.')
+
+
+@model_cli.command('train')
+@click.argument('data_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--chunksize', type=int, help='CSV rows read per chunk.')
+@click.option('--sample-rows', type=int, help='Most rows the forest is fitted on (uniform sample).')
+@click.option('--max-samples', default='auto', help="Rows drawn per tree: 'auto', a count or a fraction.")
+@click.option('--n-estimators', default=100, show_default=True, type=int)
+@click.option('--contamination', default=0.15, show_default=True, type=float)
+@click.option('--random-state', default=42, show_default=True, type=int)
+@click.option('--activate/--no-activate', default=True, show_default=True, help='Serve the new version right away.')
+def train_model(data_path, chunksize, sample_rows, max_samples, n_estimators, contamination, random_state, activate):
+    """Train a model on a CSV file and publish it as a new version."""
+    from .services.model_training import parse_max_samples, train_and_publish
+
+    metadata = train_and_publish(
+        data_path, activate=activate, chunksize=chunksize, sample_rows=sample_rows,
+        max_samples=parse_max_samples(max_samples), n_estimators=n_estimators,
+        contamination=contamination, random_state=random_state
+    )
+    click.echo(f"Published version {metadata['version']}: {metadata['rows_trained']} of {metadata['rows_seen']} rows, "
+               f"{metadata['feature_count']} features, {metadata['training_seconds']}s"
+               + ('' if activate else ' (not activated)'))
+
+
+@model_cli.command('list')
+def list_models():
+    """List published model versions."""
+    from .services.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    current = registry.current_version()
+    for metadata in registry.versions():
+        marker = '*' if metadata['version'] == current else ' '
+        click.echo(f"{marker} {metadata['version']}  {metadata['rows_trained']} rows  {metadata['data_path']}")
+
+
+@model_cli.command('activate')
+@click.argument('version')
+def activate_model(version):
+    """Serve a published model version (workers switch on their next request)."""
+    from .services.model_registry import ModelRegistry
+
+    try:
+        ModelRegistry().activate(version)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Activated version {version}")
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -12,26 +13,92 @@ class Config:
     # Rulebooks storage directory
     RULEBOOKS_DIR = BASE_DIR / 'rulebooks'
     
-    # Ensure rulebooks directory exists
-    RULEBOOKS_DIR.mkdir(exist_ok=True)
-    
     # Maximum file size (10 MB)
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024
     
     # Allowed file extensions
     ALLOWED_EXTENSIONS = {'pdf'}
 
+    # Uploads are streamed in UPLOAD_CHUNK_SIZE blocks into uniquely named spool files
+    UPLOAD_SPOOL_FOLDER = os.getenv('UPLOAD_SPOOL_FOLDER') or tempfile.gettempdir()
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+
+    # Number of CSV rows validated per chunk (bounds peak memory per request)
+    VALIDATION_CHUNK_SIZE = int(os.getenv('VALIDATION_CHUNK_SIZE', '100000'))
+
+    # Most row records returned in one page of a buffered (JSON) validation response
+    VALIDATION_PAGE_LIMIT = int(os.getenv('VALIDATION_PAGE_LIMIT', '1000'))
+
+    # Number of CSV rows scored per chunk by the streaming anomaly endpoint
+    ANOMALY_CHUNK_SIZE = int(os.getenv('ANOMALY_CHUNK_SIZE', '100000'))
+
+    # Largest batch accepted by the real-time JSON scoring endpoint
+    REALTIME_MAX_RECORDS = int(os.getenv('REALTIME_MAX_RECORDS', '1000'))
+
+    # Processes validating CSV partitions in parallel (1, the default, validates in the request thread)
+    VALIDATION_WORKERS = int(os.getenv('VALIDATION_WORKERS', '1'))
+    VALIDATION_PARTITION_ROWS = int(os.getenv('VALIDATION_PARTITION_ROWS', '50000'))
+
+    # Rules flagged as super-linear: per-value match timeout with the `regex` engine, value
+    # length bound without it; rules averaging more than RULE_MAX_MS_PER_VALUE are quarantined
+    RULE_MATCH_TIMEOUT = float(os.getenv('RULE_MATCH_TIMEOUT', '0.1'))
+    RULE_MAX_RISKY_VALUE_LENGTH = int(os.getenv('RULE_MAX_RISKY_VALUE_LENGTH', '1000'))
+    RULE_MAX_MS_PER_VALUE = float(os.getenv('RULE_MAX_MS_PER_VALUE', '1.0'))
+
     # Flask configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
     DEBUG = os.getenv('FLASK_DEBUG', '1') == '1'
     
-    # API configuration
+    # API configuration (required by rule generation only, which checks it, so training and scoring run without it)
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-    if not GOOGLE_API_KEY:
-        raise ValueError("GOOGLE_API_KEY environment variable is not set")
     
     # File upload configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'rulebooks')
-    
-    # Ensure upload folder exists
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True) 
\ No newline at end of file
+
+    # SQLite index of rulebook summaries used by the list views
+    CATALOG_PATH = os.path.join(os.path.dirname(UPLOAD_FOLDER), 'catalog.sqlite3')
+
+    # Background rulebook ingestion jobs
+    JOBS_FOLDER = os.path.join(os.path.dirname(UPLOAD_FOLDER), 'jobs')
+    INGESTION_WORKERS = int(os.getenv('INGESTION_WORKERS', '2'))
+    # Job records untouched for this long are removed when a new job is queued
+    JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', str(7 * 24 * 60 * 60)))
+
+    # ASGI entry point: rule generations awaited concurrently on the event loop, and threads
+    # running the Flask app (validation, scoring and every other route) beside it
+    ASYNC_INGESTION_CONCURRENCY = int(os.getenv('ASYNC_INGESTION_CONCURRENCY', '200'))
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '10'))
+
+    # Columnar (Parquet / Arrow IPC) result exports, removed after EXPORT_RETENTION_SECONDS
+    EXPORTS_FOLDER = os.path.join(os.path.dirname(UPLOAD_FOLDER), 'exports')
+    EXPORT_RETENTION_SECONDS = int(os.getenv('EXPORT_RETENTION_SECONDS', str(24 * 60 * 60)))
+
+    # Content-hash cache of generated rules (LRU-evicted past the size bound)
+    RULE_CACHE_FOLDER = os.path.join(os.path.dirname(UPLOAD_FOLDER), 'rule_cache')
+    RULE_CACHE_MAX_BYTES = int(os.getenv('RULE_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+
+    # Per-row anomaly scores of uploaded files, keyed by file and model hash (LRU-evicted past the size bound)
+    SCORE_CACHE_FOLDER = os.path.join(os.path.dirname(UPLOAD_FOLDER), 'score_cache')
+    SCORE_CACHE_MAX_BYTES = int(os.getenv('SCORE_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+
+    # Versioned anomaly models published by the training pipeline; CURRENT names the served version
+    MODEL_REGISTRY_FOLDER = os.getenv('MODEL_REGISTRY_FOLDER') or os.path.join(os.path.dirname(UPLOAD_FOLDER), 'models')
+    # Training reads CSV chunks of TRAINING_CHUNK_SIZE rows and fits the forest on at most TRAINING_SAMPLE_ROWS
+    TRAINING_CHUNK_SIZE = int(os.getenv('TRAINING_CHUNK_SIZE', '100000'))
+    TRAINING_SAMPLE_ROWS = int(os.getenv('TRAINING_SAMPLE_ROWS', '1000000'))
+    # Model arrays are memory-mapped read-only so workers share their pages (empty to load into memory)
+    MODEL_MMAP_MODE = os.getenv('MODEL_MMAP_MODE', 'r') or None
+
+    # PDFs longer than RULE_EXTRACTION_MIN_PAGES are extracted in page chunks
+    RULE_EXTRACTION_MIN_PAGES = int(os.getenv('RULE_EXTRACTION_MIN_PAGES', '100'))
+    RULE_EXTRACTION_CHUNK_PAGES = int(os.getenv('RULE_EXTRACTION_CHUNK_PAGES', '25'))
+    RULE_EXTRACTION_CONCURRENCY = int(os.getenv('RULE_EXTRACTION_CONCURRENCY', '4'))
+
+    # Processes used to extract text from PDF pages (1, the default, extracts in the calling thread)
+    PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', '1'))
+
+    @classmethod
+    def create_directories(cls):
+        """Create the storage folders (done by create_app, so importing the config has no side effects)"""
+        cls.RULEBOOKS_DIR.mkdir(exist_ok=True)
+        os.makedirs(cls.UPLOAD_FOLDER, exist_ok=True)
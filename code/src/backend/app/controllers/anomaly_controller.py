@@ -1,14 +1,16 @@
 from flask import request, send_file, Blueprint, render_template, jsonify
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, inputs
 from werkzeug.datastructures import FileStorage
-from ..services.anomaly_service import AnomalyService
+from ..services.registry import get_anomaly_service
+from ..utils.serialization import json_response, ndjson_response
+from ..utils.upload import UploadTooLarge, spool_upload
+from ..config import Config
+from contextlib import ExitStack
 import asyncio
 import os
 import uuid
 from datetime import datetime, timedelta
 import json
-import pandas as pd
-import numpy as np
 
 # Create a custom JSON encoder
 class DateTimeEncoder(json.JSONEncoder):
@@ -51,6 +53,31 @@ upload_parser.add_argument(
     help='CSV file containing transactions'
 )
 
+# Define result projection parser
+projection_parser = api.parser()
+projection_parser.add_argument(
+    'anomalies_only',
+    location='args',
+    type=inputs.boolean,
+    default=False,
+    help='Only return records labelled as anomalies'
+)
+projection_parser.add_argument(
+    'columns',
+    location='args',
+    type=str,
+    help='Comma-separated columns to return for each record'
+)
+
+# Define rethreshold parser
+threshold_parser = api.parser()
+threshold_parser.add_argument('contamination', location='args', type=float,
+                              help='Label this fraction of the scored rows as anomalies (0 < contamination <= 0.5)')
+threshold_parser.add_argument('score_cutoff', location='args', type=float,
+                              help='Label rows scoring below this cutoff as anomalies (0 is the model threshold)')
+threshold_parser.add_argument('include_rows', location='args', type=inputs.boolean, default=False,
+                              help='Also return the 1-based row indices of the anomalies')
+
 # Define transaction validation parser
 validation_parser = api.parser()
 validation_parser.add_argument(
@@ -61,9 +88,6 @@ validation_parser.add_argument(
     help='CSV file containing transactions to validate'
 )
 
-# Initialize service
-anomaly_service = AnomalyService()
-
 @anomaly_bp.route('/anomaly-detection')
 def anomaly_detection_page():
     """Render the anomaly detection page."""
@@ -71,7 +95,7 @@ def anomaly_detection_page():
 
 @api.route('/get-anomalies')
 class TransactionAssess(Resource):
-    @api.expect(upload_parser)
+    @api.expect(upload_parser, projection_parser)
     @api.response(200, 'Success', anomaly_model)
     @api.response(400, 'Bad Request', error_model)
     @api.response(500, 'Internal Server Error', error_model)
@@ -96,18 +120,123 @@ class TransactionAssess(Resource):
             if not file.filename.endswith('.csv'):
                 api.abort(400, "File must be a CSV")
             
-            # Save the file temporarily
-            temp_path = f"/tmp/{file.filename}"
-            file.save(temp_path)
-            
-            # Process the file
-            result = anomaly_service.predict_anomalies(temp_path)
+            projection = projection_parser.parse_args()
+            columns = [column.strip() for column in (projection['columns'] or '').split(',') if column.strip()]
             
-            # Clean up the temporary file
-            os.remove(temp_path)
+            # Stream the upload to a uniquely named spool file, removed once processed
+            with spool_upload(file, max_bytes=Config.MAX_CONTENT_LENGTH) as upload:
+                result = get_anomaly_service().predict_anomalies(
+                    upload.path,
+                    anomalies_only=projection['anomalies_only'],
+                    columns=columns or None,
+                    file_hash=upload.sha256
+                )
             
             # Return JSON response
-            return result, 200
+            return json_response(result)
             
+        except UploadTooLarge as e:
+            api.abort(413, str(e))
+        except ValueError as e:
+            api.abort(400, str(e))
         except Exception as e:
             api.abort(500, f"Error detecting anomalies: {str(e)}")
+
+
+@api.route('/get-anomalies/stream')
+class TransactionAssessStream(Resource):
+    @api.expect(upload_parser, projection_parser)
+    @api.response(200, 'Newline-delimited JSON records followed by a summary record')
+    @api.response(400, 'Bad Request', error_model)
+    @api.doc(
+        description='Upload a transaction CSV and stream anomaly detection results as NDJSON',
+        responses={
+            200: 'One {"type": "record"} line per transaction, then a {"type": "summary"} line',
+            400: 'Invalid file format or missing required fields'
+        }
+    )
+    def post(self):
+        """Upload a CSV file and stream anomaly detection results chunk by chunk"""
+        if 'transactions' not in request.files:
+            api.abort(400, "No file uploaded")
+        
+        file = request.files['transactions']
+        if not file.filename.endswith('.csv'):
+            api.abort(400, "File must be a CSV")
+        
+        projection = projection_parser.parse_args()
+        columns = [column.strip() for column in (projection['columns'] or '').split(',') if column.strip()]
+        
+        # The spool file must outlive this handler: it is removed when the response is closed
+        cleanup = ExitStack()
+        try:
+            upload = cleanup.enter_context(spool_upload(file, max_bytes=Config.MAX_CONTENT_LENGTH))
+            batches = get_anomaly_service().stream_anomalies(
+                upload.path,
+                anomalies_only=projection['anomalies_only'],
+                columns=columns or None,
+                file_hash=upload.sha256
+            )
+        except ValueError as e:
+            cleanup.close()
+            api.abort(413 if isinstance(e, UploadTooLarge) else 400, str(e))
+        except Exception:
+            cleanup.close()
+            raise
+        
+        response = ndjson_response(batches)
+        response.call_on_close(cleanup.close)
+        return response
+
+
+@api.route('/score')
+class TransactionScore(Resource):
+    @api.response(200, 'One {anomaly_label, anomaly_score} result per transaction, in order')
+    @api.response(400, 'Bad Request', error_model)
+    @api.doc(description='Score one transaction object, or an array of them, keyed by the DatasetAnomaly.csv column names')
+    def post(self):
+        """Score transactions in real time, without a CSV upload or chart aggregation"""
+        payload = request.get_json(silent=True)
+        try:
+            results = get_anomaly_service().score_records(payload)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return json_response({'results': results})
+
+@api.route('/model')
+class AnomalyModelVersion(Resource):
+    @api.doc(description='Version and training metadata of the model currently served by this worker')
+    def get(self):
+        """Get the anomaly model currently in use"""
+        anomaly_service = get_anomaly_service()
+        model = anomaly_service.current_model()
+        metadata = anomaly_service.registry.metadata(model.version) if model.version else None
+        return json_response({
+            'version': model.version,
+            'digest': model.digest,
+            'features': model.features,
+            'metadata': metadata
+        })
+
+@api.route('/scores/<string:file_hash>/rethreshold')
+@api.param('file_hash', 'SHA-256 of a scored CSV file (file_hash of its anomaly results)')
+class ScoreRethreshold(Resource):
+    @api.expect(threshold_parser)
+    @api.response(400, 'Bad Request', error_model)
+    @api.response(404, 'No cached scores for the file', error_model)
+    @api.doc(description='Relabel a previously scored file by contamination or score cutoff using its cached scores')
+    def get(self, file_hash):
+        """Re-threshold the cached anomaly scores of an uploaded file"""
+        args = threshold_parser.parse_args()
+        try:
+            result = get_anomaly_service().rethreshold(
+                file_hash,
+                contamination=args['contamination'],
+                score_cutoff=args['score_cutoff'],
+                include_rows=args['include_rows']
+            )
+        except ValueError as e:
+            api.abort(400, str(e))
+        if result is None:
+            api.abort(404, "No cached scores for this file; upload it to /anomalies/get-anomalies first")
+        return json_response(result)
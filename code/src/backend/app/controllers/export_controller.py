@@ -0,0 +1,141 @@
+from flask import request, send_file, url_for
+from flask_restx import Namespace, Resource, fields
+from werkzeug.datastructures import FileStorage
+from ..services.registry import get_anomaly_service, get_export_service, get_rulebook_service
+from ..services.result_export import EXPORT_FORMATS, ExportUnavailable
+from ..utils.upload import UploadTooLarge, spool_upload
+from ..config import Config
+
+# Create namespace for columnar result exports
+api = Namespace(
+    'exports',
+    description='Columnar (Parquet / Arrow IPC) export of validation and anomaly results',
+    path='/exports'
+)
+
+export_model = api.model('Export', {
+    'export_id': fields.String(required=True, description='Unique identifier for the export'),
+    'kind': fields.String(required=True, description='Result table exported (anomalies or violations)'),
+    'format': fields.String(required=True, description='File format (parquet or arrow)'),
+    'media_type': fields.String(description='Media type of the file'),
+    'filename': fields.String(description='Name of the exported file'),
+    'rows': fields.Integer(description='Number of rows in the table'),
+    'columns': fields.List(fields.String, description='Columns of the table'),
+    'size': fields.Integer(description='File size in bytes'),
+    'created_at': fields.String(description='Timestamp when the export was written'),
+    'download_url': fields.String(description='Where to download the file')
+})
+
+error_model = api.model('Error', {
+    'message': fields.String(required=True, description='Error message'),
+    'code': fields.String(required=True, description='Error code'),
+    'details': fields.Raw(description='Additional error details')
+})
+
+format_parser = api.parser()
+format_parser.add_argument('format', location='args', type=str, default='parquet', choices=tuple(EXPORT_FORMATS),
+                           help='File format: parquet or arrow (Arrow IPC file)')
+
+anomaly_parser = format_parser.copy()
+anomaly_parser.add_argument('transactions', location='files', type=FileStorage, required=True,
+                            help='CSV file containing transactions')
+anomaly_parser.add_argument('columns', location='args', type=str,
+                            help='Comma-separated transaction columns to include next to the label and score')
+
+validation_parser = format_parser.copy()
+validation_parser.add_argument('csv_file', location='files', type=FileStorage, required=True,
+                               help='CSV file to validate')
+
+
+def _with_download_url(record):
+    record['download_url'] = url_for('exports_export_download', export_id=record['export_id'])
+    return record
+
+
+@api.route('/anomalies')
+class AnomalyExport(Resource):
+    @api.expect(anomaly_parser)
+    @api.response(201, 'Export written', export_model)
+    @api.response(400, 'Bad Request', error_model)
+    @api.response(501, 'Columnar writer not installed', error_model)
+    @api.doc(description='Score a transaction CSV and export row_index, anomaly_label and anomaly_score per row')
+    def post(self):
+        """Export row-level anomaly labels and scores of a CSV file"""
+        args = anomaly_parser.parse_args()
+        file = args['transactions']
+        if not file.filename.endswith('.csv'):
+            api.abort(400, "File must be a CSV")
+        columns = [column.strip() for column in (args['columns'] or '').split(',') if column.strip()]
+
+        try:
+            with spool_upload(file, max_bytes=Config.MAX_CONTENT_LENGTH) as upload:
+                schema, batches = get_anomaly_service().score_batches(upload.path, columns=columns or None,
+                                                                      file_hash=upload.sha256)
+                record = get_export_service().write(batches, schema, 'anomalies', args['format'], source=file.filename)
+        except ExportUnavailable as e:
+            api.abort(501, str(e))
+        except UploadTooLarge as e:
+            api.abort(413, str(e))
+        except ValueError as e:
+            api.abort(400, str(e))
+        except Exception as e:
+            api.abort(500, f"Error exporting anomalies: {str(e)}")
+        return _with_download_url(record), 201
+
+
+@api.route('/validation/<string:rulebook_id>')
+@api.param('rulebook_id', 'The unique identifier of the rulebook')
+class ValidationExport(Resource):
+    @api.expect(validation_parser)
+    @api.response(201, 'Export written', export_model)
+    @api.response(400, 'Bad Request', error_model)
+    @api.response(501, 'Columnar writer not installed', error_model)
+    @api.doc(description='Validate a CSV file and export one row per violation: row_index, column, rule, pattern, description, value')
+    def post(self, rulebook_id):
+        """Export the long-format violations table of a CSV file"""
+        args = validation_parser.parse_args()
+        csv_file = args['csv_file']
+
+        try:
+            from ..services.validation_engine import VIOLATION_TABLE_SCHEMA
+
+            with spool_upload(csv_file, max_bytes=Config.MAX_CONTENT_LENGTH) as upload:
+                batches = get_rulebook_service().violation_batches(upload.path, rulebook_id)
+                record = get_export_service().write(batches, VIOLATION_TABLE_SCHEMA, 'violations', args['format'],
+                                                    source=csv_file.filename, rulebook_id=rulebook_id)
+        except ExportUnavailable as e:
+            api.abort(501, str(e))
+        except UploadTooLarge as e:
+            api.abort(413, str(e))
+        except ValueError as e:
+            api.abort(400, str(e))
+        except Exception as e:
+            api.abort(500, f"Error exporting violations: {str(e)}")
+        return _with_download_url(record), 201
+
+
+@api.route('/<string:export_id>')
+@api.param('export_id', 'The unique identifier of the export')
+class ExportRecord(Resource):
+    @api.response(200, 'Success', export_model)
+    @api.response(404, 'Export not found', error_model)
+    def get(self, export_id):
+        """Get an export record by ID"""
+        record = get_export_service().get_export(export_id)
+        if not record:
+            api.abort(404, "Export not found")
+        return _with_download_url(record)
+
+
+@api.route('/<string:export_id>/download')
+@api.param('export_id', 'The unique identifier of the export')
+class ExportDownload(Resource):
+    @api.response(200, 'The exported file')
+    @api.response(404, 'Export not found', error_model)
+    def get(self, export_id):
+        """Download an exported Parquet or Arrow file"""
+        record = get_export_service().get_export(export_id)
+        if not record:
+            api.abort(404, "Export not found")
+        return send_file(get_export_service().file_path(record), mimetype=record['media_type'],
+                         as_attachment=True, download_name=record['filename'])
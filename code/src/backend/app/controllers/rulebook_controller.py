@@ -1,8 +1,12 @@
 from flask import request, send_file
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, inputs
 from werkzeug.datastructures import FileStorage
-from ..services.rulebook_service import RulebookService
+from ..services.registry import get_job_service, get_rulebook_service
 from ..utils.file_handler import is_pdf
+from ..utils.upload import UploadTooLarge, spool_upload
+from ..config import Config
+from ..utils.serialization import json_response
+from ..services.detail_levels import DEFAULT_DETAIL, DETAIL_LEVELS, buffered_page_limit
 import asyncio
 import os
 import uuid
@@ -43,6 +47,17 @@ rulebook_model = api.model('Rulebook', {
     'processing_error': fields.String(description='Error message if processing failed')
 })
 
+job_model = api.model('Job', {
+    'job_id': fields.String(required=True, description='Unique identifier for the ingestion job'),
+    'job_type': fields.String(required=True, description='Kind of background work'),
+    'rulebook_uuid': fields.String(required=True, description='Rulebook the job processes'),
+    'status': fields.String(required=True, description='Job status (PENDING, PROCESSING, COMPLETED, FAILED)'),
+    'created_at': fields.String(description='Timestamp when the job was queued'),
+    'started_at': fields.String(description='Timestamp when processing started'),
+    'finished_at': fields.String(description='Timestamp when processing finished'),
+    'error': fields.String(description='Error message if the job failed')
+})
+
 # Define error response model with examples
 error_model = api.model('Error', {
     'message': fields.String(required=True, description='Error message'),
@@ -76,21 +91,38 @@ validation_parser.add_argument(
     required=True,
     help='CSV file containing transactions to validate'
 )
+validation_parser.add_argument('detail', location='args', type=str, default=DEFAULT_DETAIL, choices=DETAIL_LEVELS,
+                               help='Row records to return: summary (none), violations (failing rows) or full (every row)')
+validation_parser.add_argument('cursor', location='args', type=inputs.natural, default=0,
+                               help='Return records after this row index (next_cursor of the previous page)')
+validation_parser.add_argument('limit', location='args', type=inputs.positive,
+                               help='Maximum number of row records to return (at most VALIDATION_PAGE_LIMIT, the default)')
 
-# Initialize service
-rulebook_service = RulebookService()
+# Define rulebook list parser
+list_parser = api.parser()
+list_parser.add_argument('status', location='args', type=str,
+                         help='Only list rulebooks with this status (e.g. COMPLETED)')
+list_parser.add_argument('sort', location='args', type=str, default='created_at',
+                         choices=('created_at', 'rulebook_name', 'status', 'rule_count', 'file_size'),
+                         help='Field to sort by')
+list_parser.add_argument('order', location='args', type=str, default='desc', choices=('asc', 'desc'),
+                         help='Sort order')
+list_parser.add_argument('page', location='args', type=inputs.positive, default=1,
+                         help='Page number (1-based)')
+list_parser.add_argument('per_page', location='args', type=inputs.positive,
+                         help='Rulebooks per page (all when omitted)')
 
 @api.route('/upload-pdf')
 class RulebookUpload(Resource):
     @api.expect(upload_parser)
-    @api.response(201, 'Rulebook created successfully', rulebook_model)
+    @api.response(202, 'Rulebook accepted for processing', rulebook_model)
     @api.response(400, 'Invalid input', error_model)
     @api.response(413, 'File too large', error_model)
     @api.response(500, 'Server error', error_model)
     @api.doc(
         description='Upload a new regulatory rulebook PDF',
         responses={
-            201: 'Rulebook successfully uploaded and processed',
+            202: 'Rulebook uploaded and queued for rule generation',
             400: 'Invalid file format or missing required fields',
             413: 'File size exceeds maximum limit of 10MB',
             500: 'Internal server error during processing'
@@ -115,8 +147,11 @@ class RulebookUpload(Resource):
             # Generate a description based on the rulebook name
             description = f"Regulatory framework for {rulebook_name}"
             
-            # Create rulebook synchronously
-            rulebook = rulebook_service.create_rulebook_sync(file, rulebook_name, description)
+            # Save the PDF now and generate rules off the request path
+            rulebook_service = get_rulebook_service()
+            rulebook = rulebook_service.register_rulebook(file, rulebook_name, description)
+            job = get_job_service().submit('rule_generation', rulebook['uuid'],
+                                           rulebook_service.process_rulebook, rulebook['uuid'])
             
             # Convert datetime to ISO format string
             if isinstance(rulebook, dict):
@@ -124,13 +159,17 @@ class RulebookUpload(Resource):
                     if isinstance(rulebook['created_at'], datetime):
                         rulebook['created_at'] = rulebook['created_at'].isoformat()
             
-            # Return success response
+            # Return accepted response
             return {
                 'success': True,
-                'message': 'Rulebook uploaded successfully',
-                'rulebook': rulebook
-            }, 201
+                'message': 'Rulebook uploaded successfully and queued for processing',
+                'rulebook': rulebook,
+                'job': job,
+                'status_url': f"{api.path}/jobs/{job['job_id']}"
+            }, 202
             
+        except UploadTooLarge as e:
+            api.abort(413, str(e))
         except Exception as e:
             api.abort(500, f"Error creating rulebook: {str(e)}")
 
@@ -150,7 +189,7 @@ class RulebookResource(Resource):
     def get(self, uuid):
         """Get rulebook metadata by UUID"""
         try:
-            rulebook = rulebook_service.get_rulebook(uuid)
+            rulebook = get_rulebook_service().get_rulebook(uuid)
             if not rulebook:
                 return {'success': False, 'message': 'Rulebook not found'}, 404
             
@@ -193,7 +232,7 @@ class RulebookResource(Resource):
     def delete(self, uuid):
         """Delete a rulebook by UUID"""
         try:
-            success = rulebook_service.delete_rulebook(uuid)
+            success = get_rulebook_service().delete_rulebook(uuid)
             if success:
                 return {'success': True, 'message': 'Rulebook deleted successfully'}
             else:
@@ -203,17 +242,26 @@ class RulebookResource(Resource):
 
 @api.route('/rulebooks')
 class RulebookList(Resource):
+    @api.expect(list_parser)
     @api.response(200, 'Success', [rulebook_model])
     @api.doc(
-        description='List all uploaded rulebooks',
+        description='List uploaded rulebooks (summaries without rules; use /rulebook/<uuid> for the rules)',
         responses={
             200: 'List of all rulebooks retrieved successfully'
         }
     )
     def get(self):
         """List all uploaded rulebooks"""
+        args = list_parser.parse_args()
+        per_page = args['per_page']
         try:
-            rulebooks = rulebook_service.get_all_rulebooks()
+            rulebooks, total = get_rulebook_service().list_rulebooks(
+                status=args['status'],
+                sort=args['sort'],
+                descending=args['order'] == 'desc',
+                limit=per_page,
+                offset=(args['page'] - 1) * per_page if per_page else 0
+            )
             # Convert datetime fields to ISO format strings
             for rulebook in rulebooks:
                 if isinstance(rulebook, dict):
@@ -241,11 +289,75 @@ class RulebookList(Resource):
             # Return the response without marshalling
             return {
                 'status': 'success',
-                'data': rulebooks
+                'data': rulebooks,
+                'total': total,
+                'page': args['page'],
+                'per_page': per_page
             }
         except Exception as e:
             api.abort(500, message=str(e))
 
+@api.route('/jobs/<string:job_id>')
+@api.param('job_id', 'The unique identifier of the ingestion job')
+class JobStatus(Resource):
+    @api.response(200, 'Success', job_model)
+    @api.response(404, 'Job not found', error_model)
+    @api.doc(
+        description='Poll the status of a background rulebook ingestion job',
+        responses={
+            200: 'Job status retrieved successfully',
+            404: 'Job with specified ID not found'
+        }
+    )
+    def get(self, job_id):
+        """Get ingestion job status by ID"""
+        job = get_job_service().get_job(job_id)
+        if not job:
+            api.abort(404, "Job not found")
+        
+        # Include the current rulebook status so clients need a single poll; the catalog row is enough
+        rulebook = get_rulebook_service().catalog.get(job['rulebook_uuid'])
+        job['rulebook_status'] = rulebook['status'] if rulebook else None
+        return job
+
+@api.route('/cache/stats')
+class RulebookCacheStats(Resource):
+    @api.response(200, 'Success')
+    @api.doc(
+        description='Hit/miss counters of the compiled rulebook cache in this worker',
+        responses={
+            200: 'Cache statistics retrieved successfully'
+        }
+    )
+    def get(self):
+        """Get compiled rulebook cache statistics"""
+        return {
+            'status': 'success',
+            'data': get_rulebook_service().cache.stats()
+        }
+
+@api.route('/rulebook/<string:uuid>/rule-costs')
+@api.param('uuid', 'The unique identifier of the rulebook')
+class RulebookRuleCosts(Resource):
+    @api.response(200, 'Success')
+    @api.response(404, 'Rulebook not found', error_model)
+    @api.doc(
+        description='Regex risk, matching engine, quarantine state and match cost of every rule in this worker',
+        responses={
+            200: 'Rule costs retrieved successfully',
+            404: 'Rulebook with specified UUID not found'
+        }
+    )
+    def get(self, uuid):
+        """Get per-rule match costs and quarantined rules"""
+        compiled = get_rulebook_service().cache.get(uuid)
+        if not compiled:
+            api.abort(404, "Rulebook not found")
+        return {
+            'status': 'success',
+            'data': compiled.engine.rule_costs()
+        }
+
 @api.route('/rulebook/<string:uuid>/validate')
 @api.param('uuid', 'The unique identifier of the rulebook')
 class TransactionValidation(Resource):
@@ -276,11 +388,17 @@ class TransactionValidation(Resource):
             api.abort(400, "No CSV file provided")
         
         try:
-            violations = rulebook_service.validate_transactions(csv_file, uuid)
-            return {
-                'total_transactions': len(violations),
+            from ..services.validation_engine import get_sink
+
+            sink = get_sink(args['detail'], args['cursor'], buffered_page_limit(args['limit']))
+            with spool_upload(csv_file, max_bytes=Config.MAX_CONTENT_LENGTH) as upload:
+                violations = get_rulebook_service().validate_transactions(upload.path, uuid, detail=sink)
+            return json_response({
+                'total_transactions': violations['total_transactions'],
                 'violations': violations
-            }
+            })
+        except UploadTooLarge as e:
+            api.abort(413, str(e))
         except ValueError as e:
             api.abort(400, str(e))
         except Exception as e:
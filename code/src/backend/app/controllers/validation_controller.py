@@ -1,10 +1,13 @@
 from flask import Blueprint, render_template, request, jsonify
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, inputs
 from werkzeug.datastructures import FileStorage
-import pandas as pd
-import re
 from datetime import datetime
-from ..services.rulebook_service import RulebookService
+from ..services.registry import get_rulebook_service
+from ..services.detail_levels import DEFAULT_DETAIL, DETAIL_LEVELS, buffered_page_limit
+from ..utils.serialization import json_response, ndjson_response
+from ..utils.upload import UploadTooLarge, spool_upload
+from ..config import Config
+from contextlib import ExitStack
 
 # Create Blueprint for template rendering
 validation_bp = Blueprint('validation', __name__)
@@ -16,9 +19,6 @@ api = Namespace(
     path='/validation'
 )
 
-# Initialize service
-rulebook_service = RulebookService()
-
 # Define upload parser
 upload_parser = api.parser()
 upload_parser.add_argument(
@@ -28,6 +28,12 @@ upload_parser.add_argument(
     required=True,
     help='CSV file to validate'
 )
+upload_parser.add_argument('detail', location='args', type=str, default=DEFAULT_DETAIL, choices=DETAIL_LEVELS,
+                           help='Row records to return: summary (none), violations (failing rows) or full (every row)')
+upload_parser.add_argument('cursor', location='args', type=inputs.natural, default=0,
+                           help='Return records after this row index (next_cursor of the previous page)')
+upload_parser.add_argument('limit', location='args', type=inputs.positive,
+                           help='Maximum number of row records to return (JSON responses: at most VALIDATION_PAGE_LIMIT, the default; the stream: all when omitted)')
 
 @validation_bp.route('/data-validation')
 def data_validation_page():
@@ -40,24 +46,29 @@ class ValidationResource(Resource):
     @api.expect(upload_parser)
     def post(self, rulebook_id):
         """Validate uploaded CSV file against selected rulebook."""
+        # Invalid arguments abort with 400 before validation starts
+        args = upload_parser.parse_args()
         try:
             # Get the uploaded file
-            args = upload_parser.parse_args()
             csv_file = args['csv_file']
 
             if not csv_file:
-                return jsonify({
+                return {
                     'status': 'error',
                     'message': 'No file uploaded',
                     'data': None
-                }), 400
+                }, 400
 
             # Validate data using rulebook service
-            validation_results = rulebook_service.validate_transactions(csv_file, rulebook_id)
+            from ..services.validation_engine import get_sink
+
+            sink = get_sink(args['detail'], args['cursor'], buffered_page_limit(args['limit']))
+            with spool_upload(csv_file, max_bytes=Config.MAX_CONTENT_LENGTH) as upload:
+                validation_results = get_rulebook_service().validate_transactions(upload.path, rulebook_id,
+                                                                                  detail=sink)
             
-            # Get total transactions from the CSV
-            df = pd.read_csv(csv_file)
-            total_transactions = len(df)
+            # Row count comes from the same streaming pass as the validation
+            total_transactions = validation_results['total_transactions']
             
             # Format the response
             response_data = {
@@ -69,18 +80,57 @@ class ValidationResource(Resource):
                 }
             }
             
-            return jsonify(response_data)
+            return json_response(response_data)
+            
+        except UploadTooLarge as e:
+            return {
+                'status': 'error',
+                'message': str(e),
+                'data': None
+            }, 413
             
         except ValueError as e:
-            return jsonify({
+            return {
                 'status': 'error',
                 'message': str(e),
                 'data': None
-            }), 400
+            }, 400
             
         except Exception as e:
-            return jsonify({
+            return {
                 'status': 'error',
                 'message': f'An error occurred during validation: {str(e)}',
                 'data': None
-            }), 500 
\ No newline at end of file
+            }, 500 
+
+
+@api.route('/validate/<string:rulebook_id>/stream')
+@api.param('rulebook_id', 'The unique identifier of the rulebook')
+class ValidationStreamResource(Resource):
+    @api.expect(upload_parser)
+    def post(self, rulebook_id):
+        """Validate an uploaded CSV file, streaming row validations and a final summary as NDJSON."""
+        args = upload_parser.parse_args()
+        csv_file = args['csv_file']
+        # The spool file must outlive this handler: it is removed when the response is closed
+        cleanup = ExitStack()
+        try:
+            from ..services.validation_engine import get_sink
+
+            sink = get_sink(args['detail'], args['cursor'], args['limit'])
+            upload = cleanup.enter_context(spool_upload(csv_file, max_bytes=Config.MAX_CONTENT_LENGTH))
+            batches = get_rulebook_service().stream_transactions(upload.path, rulebook_id, detail=sink)
+        except ValueError as e:
+            cleanup.close()
+            return {
+                'status': 'error',
+                'message': str(e),
+                'data': None
+            }, 413 if isinstance(e, UploadTooLarge) else 400
+        except Exception:
+            cleanup.close()
+            raise
+
+        response = ndjson_response(batches)
+        response.call_on_close(cleanup.close)
+        return response
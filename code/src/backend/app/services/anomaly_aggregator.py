@@ -0,0 +1,65 @@
+import pandas as pd
+
+# Anomaly label values counted per chart key (0 normal, 1 anomaly)
+LABELS = [0, 1]
+
+
+def label_counts(keys: pd.Series, labels: pd.Series) -> pd.DataFrame:
+    """Normal/anomaly counts per key value, one column per label; missing keys are dropped"""
+    present = keys.notna()
+    if not present.any():
+        return pd.DataFrame(0, index=pd.Index([], dtype=keys.dtype, name='key'), columns=LABELS)
+    counts = pd.crosstab(keys[present], labels[present])
+    return counts.reindex(columns=LABELS, fill_value=0).rename_axis(index='key', columns=None)
+
+
+class AnomalyAggregator:
+    """Label counts behind the anomaly dashboard charts.
+
+    ``update`` adds the counts of a scored batch to running totals without
+    modifying the batch, so a dashboard can be refreshed incrementally as new
+    files arrive; ``charts`` renders the time series, regional and credit
+    facility type payloads from the totals.
+    """
+
+    def __init__(self):
+        self.by_timestamp = label_counts(pd.Series(dtype='datetime64[ns]'), pd.Series(dtype=int))
+        self.by_country = label_counts(pd.Series(dtype=object), pd.Series(dtype=int))
+        self.by_facility_type = label_counts(pd.Series(dtype=object), pd.Series(dtype=int))
+
+    @staticmethod
+    def _merge(totals: pd.DataFrame, counts: pd.DataFrame) -> pd.DataFrame:
+        return totals.add(counts, fill_value=0).astype(int).sort_index()
+
+    def update(self, df: pd.DataFrame) -> 'AnomalyAggregator':
+        """Add the label counts of a scored batch (needs an anomaly_label column)"""
+        labels = df['anomaly_label']
+        timestamps = pd.to_datetime(df['origination_date'], errors='coerce')
+
+        self.by_timestamp = self._merge(self.by_timestamp, label_counts(timestamps, labels))
+        self.by_country = self._merge(self.by_country, label_counts(df['country'], labels))
+        self.by_facility_type = self._merge(self.by_facility_type, label_counts(df['credit_facility_type'], labels))
+        return self
+
+    def charts(self) -> dict:
+        """Chart payloads in the shape the anomaly dashboard expects"""
+        time_series = self.by_timestamp
+        regional = self.by_country
+        types = self.by_facility_type
+        return {
+            'time_series': {
+                'timestamps': time_series.index.strftime('%Y-%m-%d').tolist(),
+                'normal_count': time_series[0].tolist(),
+                'anomaly_count': time_series[1].tolist()
+            },
+            'regional_distribution': {
+                'regions': regional.index.tolist(),
+                'total_transactions': (regional[0] + regional[1]).tolist(),
+                'anomalies': regional[1].tolist()
+            },
+            'transaction_types': {
+                'types': types.index.tolist(),
+                'normal_count': types[0].tolist(),
+                'anomaly_count': types[1].tolist()
+            }
+        }
@@ -1,34 +1,177 @@
-import uuid
-import os
-import json
-import asyncio
 from datetime import datetime
-from pathlib import Path
-from flask import current_app
-from ..models.rulebook import Rulebook, Rule
-from ..utils.file_handler import save_rulebook_file, save_metadata, get_metadata
-from .rule_generator_service import RuleGeneratorService
+from .anomaly_aggregator import AnomalyAggregator
 from ..config import Config
+from ..utils.serialization import frame_to_records
+from .score_cache import ScoreCache, score_key
+from .model_registry import ModelRegistry
 import pandas as pd
-from typing import List
-import time
-import pdfplumber
-import pickle
+import logging
+import threading
 import numpy as np
-from sklearn.preprocessing import StandardScaler
         
 class AnomalyService:
-    def __init__(self):
-        model_path = Path(__file__).parent / 'iso_model.pkl'
-        with open(model_path, 'rb') as f:
-            self.iso_model = pickle.load(f)
+    def __init__(self, registry: ModelRegistry = None):
+        # Scaler + IsolationForest pipelines published by the training pipeline (or the bundled one)
+        self.registry = registry or ModelRegistry()
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pointer_state = self.registry.pointer_state()
+        self.model = self.registry.load_current()
+        self.score_cache = ScoreCache()
 
-    def predict_anomalies(self, csv_file_path):
+    def current_model(self):
+        """The model to score a request with, hot-swapped when another version has been activated
+
+        Each request takes one snapshot, so a file is never scored by two models.
+        """
+        state = self.registry.pointer_state()
+        if state != self._pointer_state:
+            with self._lock:
+                if state != self._pointer_state:
+                    try:
+                        # Load fully before the swap; requests in flight keep their snapshot
+                        self.model = self.registry.load_current()
+                        self.logger.info(f"Switched to anomaly model version {self.model.version}")
+                    except Exception as e:
+                        self.logger.error(f"Keeping anomaly model version {self.model.version}: {str(e)}")
+                    self._pointer_state = state
+        return self.model
+
+    @property
+    def pipeline(self):
+        return self.current_model().pipeline
+
+    @property
+    def features(self):
+        return self.current_model().features
+
+    def _feature_matrix(self, df, model=None):
+        """Model features, in training order, of the rows that can be scored"""
+        features = (model or self.current_model()).features
+        missing = [feature for feature in features if feature not in df.columns]
+        if missing:
+            raise ValueError(f"CSV is missing model features: {', '.join(missing)}")
+        
+        X = df[features].apply(pd.to_numeric, errors='coerce')
+        return X.dropna()
+
+    @staticmethod
+    def _decision_scores(X, model):
+        """decision_function of a feature matrix, through the compiled forest when the model has one"""
+        if model.forest is not None:
+            return model.forest.decision_function(np.asarray(X, dtype=np.float64))
+        return model.pipeline.decision_function(pd.DataFrame(X, columns=model.features))
+
+    def predict_labels(self, X, model=None):
+        """Anomaly labels (1 for anomaly, 0 for normal) for a feature matrix"""
+        return self.score_labels(X, model)[1]
+
+    def score_labels(self, X, model=None):
+        """Anomaly scores (decision_function, negative for anomalies) and labels of a feature matrix"""
+        if not len(X):
+            return np.zeros(0), np.zeros(0, dtype=int)
+        scores = self._decision_scores(X, model or self.current_model())
+        # IsolationForest.predict labels exactly the rows scoring below zero as outliers
+        return scores, (scores < 0).astype(int)
+
+    @staticmethod
+    def _to_float(value):
+        """Numeric value of a JSON field, NaN when it is missing or not a number (like pd.to_numeric coercion)"""
+        if value is None or isinstance(value, bool):
+            return float(value) if isinstance(value, bool) else np.nan
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    def score_records(self, records):
+        """
+        Label and score JSON transaction records with the in-memory model.
+
+        Takes one record or a list of at most REALTIME_MAX_RECORDS records keyed
+        by the CSV column names, and returns an {anomaly_label, anomaly_score}
+        result per record, in order. Records whose features are not all numeric
+        are labelled normal with a null score, as in predict_anomalies. No CSV,
+        DataFrame or chart aggregation is involved.
+        """
+        if isinstance(records, dict):
+            records = [records]
+        if not isinstance(records, list) or not records:
+            raise ValueError("Expected a transaction object or a non-empty array of transactions")
+        if len(records) > Config.REALTIME_MAX_RECORDS:
+            raise ValueError(f"At most {Config.REALTIME_MAX_RECORDS} transactions can be scored per request")
+
+        model = self.current_model()
+        X = np.empty((len(records), len(model.features)))
+        for position, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise ValueError(f"Transaction {position} is not an object")
+            missing = [feature for feature in model.features if feature not in record]
+            if missing:
+                raise ValueError(f"Transaction {position} is missing model features: {', '.join(missing)}")
+            X[position] = [self._to_float(record[feature]) for feature in model.features]
+
+        scoreable = ~np.isnan(X).any(axis=1)
+        scores = np.full(len(records), np.nan)
+        if scoreable.any():
+            scores[scoreable] = self._decision_scores(X[scoreable], model)
+
+        return [
+            {'anomaly_label': int(score < 0), 'anomaly_score': None if np.isnan(score) else float(score)}
+            for score in scores.tolist()
+        ]
+
+    def _label(self, df, model):
+        """Add the anomaly_label and anomaly_score columns to a DataFrame and return the scores (NaN where unscoreable)"""
+        # Select the fixed model features; the persisted scaler only transforms them
+        df_model = self._feature_matrix(df, model)
+        scores, labels = self.score_labels(df_model, model)
+        df['anomaly_label'] = 0
+        df.loc[df_model.index, 'anomaly_label'] = labels
+        df['anomaly_score'] = np.nan
+        df.loc[df_model.index, 'anomaly_score'] = scores
+        return df['anomaly_score'].to_numpy()
+
+    def _cache_scores(self, file_hash, scores, model):
+        if file_hash:
+            self.score_cache.put(score_key(file_hash, model.digest), scores)
+
+    @staticmethod
+    def _projection(available, columns):
+        """Columns to return for each record (anomaly_label is always included), or None for all"""
+        if not columns:
+            return None
+        unknown = [column for column in columns if column not in available and column not in ('anomaly_label', 'anomaly_score')]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        return list(dict.fromkeys([*columns, 'anomaly_label']))
+
+    @staticmethod
+    def _records(df, anomalies_only, columns):
+        # Convert DataFrame to records column by column, handling NaN/NaT and Timestamp values
+        if anomalies_only:
+            df = df[df['anomaly_label'] == 1]
+        return frame_to_records(df, columns)
+
+    @staticmethod
+    def _statistics(total_records, anomaly_count, scored_records):
+        # Rows whose features cannot be parsed are labelled normal but do not count towards the rate
+        return {
+            'total_records': total_records,
+            'anomaly_count': anomaly_count,
+            'detection_rate': float(anomaly_count / scored_records * 100) if scored_records else 0.0,
+            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def predict_anomalies(self, csv_file_path, anomalies_only=False, columns=None, file_hash=None):
         """
         Predicts anomalies in a CSV file using the loaded Isolation Forest model.
 
         Args:
             csv_file_path: Path to the CSV file containing transaction data.
+            anomalies_only: Only return the records labelled as anomalies.
+            columns: Only return these columns of each record (anomaly_label is always included).
+            file_hash: SHA-256 of the file; its scores are cached under it for rethreshold.
 
         Returns:
             A dictionary containing anomalies and visualization data
@@ -36,127 +179,147 @@ class AnomalyService:
         try:
             # Read the CSV file
             df = pd.read_csv(csv_file_path)
+            columns = self._projection(df.columns, columns)
             
-            # Process numeric features for anomaly detection
-            numeric_features = df.select_dtypes(include=[np.number]).columns
-            df_model = df[numeric_features].dropna().copy()
-            
-            # Scale the features
-            scaler = StandardScaler()
-            X = scaler.fit_transform(df_model)
-            
-            # Predict anomalies
-            iso_pred = np.where(self.iso_model.predict(X) == -1, 1, 0)
-            iso_anomaly_pct = iso_pred.mean() * 100
-            
-            # Add anomaly labels to the original dataframe
-            df['anomaly_label'] = 0
-            df.loc[df_model.index, 'anomaly_label'] = iso_pred
-            
-            # Prepare visualization data
-            time_series_data = self._prepare_time_series_data(df)
-            regional_data = self._prepare_regional_data(df)
-            transaction_types = self._prepare_transaction_types(df)
-            
-            # Calculate statistics
-            stats = {
-                'total_records': len(df),
-                'anomaly_count': int(iso_pred.sum()),
-                'detection_rate': float(iso_anomaly_pct),
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            # Score every row once and add the labels and scores to the original dataframe
+            model = self.current_model()
+            scores = self._label(df, model)
+            self._cache_scores(file_hash, scores, model)
             
-            # Convert DataFrame to records, handling NaT and Timestamp values
-            records = []
-            for _, row in df.iterrows():
-                record = {}
-                for col in df.columns:
-                    value = row[col]
-                    if pd.isna(value):
-                        record[col] = None
-                    elif isinstance(value, pd.Timestamp):
-                        record[col] = value.strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        record[col] = value
-                records.append(record)
+            # Prepare visualization data in a single aggregation pass
+            charts = AnomalyAggregator().update(df).charts()
             
             # Prepare the response
             response = {
-                'anomalies': records,
-                'statistics': stats,
-                'time_series': time_series_data,
-                'regional_distribution': regional_data,
-                'transaction_types': transaction_types
+                'anomalies': self._records(df, anomalies_only, columns),
+                'statistics': self._statistics(len(df), int(df['anomaly_label'].sum()), int(np.isfinite(scores).sum())),
+                'time_series': charts['time_series'],
+                'regional_distribution': charts['regional_distribution'],
+                'transaction_types': charts['transaction_types'],
+                'file_hash': file_hash
             }
             
             return response
             
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Error processing file: {str(e)}")
-    
-    def _prepare_time_series_data(self, df):
-        """Prepare time series data for visualization"""
-        # Group by timestamp and count normal/anomalous transactions
-        df['timestamp'] = pd.to_datetime(df['origination_date'], errors='coerce')
-        # Drop rows with NaT values
-        df = df.dropna(subset=['timestamp'])
-        
-        time_series = df.groupby('timestamp').agg({
-            'anomaly_label': [
-                ('normal_count', lambda x: (x == 0).sum()),
-                ('anomaly_count', lambda x: (x == 1).sum())
-            ]
-        }).reset_index()
-        
-        # Flatten column names
-        time_series.columns = ['timestamp', 'normal_count', 'anomaly_count']
-        
-        return {
-            'timestamps': time_series['timestamp'].dt.strftime('%Y-%m-%d').tolist(),
-            'normal_count': time_series['normal_count'].tolist(),
-            'anomaly_count': time_series['anomaly_count'].tolist()
-        }
-    
-    def _prepare_regional_data(self, df):
-        """Prepare regional distribution data"""
-        # Drop rows with NaT values in country
-        df = df.dropna(subset=['country'])
-        
-        # Group by country and count total transactions and anomalies
-        regional = df.groupby('country').agg({
-            'anomaly_label': [
-                ('total_transactions', 'count'),
-                ('anomalies', lambda x: (x == 1).sum())
-            ]
-        }).reset_index()
-        
-        # Flatten column names
-        regional.columns = ['country', 'total_transactions', 'anomalies']
-        
-        return {
-            'regions': regional['country'].tolist(),
-            'total_transactions': regional['total_transactions'].tolist(),
-            'anomalies': regional['anomalies'].tolist()
+
+    def stream_anomalies(self, csv_file_path, anomalies_only=False, columns=None, chunksize=None, file_hash=None):
+        """
+        Predicts anomalies chunk by chunk, yielding record batches as each chunk is scored.
+
+        Yields lists of {"type": "record"} records and finally a {"type": "summary"}
+        record with the statistics and chart data of the whole file. Missing
+        model features and unknown columns raise ValueError before anything
+        is yielded.
+        """
+        model = self.current_model()
+        header = pd.read_csv(csv_file_path, nrows=0)
+        self._feature_matrix(header, model)
+        columns = self._projection(header.columns, columns)
+
+        def batches():
+            aggregator = AnomalyAggregator()
+            total_records = anomaly_count = 0
+            chunk_scores = []
+            with pd.read_csv(csv_file_path, chunksize=chunksize or Config.ANOMALY_CHUNK_SIZE) as reader:
+                for chunk in reader:
+                    chunk_scores.append(self._label(chunk, model))
+                    aggregator.update(chunk)
+                    total_records += len(chunk)
+                    anomaly_count += int(chunk['anomaly_label'].sum())
+                    yield [{'type': 'record', 'data': record}
+                           for record in self._records(chunk, anomalies_only, columns)]
+
+            scores = np.concatenate(chunk_scores) if chunk_scores else np.zeros(0)
+            self._cache_scores(file_hash, scores, model)
+            yield [{'type': 'summary', 'data': {
+                'statistics': self._statistics(total_records, anomaly_count, int(np.isfinite(scores).sum())),
+                **aggregator.charts(),
+                'file_hash': file_hash
+            }}]
+        return batches()
+
+    def score_batches(self, csv_file_path, columns=None, chunksize=None, file_hash=None):
+        """
+        Row-level anomaly labels and scores of a CSV file, one DataFrame per chunk.
+
+        Returns the Arrow column types of the batches and an iterator over
+        them. Each batch has the 1-based row_index, the requested ``columns``
+        (model features as numbers, other columns as raw text), anomaly_label
+        and anomaly_score (NaN for rows whose features cannot be parsed, which
+        are labelled normal). Unknown columns and missing features raise
+        ValueError before any batch is produced; the file's scores are cached
+        once the last batch has been.
+        """
+        model = self.current_model()
+        header = pd.read_csv(csv_file_path, nrows=0)
+        self._feature_matrix(header, model)
+        columns = [column for column in self._projection(header.columns, columns) or []
+                   if column not in ('anomaly_label', 'anomaly_score')]
+        features = set(model.features)
+        schema = {
+            'row_index': 'int64',
+            **{column: 'float64' if column in features else 'string' for column in columns},
+            'anomaly_label': 'int8',
+            'anomaly_score': 'float64'
         }
-    
-    def _prepare_transaction_types(self, df):
-        """Prepare transaction type distribution data"""
-        # Drop rows with NaT values in credit_facility_type
-        df = df.dropna(subset=['credit_facility_type'])
-        
-        # Group by credit facility type and count normal/anomalous transactions
-        type_dist = df.groupby('credit_facility_type').agg({
-            'anomaly_label': [
-                ('normal_count', lambda x: (x == 0).sum()),
-                ('anomaly_count', lambda x: (x == 1).sum())
-            ]
-        }).reset_index()
-        
-        # Flatten column names
-        type_dist.columns = ['credit_facility_type', 'normal_count', 'anomaly_count']
-        
-        return {
-            'types': type_dist['credit_facility_type'].tolist(),
-            'normal_count': type_dist['normal_count'].tolist(),
-            'anomaly_count': type_dist['anomaly_count'].tolist()
+
+        def batches():
+            scores = []
+            row_offset = 0
+            # Text columns keep one type across chunks; feature columns are parsed as the model sees them
+            text_columns = {column: str for column in columns if column not in features}
+            with pd.read_csv(csv_file_path, dtype=text_columns,
+                             chunksize=chunksize or Config.ANOMALY_CHUNK_SIZE) as reader:
+                for chunk in reader:
+                    scores.append(self._label(chunk, model))
+                    table = chunk[[*columns, 'anomaly_label', 'anomaly_score']].reset_index(drop=True)
+                    for column in columns:
+                        if column in features:
+                            table[column] = pd.to_numeric(table[column], errors='coerce')
+                    table.insert(0, 'row_index', np.arange(row_offset + 1, row_offset + len(chunk) + 1))
+                    yield table.astype({'anomaly_label': np.int8})
+                    row_offset += len(chunk)
+            if scores:
+                self._cache_scores(file_hash, np.concatenate(scores), model)
+        return schema, batches()
+
+    def rethreshold(self, file_hash, contamination=None, score_cutoff=None, include_rows=False):
+        """
+        Relabels a previously scored file against its cached scores, without reading or scoring it again.
+
+        Rows scoring below the cutoff are anomalies. The cutoff is ``score_cutoff``
+        (in decision_function units, where 0 is the model's own threshold), or the
+        ``contamination`` quantile of the file's scores; with neither, 0.
+
+        Returns None when no scores are cached for the file and the current model.
+        """
+        if contamination is not None and score_cutoff is not None:
+            raise ValueError("Give either contamination or score_cutoff, not both")
+        if contamination is not None and not 0 < contamination <= 0.5:
+            raise ValueError("contamination must be in (0, 0.5]")
+
+        scores = self.score_cache.get(score_key(file_hash, self.current_model().digest))
+        if scores is None:
+            return None
+
+        scored = scores[np.isfinite(scores)]
+        if contamination is not None:
+            threshold = float(np.quantile(scored, contamination)) if len(scored) else 0.0
+        else:
+            threshold = float(score_cutoff or 0.0)
+        # NaN scores (unscoreable rows) compare False and stay normal
+        anomalous = scores < threshold
+
+        result = {
+            'file_hash': file_hash,
+            'threshold': threshold,
+            'contamination': contamination,
+            'statistics': self._statistics(len(scores), int(anomalous.sum()), len(scored))
         }
+        if include_rows:
+            result['anomaly_rows'] = (np.flatnonzero(anomalous) + 1).tolist()
+        return result
@@ -0,0 +1,15 @@
+from ..config import Config
+
+# Detail levels of validation results, kept apart from the validation engine so
+# request parsers can list them without importing pandas
+DETAIL_LEVELS = ('summary', 'violations', 'full')
+DEFAULT_DETAIL = 'violations'
+
+
+def buffered_page_limit(limit: int = None) -> int:
+    """Row records per page of a buffered JSON validation response
+
+    The response holds its whole page in memory, so the page is capped at
+    VALIDATION_PAGE_LIMIT (also the default); the NDJSON stream is unbounded.
+    """
+    return min(limit or Config.VALIDATION_PAGE_LIMIT, Config.VALIDATION_PAGE_LIMIT)
@@ -0,0 +1,112 @@
+import os
+import logging
+import threading
+from typing import Callable, Optional
+
+
+class FileLRUCache:
+    """Directory of cache entry files bounded by their total size.
+
+    Each entry is a file named after its key, written to a temporary file and
+    renamed into place so workers reading the directory never see a partial
+    entry. Reads refresh the file mtime, so eviction removes the least
+    recently used entries once the directory grows past ``max_bytes``.
+    Subclasses define the entry format in their get/put methods.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, suffix: str, name: str):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.name = name
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.logger = logging.getLogger(type(self).__module__)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{os.path.basename(key)}{self.suffix}')
+
+    def _read(self, key: str, load: Callable[[str], object]) -> Optional[object]:
+        """``load(path)`` of the entry of a key, None when it is missing or unreadable"""
+        entry_path = self._entry_path(key)
+        try:
+            value = load(entry_path)
+            os.utime(entry_path)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def _write(self, key: str, dump: Callable, mode: str = 'w'):
+        """Write the entry of a key with ``dump(file)`` and evict old entries past the size bound"""
+        entry_path = self._entry_path(key)
+        temp_path = f'{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, mode) as f:
+                dump(f)
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.evict()
+
+    def _entries(self):
+        """(mtime, size, path) of every cache entry, oldest first"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        removed = 0
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+        if removed:
+            self.logger.info(f"Evicted {removed} {self.name} cache entries")
+        return removed
+
+    def purge(self) -> int:
+        """Remove every cache entry"""
+        removed = 0
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def stats(self) -> dict:
+        """Entry count, size on disk and hit/miss counters"""
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
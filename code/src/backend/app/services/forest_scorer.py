@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Rows of the synthetic batch scored by both paths when a model is loaded
+PARITY_PROBE_ROWS = 256
+
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """Average path length of an unsuccessful search in a binary tree of ``n_samples`` nodes"""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros(n_samples.shape)
+    lengths[n_samples == 2] = 1.0
+    large = n_samples > 2
+    lengths[large] = (2.0 * (np.log(n_samples[large] - 1.0) + np.euler_gamma)
+                      - 2.0 * (n_samples[large] - 1.0) / n_samples[large])
+    return lengths
+
+
+class CompiledForest:
+    """A fitted scaler + IsolationForest pipeline flattened into numpy arrays for low-latency scoring.
+
+    Every tree's nodes are concatenated into shared feature/threshold/child
+    arrays, with the path length credited at each leaf precomputed, so a
+    batch is scored by walking all trees at once, one level per step,
+    instead of through sklearn's per-tree input validation and dispatch.
+    Scores equal ``pipeline.decision_function``; the flattening reads sklearn
+    tree internals, so ``matches`` checks that on every load.
+    """
+    # Everything scoring needs, stored in model artifacts as plain arrays
+    STATE = ('mean', 'scale', 'offset', 'feature', 'threshold', 'left', 'right', 'leaf_length', 'roots',
+             'max_depth', 'normalizer')
+
+    def __init__(self, pipeline):
+        scaler, forest = pipeline.steps[0][1], pipeline.steps[-1][1]
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64) if getattr(scaler, 'with_mean', True) else None
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64) if getattr(scaler, 'with_std', True) else None
+        self.offset = float(forest.offset_)
+
+        features, thresholds, lefts, rights, leaf_lengths, roots = [], [], [], [], [], []
+        base = 0
+        for estimator, estimator_features in zip(forest.estimators_, forest.estimators_features_):
+            tree = estimator.tree_
+            left, right = tree.children_left, tree.children_right
+            is_leaf = left == -1
+
+            # Depth of every node (children always follow their parent)
+            depth = np.zeros(tree.node_count)
+            for node in range(tree.node_count):
+                if not is_leaf[node]:
+                    depth[left[node]] = depth[right[node]] = depth[node] + 1
+
+            # Leaves point to themselves so finished paths stay put
+            nodes = np.arange(tree.node_count)
+            features.append(np.where(is_leaf, 0, np.asarray(estimator_features)[np.maximum(tree.feature, 0)]))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, left) + base)
+            rights.append(np.where(is_leaf, nodes, right) + base)
+            leaf_lengths.append(depth + average_path_length(tree.n_node_samples))
+            roots.append(base)
+            base += tree.node_count
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.leaf_length = np.concatenate(leaf_lengths)
+        self.roots = np.asarray(roots)
+        self.max_depth = max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        self.normalizer = len(forest.estimators_) * float(average_path_length([forest.max_samples_])[0])
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.STATE}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, object]) -> 'CompiledForest':
+        """Rebuild from ``to_dict`` output; memory-mapped arrays are used in place"""
+        forest = cls.__new__(cls)
+        for name in cls.STATE:
+            setattr(forest, name, state[name])
+        return forest
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> Optional['CompiledForest']:
+        """Compile a pipeline, or None when it is not a scaler followed by an IsolationForest"""
+        try:
+            return cls(pipeline)
+        except (AttributeError, IndexError, TypeError):
+            return None
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Anomaly scores of a 2-D float array of features (negative for anomalies)"""
+        X = np.asarray(X, dtype=np.float64)
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        # sklearn trees compare float32 inputs against their float64 thresholds
+        X = X.astype(np.float32).astype(np.float64)
+
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        path_lengths = self.leaf_length[nodes].sum(axis=1)
+        if self.normalizer == 0:
+            return np.full(len(X), -1.0 - self.offset)
+        return -(2.0 ** (-path_lengths / self.normalizer)) - self.offset
+
+    def matches(self, pipeline, features: List[str], rows: int = PARITY_PROBE_ROWS, atol: float = 1e-9) -> bool:
+        """Whether scores equal ``pipeline.decision_function`` on a probe batch spread around the training data"""
+        mean = self.mean if self.mean is not None else np.zeros(len(features))
+        scale = self.scale if self.scale is not None else np.ones(len(features))
+        probe = mean + scale * np.random.default_rng(0).normal(scale=2.0, size=(rows, len(features)))
+        try:
+            expected = pipeline.decision_function(pd.DataFrame(probe, columns=features))
+            return bool(np.allclose(self.decision_function(probe), expected, rtol=0, atol=atol))
+        except (IndexError, ValueError):
+            return False
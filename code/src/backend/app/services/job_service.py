@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from ..config import Config
+from .registry import get_rulebook_service
+
+
+class JobService:
+    """Runs long rulebook ingestion work off the request path.
+
+    Jobs are executed on a bounded thread pool and their records are persisted
+    as JSON under ``Config.JOBS_FOLDER`` so any worker can answer status polls.
+    Statuses follow the Rulebook model: PENDING, PROCESSING, COMPLETED, FAILED.
+    Records untouched for ``Config.JOB_RETENTION_SECONDS`` are removed when a
+    new job is queued.
+    Under the ASGI entry point, coroutine jobs run as tasks on the event loop
+    instead, at most ASYNC_INGESTION_CONCURRENCY at a time.
+    """
+
+    def __init__(self, jobs_dir: str = None, max_workers: int = None, retention_seconds: int = None):
+        self.jobs_dir = jobs_dir or Config.JOBS_FOLDER
+        self.retention_seconds = retention_seconds or Config.JOB_RETENTION_SECONDS
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.INGESTION_WORKERS,
+            thread_name_prefix='rulebook-ingestion'
+        )
+        self._lock = threading.Lock()
+        self._async_slots = asyncio.Semaphore(Config.ASYNC_INGESTION_CONCURRENCY)
+        # Running tasks, referenced until they finish so they are not garbage collected
+        self._tasks = set()
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f'{job_id}.json')
+
+    def _save_job(self, job: dict):
+        """Atomically write a job record so pollers never see a partial file"""
+        job_path = self._job_path(job['job_id'])
+        temp_path = f'{job_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(job, f, default=str)
+        os.replace(temp_path, job_path)
+
+    def _update_job(self, job: dict, **fields):
+        with self._lock:
+            job.update(fields)
+            self._save_job(job)
+
+    def _new_job(self, job_type: str, rulebook_uuid: str) -> dict:
+        self.prune()
+        job = {
+            'job_id': str(uuid.uuid4()),
+            'job_type': job_type,
+            'rulebook_uuid': rulebook_uuid,
+            'status': 'PENDING',
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'error': None,
+            'worker_pid': os.getpid()
+        }
+        self._save_job(job)
+        self.logger.info(f"Queued {job_type} job {job['job_id']} for rulebook {rulebook_uuid}")
+        return job
+
+    def submit(self, job_type: str, rulebook_uuid: str, func, *args) -> dict:
+        """Queue ``func(*args)`` and return the new job record"""
+        job = self._new_job(job_type, rulebook_uuid)
+        # Copied before the worker can start updating the record
+        queued = dict(job)
+        self.executor.submit(self._run, job, func, *args)
+        return queued
+
+    async def submit_async(self, job_type: str, rulebook_uuid: str, coro_func, *args) -> dict:
+        """Schedule ``await coro_func(*args)`` on the running event loop and return the new job record"""
+        job = await asyncio.to_thread(self._new_job, job_type, rulebook_uuid)
+        task = asyncio.create_task(self._run_async(job, coro_func, *args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return dict(job)
+
+    def _run(self, job: dict, func, *args):
+        self._update_job(job, status='PROCESSING', started_at=datetime.now().isoformat())
+        try:
+            func(*args)
+            self._update_job(job, status='COMPLETED', finished_at=datetime.now().isoformat())
+        except Exception as e:
+            self.logger.error(f"Job {job['job_id']} failed: {str(e)}")
+            self._update_job(job, status='FAILED', finished_at=datetime.now().isoformat(), error=str(e))
+
+    async def _run_async(self, job: dict, coro_func, *args):
+        async with self._async_slots:
+            await asyncio.to_thread(self._update_job, job, status='PROCESSING', started_at=datetime.now().isoformat())
+            try:
+                await coro_func(*args)
+                fields = {'status': 'COMPLETED'}
+            except Exception as e:
+                self.logger.error(f"Job {job['job_id']} failed: {str(e)}")
+                fields = {'status': 'FAILED', 'error': str(e)}
+            await asyncio.to_thread(self._update_job, job, finished_at=datetime.now().isoformat(), **fields)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Get a job record by ID"""
+        job_path = self._job_path(os.path.basename(job_id))
+        if not os.path.exists(job_path):
+            return None
+
+        with open(job_path, 'r') as f:
+            job = json.load(f)
+
+        # A job still open whose worker process is gone will never finish; neither will its rulebook
+        if job['status'] in ('PENDING', 'PROCESSING') and not self._is_alive(job.get('worker_pid')):
+            error = 'Worker process exited before the job finished'
+            self._update_job(job, status='FAILED', finished_at=datetime.now().isoformat(), error=error)
+            get_rulebook_service().fail_abandoned(job['rulebook_uuid'], error)
+        return job
+
+    def prune(self):
+        """Remove job records older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        for name in os.listdir(self.jobs_dir):
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                continue
+
+    @staticmethod
+    def _is_alive(pid) -> bool:
+        if not pid:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
@@ -0,0 +1,173 @@
+import os
+import json
+import shutil
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import joblib
+from ..config import Config
+from .forest_scorer import CompiledForest
+from .rule_cache import file_digest
+
+# Pipeline shipped with the code, served until a trained version is published
+BUNDLED_MODEL_PATH = Path(__file__).parent / 'iso_pipeline.joblib'
+
+ARTIFACT_NAME = 'model.joblib'
+METADATA_NAME = 'metadata.json'
+POINTER_NAME = 'CURRENT'
+
+
+def model_artifact(pipeline, features: List[str]) -> dict:
+    """Contents of a model artifact: the pipeline, its ordered features and its flattened forest"""
+    artifact = {'pipeline': pipeline, 'features': features}
+    forest = CompiledForest.from_pipeline(pipeline)
+    if forest is not None:
+        artifact['forest'] = forest.to_dict()
+    return artifact
+
+
+def dump_model_artifact(pipeline, features: List[str], path):
+    """Write a model artifact atomically; workers may have the previous file memory-mapped"""
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    # Uncompressed, so the arrays can be memory-mapped on load
+    joblib.dump(model_artifact(pipeline, features), temp_path)
+    os.replace(temp_path, path)
+
+
+@dataclass(frozen=True)
+class AnomalyModel:
+    """A loaded scaler + IsolationForest pipeline with everything derived from it.
+
+    Instances are never mutated: a new model version is loaded into a new
+    instance and swapped in with a single assignment.
+    """
+    pipeline: object
+    features: List[str]
+    forest: Optional[CompiledForest]
+    # Digest of the artifact file; cached scores are only valid for the model that produced them
+    digest: str
+    version: Optional[str] = None
+
+    @classmethod
+    def load(cls, path, version: str = None, mmap_mode: Optional[str] = None) -> 'AnomalyModel':
+        """Load an artifact; with ``mmap_mode`` its arrays are mapped from the page cache shared by all workers
+
+        sklearn copies tree nodes into private memory when unpickling, so the
+        flattened forest stored with the artifact is what stays shared. It is
+        only used when it scores a probe batch exactly like the pipeline.
+        """
+        artifact = joblib.load(path, mmap_mode=mmap_mode)
+        if 'forest' in artifact:
+            forest = CompiledForest.from_dict(artifact['forest'])
+        else:
+            forest = CompiledForest.from_pipeline(artifact['pipeline'])
+        if forest is not None and not forest.matches(artifact['pipeline'], artifact['features']):
+            # A different sklearn version can lay out its trees differently; score through the pipeline
+            logging.getLogger(__name__).warning(f"Compiled forest of {path} does not match its pipeline, not using it")
+            forest = None
+        return cls(
+            pipeline=artifact['pipeline'],
+            features=artifact['features'],
+            forest=forest,
+            digest=file_digest(path),
+            version=version
+        )
+
+
+class ModelRegistry:
+    """Versioned anomaly model artifacts with an atomically switched current version.
+
+    Each version is a directory ``<root>/<version>/`` holding the pipeline
+    artifact and its training metadata. It is written under a temporary name
+    and renamed into place, and the ``CURRENT`` pointer naming the active
+    version is replaced atomically, so a worker always sees a complete
+    version, old or new.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or Config.MODEL_REGISTRY_FOLDER
+        os.makedirs(self.root, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+
+    def _version_dir(self, version: str) -> str:
+        return os.path.join(self.root, os.path.basename(version))
+
+    def _pointer_path(self) -> str:
+        return os.path.join(self.root, POINTER_NAME)
+
+    def artifact_path(self, version: str) -> str:
+        return os.path.join(self._version_dir(version), ARTIFACT_NAME)
+
+    def publish(self, pipeline, features: List[str], metadata: dict, activate: bool = True) -> dict:
+        """Store a fitted pipeline as a new version and optionally make it current"""
+        version = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        version_dir = self._version_dir(version)
+        temp_dir = os.path.join(self.root, f'.{version}.{os.getpid()}.tmp')
+        os.makedirs(temp_dir)
+        try:
+            dump_model_artifact(pipeline, features, os.path.join(temp_dir, ARTIFACT_NAME))
+            metadata = {**metadata, 'version': version, 'published_at': datetime.now().isoformat()}
+            with open(os.path.join(temp_dir, METADATA_NAME), 'w') as f:
+                json.dump(metadata, f, default=str, indent=2)
+            os.rename(temp_dir, version_dir)
+        finally:
+            if os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir)
+
+        self.logger.info(f"Published anomaly model version {version}")
+        if activate:
+            self.activate(version)
+        return metadata
+
+    def activate(self, version: str):
+        """Make a published version the one served by every worker"""
+        if not os.path.exists(self.artifact_path(version)):
+            raise ValueError(f"Model version {version} not found")
+        pointer_path = self._pointer_path()
+        temp_path = f'{pointer_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(version)
+        os.replace(temp_path, pointer_path)
+        self.logger.info(f"Activated anomaly model version {version}")
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(self._pointer_path(), 'r') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def pointer_state(self) -> Optional[tuple]:
+        """Identity of the CURRENT pointer file, which changes whenever a version is activated"""
+        try:
+            stat = os.stat(self._pointer_path())
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def metadata(self, version: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self._version_dir(version), METADATA_NAME), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def versions(self) -> List[dict]:
+        """Metadata of every published version, oldest first"""
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            if name.startswith('.') or not os.path.isdir(os.path.join(self.root, name)):
+                continue
+            metadata = self.metadata(name)
+            if metadata:
+                found.append(metadata)
+        return found
+
+    def load_current(self) -> AnomalyModel:
+        """Load the current version, or the bundled pipeline when none has been published"""
+        version = self.current_version()
+        if version is None:
+            return AnomalyModel.load(BUNDLED_MODEL_PATH, mmap_mode=Config.MODEL_MMAP_MODE)
+        return AnomalyModel.load(self.artifact_path(version), version, mmap_mode=Config.MODEL_MMAP_MODE)
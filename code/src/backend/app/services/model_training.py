@@ -0,0 +1,117 @@
+import time
+import logging
+from datetime import datetime
+from typing import List, Tuple, Union
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import IsolationForest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from ..config import Config
+from .rule_cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+
+def parse_max_samples(value: str) -> Union[str, int, float]:
+    """'auto', a row count or a fraction of the training rows, as given on a command line"""
+    if value == 'auto':
+        return value
+    return float(value) if '.' in value else int(value)
+
+
+def numeric_features(data_path: str, chunksize: int) -> List[str]:
+    """Columns numeric in every chunk, in file order (the columns a full read would type as numeric)"""
+    features = None
+    with pd.read_csv(data_path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            numeric = set(chunk.select_dtypes(include=[np.number]).columns)
+            features = [column for column in (chunk.columns if features is None else features) if column in numeric]
+    if not features:
+        raise ValueError(f"{data_path} has no numeric columns to train on")
+    return features
+
+
+def train_pipeline(data_path: str, chunksize: int = None, sample_rows: int = None,
+                   max_samples: Union[str, int, float] = 'auto', n_estimators: int = 100,
+                   contamination: float = 0.15, random_state: int = 42, n_jobs: int = -1) -> Tuple[Pipeline, List[str], dict]:
+    """Fit the scaler + IsolationForest pipeline served by AnomalyService on a CSV file, chunk by chunk.
+
+    The scaler is fitted incrementally on every complete row. The forest is
+    fitted on a uniform sample of at most ``sample_rows`` of those rows, kept
+    in file order, so memory is bounded by the sample rather than the file;
+    when the file fits, this is the whole file and the result equals fitting
+    on a single read. Each tree draws ``max_samples`` rows of it. Returns the
+    pipeline, its ordered features and training statistics.
+    """
+    chunksize = chunksize or Config.TRAINING_CHUNK_SIZE
+    sample_rows = sample_rows or Config.TRAINING_SAMPLE_ROWS
+    started = time.perf_counter()
+
+    features = numeric_features(data_path, chunksize)
+    rng = np.random.default_rng(random_state)
+    scaler = StandardScaler()
+    sample = None
+    sample_keys = np.empty(0)
+    rows_seen = rows_complete = 0
+
+    with pd.read_csv(data_path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            rows_seen += len(chunk)
+            X = chunk[features].dropna()
+            if not len(X):
+                continue
+            rows_complete += len(X)
+            scaler.partial_fit(X)
+
+            # Reservoir sample: keep the rows with the smallest random keys
+            sample = X if sample is None else pd.concat([sample, X])
+            sample_keys = np.concatenate([sample_keys, rng.random(len(X))])
+            if len(sample) > sample_rows:
+                keep = np.sort(np.argpartition(sample_keys, sample_rows)[:sample_rows])
+                sample, sample_keys = sample.iloc[keep], sample_keys[keep]
+
+    if sample is None:
+        raise ValueError(f"{data_path} has no rows with every numeric feature present")
+
+    model = IsolationForest(n_estimators=n_estimators, max_samples=max_samples, contamination=contamination,
+                            random_state=random_state, n_jobs=n_jobs)
+    X_train = scaler.transform(sample)
+    model.fit(X_train)
+    pipeline = Pipeline([('scaler', scaler), ('model', model)])
+
+    scores = model.decision_function(X_train)
+    stats = {
+        'data_path': str(data_path),
+        'data_sha256': file_digest(data_path),
+        'rows_seen': rows_seen,
+        'rows_complete': rows_complete,
+        'rows_trained': len(sample),
+        'feature_count': len(features),
+        'params': {
+            'n_estimators': n_estimators,
+            'max_samples': max_samples,
+            'max_samples_drawn': int(model.max_samples_),
+            'contamination': contamination,
+            'random_state': random_state,
+            'chunksize': chunksize,
+            'sample_rows': sample_rows
+        },
+        'training_anomaly_rate': float((scores < 0).mean()),
+        'score_quantiles': {str(q): float(v) for q, v in zip((0.01, 0.05, 0.5, 0.95), np.quantile(scores, (0.01, 0.05, 0.5, 0.95)))},
+        'sklearn_version': sklearn.__version__,
+        'trained_at': datetime.now().isoformat(),
+        'training_seconds': round(time.perf_counter() - started, 3)
+    }
+    logger.info(f"Trained anomaly model on {len(sample)} of {rows_seen} rows in {stats['training_seconds']}s")
+    return pipeline, features, stats
+
+
+def train_and_publish(data_path: str, registry=None, activate: bool = True, **params) -> dict:
+    """Train a pipeline on a CSV file and publish it as a new registry version"""
+    from .model_registry import ModelRegistry
+
+    registry = registry or ModelRegistry()
+    pipeline, features, stats = train_pipeline(data_path, **params)
+    return registry.publish(pipeline, features, {**stats, 'features': features}, activate=activate)
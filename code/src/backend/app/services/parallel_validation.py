@@ -0,0 +1,83 @@
+import json
+import hashlib
+from collections import OrderedDict, deque
+from itertools import chain
+from typing import Iterable, Iterator, List, Union
+import pandas as pd
+from .process_pool import get_process_pool
+from .validation_engine import DEFAULT_DETAIL, PartitionResult, ResultSink, ValidationEngine, ValidationRun
+
+# Engines compiled by the current worker process, by rule specs digest (least recently used first)
+_worker_engines = OrderedDict()
+WORKER_ENGINE_CACHE_SIZE = 8
+
+
+def specs_digest(rule_specs: List[dict]) -> str:
+    """SHA-256 hex digest identifying a list of rule specs"""
+    return hashlib.sha256(json.dumps(rule_specs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _worker_engine(digest: str, rule_specs: List[dict]) -> ValidationEngine:
+    engine = _worker_engines.pop(digest, None) or ValidationEngine(rule_specs)
+    _worker_engines[digest] = engine
+    while len(_worker_engines) > WORKER_ENGINE_CACHE_SIZE:
+        _worker_engines.popitem(last=False)
+    return engine
+
+
+def _validate_partition(digest: str, rule_specs: List[dict], df: pd.DataFrame, row_offset: int,
+                        sink: ResultSink, quarantined: dict) -> PartitionResult:
+    engine = _worker_engine(digest, rule_specs)
+    return engine.validate_partition(df, row_offset, sink, quarantined=quarantined)
+
+
+class ParallelValidator:
+    """Validates the partitions of a file across the shared process pool.
+
+    Partitions are shipped with their row offset and the rule specs; a worker
+    compiles the specs of a rulebook once and keeps the engine for later
+    partitions and requests. Partial results are merged in submission order,
+    so the result is identical to a serial run. At most ``max_pending``
+    partitions are in flight to bound memory.
+    """
+
+    def __init__(self, engine: ValidationEngine, workers: int, max_pending: int = None):
+        self.engine = engine
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+
+    def validate_chunks(self, chunks: Iterable[pd.DataFrame], detail: Union[str, ResultSink] = DEFAULT_DETAIL) -> dict:
+        """Validate DataFrame partitions and return the rulebook validation result"""
+        run = ValidationRun(self.engine, detail)
+        for _ in self.run_chunks(run, chunks):
+            pass
+        return run.result()
+
+    def run_chunks(self, run: ValidationRun, chunks: Iterable[pd.DataFrame]) -> Iterator[List[dict]]:
+        """Validate partitions into ``run``, yielding the row records each one adds, in file order"""
+        chunks = iter(chunks)
+        head = [chunk for chunk in (next(chunks, None), next(chunks, None)) if chunk is not None]
+
+        # A single partition is not worth starting a pool for
+        if self.workers < 2 or len(head) < 2:
+            yield from self.engine.run_chunks(run, chain(head, chunks))
+            return
+
+        executor = get_process_pool(self.workers)
+        rule_specs = self.engine.rule_specs
+        digest = specs_digest(rule_specs)
+        pending = deque()
+        row_offset = 0
+        try:
+            for chunk in chain(head, chunks):
+                pending.append(executor.submit(_validate_partition, digest, rule_specs, chunk, row_offset,
+                                               run.sink, dict(run.quarantined)))
+                row_offset += len(chunk)
+                if len(pending) >= self.max_pending:
+                    yield run.merge(pending.popleft().result())
+            while pending:
+                yield run.merge(pending.popleft().result())
+        finally:
+            # The pool outlives the request: drop partitions still queued if the caller stopped early
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,104 @@
+from typing import List, Tuple
+import pdfplumber
+from ..config import Config
+from .process_pool import get_process_pool
+
+# Top and bottom bands of each page treated as header/footer (fraction of height)
+HEADER_RATIO = 0.1
+FOOTER_RATIO = 0.9
+
+# Words whose tops are closer than this (in points) belong to the same line
+LINE_TOLERANCE = 5
+
+# Lines containing these fragments are page furniture, not regulatory text
+SKIP_FRAGMENTS = ('page', 'confidential', 'all rights reserved')
+
+# Lines outside these lengths are headings or table rows
+MIN_LINE_LENGTH = 20
+MAX_LINE_LENGTH = 200
+
+
+def page_lines(page) -> List[str]:
+    """Extract the relevant text lines of one page.
+
+    Header and footer bands are cropped away geometrically, words are
+    extracted once and bucketed into lines by their y-coordinate in a
+    single pass.
+    """
+    x0, top, x1, bottom = page.bbox
+    height = bottom - top
+    body = page.crop((x0, top + height * HEADER_RATIO, x1, top + height * FOOTER_RATIO))
+
+    words = body.extract_words(
+        keep_blank_chars=True,
+        use_text_flow=True,
+        horizontal_ltr=True,
+        vertical_ttb=True,
+        x_tolerance=3,
+        y_tolerance=3
+    )
+
+    # Group words into lines
+    lines = []
+    current_line = []
+    current_y = None
+    for word in words:
+        if current_y is not None and abs(word['top'] - current_y) < LINE_TOLERANCE:
+            current_line.append(word['text'])
+            continue
+        if current_line:
+            lines.append(' '.join(current_line))
+        current_line = [word['text']]
+        current_y = word['top']
+    if current_line:
+        lines.append(' '.join(current_line))
+
+    # Filter headings, page furniture and table rows
+    relevant = []
+    for line in lines:
+        line = line.strip()
+        if not MIN_LINE_LENGTH <= len(line) <= MAX_LINE_LENGTH:
+            continue
+        lowered = line.lower()
+        if any(fragment in lowered for fragment in SKIP_FRAGMENTS):
+            continue
+        relevant.append(line)
+    return relevant
+
+
+def extract_page_range(pdf_path: str, first_page: int, last_page: int) -> List[str]:
+    """Relevant text lines of pages [first_page, last_page) (0-based)"""
+    lines = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[first_page:last_page]:
+            lines.extend(page_lines(page))
+            # Release the page's parsed objects; long documents otherwise accumulate them
+            page.flush_cache()
+    return lines
+
+
+def extract_page_ranges(pdf_path: str, ranges: List[Tuple[int, int]], workers: int = None) -> List[List[str]]:
+    """Relevant text lines of every page range, in order
+
+    Ranges are processed in the shared process pool when there is more than
+    one of them and more than one worker (PDF_EXTRACTION_WORKERS by default).
+    """
+    workers = workers or Config.PDF_EXTRACTION_WORKERS
+    if workers < 2 or len(ranges) < 2:
+        return [extract_page_range(pdf_path, first, last) for first, last in ranges]
+    executor = get_process_pool(min(workers, len(ranges)))
+    futures = [executor.submit(extract_page_range, pdf_path, first, last) for first, last in ranges]
+    return [future.result() for future in futures]
+
+
+def extract_text(pdf_path: str, workers: int = None, pages_per_task: int = 8) -> str:
+    """Extract relevant regulatory text from a PDF, page ranges in parallel; results are joined in page order"""
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+    lines = [line for range_lines in extract_page_ranges(pdf_path, ranges, workers) for line in range_lines]
+
+    # Remove common PDF artifacts and normalize whitespace
+    extracted_text = '\n'.join(lines).replace('\x0c', '')
+    return ' '.join(extracted_text.split())
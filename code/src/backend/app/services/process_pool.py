@@ -0,0 +1,47 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Process pool of the current process, built on first use and reused by every request
+_pool = None
+_pool_pid = None
+_pool_workers = 0
+_lock = threading.Lock()
+
+
+def _start_context():
+    """Start method for pool workers: never fork, the server process runs request threads"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Long-lived process pool with at least ``workers`` processes.
+
+    Forking a multi-threaded process can copy a lock held by another thread
+    into the child and deadlock it, so workers are started through a
+    forkserver (spawn where it is unavailable). The pool is rebuilt larger
+    when more workers are asked for, after it breaks, and in a forked child.
+    """
+    global _pool, _pool_pid, _pool_workers
+    with _lock:
+        stale = _pool is None or _pool_pid != os.getpid() or getattr(_pool, '_broken', False)
+        if stale or _pool_workers < workers:
+            if _pool is not None and _pool_pid == os.getpid():
+                # Tasks already submitted to the old pool still complete
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_start_context())
+            _pool_pid = os.getpid()
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_process_pool():
+    """Stop the pool's workers; the next get_process_pool starts new ones"""
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_workers = 0
@@ -0,0 +1,196 @@
+import re
+import string
+from dataclasses import dataclass
+from typing import List, Optional
+
+try:
+    from re import _parser as sre
+except ImportError:  # Python < 3.11
+    import sre_parse as sre
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+UNBOUNDED = sre.MAXREPEAT
+REPEATS = (sre.MAX_REPEAT, sre.MIN_REPEAT)
+# Possessive repeats (3.11+) never backtrack, but their bodies still need scanning
+POSSESSIVE = (getattr(sre, 'POSSESSIVE_REPEAT', None),)
+
+# ASCII approximations of the character classes; anything broader is treated as "any character"
+CATEGORY_CHARS = {
+    sre.CATEGORY_DIGIT: frozenset(map(ord, string.digits)),
+    sre.CATEGORY_SPACE: frozenset(map(ord, string.whitespace)),
+    sre.CATEGORY_WORD: frozenset(map(ord, string.ascii_letters + string.digits + '_')),
+}
+
+# Ranges wider than this are treated as "any character"
+MAX_RANGE = 512
+
+EXPONENTIAL = 'exponential'
+POLYNOMIAL = 'polynomial'
+
+
+@dataclass
+class RegexRisk:
+    """Why a pattern can backtrack super-linearly in the length of the input"""
+    severity: str
+    reason: str
+
+    def to_dict(self) -> dict:
+        return {'severity': self.severity, 'reason': self.reason}
+
+
+def _charset(op, av, ignore_case: bool) -> Optional[frozenset]:
+    """Code points an item can match first; None means "possibly anything\""""
+    if op == sre.LITERAL:
+        chars = {av}
+    elif op == sre.IN:
+        chars = set()
+        for item_op, item_av in av:
+            if item_op == sre.LITERAL:
+                chars.add(item_av)
+            elif item_op == sre.RANGE and item_av[1] - item_av[0] <= MAX_RANGE:
+                chars.update(range(item_av[0], item_av[1] + 1))
+            elif item_op == sre.CATEGORY and item_av in CATEGORY_CHARS:
+                chars.update(CATEGORY_CHARS[item_av])
+            else:
+                return None
+    elif op in REPEATS + POSSESSIVE:
+        return _first_charset(av[2], ignore_case)
+    elif op == sre.SUBPATTERN:
+        return _first_charset(av[-1], ignore_case)
+    elif op == sre.BRANCH:
+        sets = [_first_charset(branch, ignore_case) for branch in av[1]]
+        return None if any(s is None for s in sets) else frozenset().union(*sets)
+    else:
+        return None
+
+    if ignore_case:
+        chars |= {ord(chr(char).swapcase()) for char in chars if chr(char).isascii()}
+    return frozenset(chars)
+
+
+def _first_charset(items, ignore_case: bool) -> Optional[frozenset]:
+    for op, av in items:
+        if op == sre.AT:
+            continue
+        return _charset(op, av, ignore_case)
+    return frozenset()
+
+
+def _overlaps(first: Optional[frozenset], second: Optional[frozenset]) -> bool:
+    if first is None or second is None:
+        return True
+    return bool(first & second)
+
+
+def _matches_empty(op, av) -> bool:
+    return op == sre.AT or (op in REPEATS + POSSESSIVE and av[0] == 0)
+
+
+def _is_optional(op, av) -> bool:
+    """Item that may match nothing or something (a?, a*, (?:|a))"""
+    if op in REPEATS + POSSESSIVE:
+        return av[0] == 0 and av[1] > 0
+    return op == sre.BRANCH and any(not branch for branch in av[1])
+
+
+def _has_unbounded_repeat(items) -> bool:
+    for op, av in items:
+        if op in REPEATS and av[1] == UNBOUNDED:
+            return True
+        if op in REPEATS + POSSESSIVE and _has_unbounded_repeat(av[2]):
+            return True
+        if op == sre.SUBPATTERN and _has_unbounded_repeat(av[-1]):
+            return True
+        if op == sre.BRANCH and any(_has_unbounded_repeat(branch) for branch in av[1]):
+            return True
+    return False
+
+
+def _flatten(items) -> List[tuple]:
+    """Inline plain groups so a sequence can be scanned item by item"""
+    flat = []
+    for op, av in items:
+        if op == sre.SUBPATTERN:
+            flat.extend(_flatten(av[-1]))
+        else:
+            flat.append((op, av))
+    return flat
+
+
+def _scan(items, ignore_case: bool) -> Optional[RegexRisk]:
+    sequence = _flatten(items)
+    for index, (op, av) in enumerate(sequence):
+        if op in REPEATS:
+            minimum, maximum, body = av
+            if maximum == UNBOUNDED or maximum > 1:
+                # (a+)+ and friends: exponentially many ways to split the input
+                if _has_unbounded_repeat(body):
+                    return RegexRisk(EXPONENTIAL, 'nested quantifier')
+                body_chars = _first_charset(body, ignore_case)
+                for body_op, body_av in _flatten(body):
+                    if body_op == sre.BRANCH:
+                        branches = [_first_charset(branch, ignore_case) for branch in body_av[1]]
+                        if any(_overlaps(a, b) for i, a in enumerate(branches) for b in branches[i + 1:]):
+                            return RegexRisk(EXPONENTIAL, 'quantified alternation with overlapping branches')
+                    # (aa?)+ and (a|aa)+ (parsed as a(?:|a)): iterations of varying length over the same characters
+                    if _is_optional(body_op, body_av) and _overlaps(body_chars, _charset(body_op, body_av, ignore_case)):
+                        return RegexRisk(EXPONENTIAL, 'quantified group with an optional overlapping part')
+
+            # .*x.* and friends: two unbounded quantifiers that can trade the same characters
+            if maximum == UNBOUNDED:
+                chars = _first_charset(body, ignore_case)
+                for next_op, next_av in sequence[index + 1:]:
+                    if next_op in REPEATS and next_av[1] == UNBOUNDED:
+                        if _overlaps(chars, _first_charset(next_av[2], ignore_case)):
+                            return RegexRisk(POLYNOMIAL, 'adjacent quantifiers over overlapping characters')
+                        break
+                    if _matches_empty(next_op, next_av):
+                        continue
+                    if not _overlaps(chars, _charset(next_op, next_av, ignore_case)):
+                        break
+
+        # Recurse into nested structure
+        nested = []
+        if op in REPEATS + POSSESSIVE:
+            nested = [av[2]]
+        elif op == sre.BRANCH:
+            nested = av[1]
+        elif op in (sre.ASSERT, sre.ASSERT_NOT):
+            nested = [av[1]]
+        elif op == getattr(sre, 'ATOMIC_GROUP', None):
+            nested = [av]
+        for items_ in nested:
+            risk = _scan(items_, ignore_case)
+            if risk:
+                return risk
+    return None
+
+
+def analyze_pattern(pattern: str) -> Optional[RegexRisk]:
+    """Statically flag patterns whose backtracking can be super-linear.
+
+    The check is conservative: it looks for nested quantifiers, quantified
+    alternations with overlapping branches and unbounded quantifiers that can
+    hand the same characters to each other. Unparseable patterns return None;
+    compilation reports those.
+    """
+    try:
+        parsed = sre.parse(pattern)
+    except (re.error, RecursionError, OverflowError):
+        return None
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    return _scan(list(parsed), ignore_case)
+
+
+def compile_guarded(pattern: str):
+    """Compile a pattern with the optional `regex` engine, which supports match timeouts"""
+    if regex is None:
+        return None
+    try:
+        return regex.compile(pattern, flags=regex.VERSION0)
+    except regex.error:
+        return None
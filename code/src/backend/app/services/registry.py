@@ -0,0 +1,96 @@
+import threading
+from typing import Callable, Dict, List
+
+
+class ServiceRegistry:
+    """Process-wide service singletons, constructed lazily on first use.
+
+    Controllers ask the registry for a service when a request needs it
+    instead of building their own copy at import time, so a worker starts
+    without loading models or configuring API clients, and every controller
+    shares one instance. Each factory runs at most once per process.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {}
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable):
+        self._factories[name] = factory
+
+    def get(self, name: str):
+        """The service registered under ``name``, constructing it on first use"""
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._factories[name]()
+                    self._instances[name] = instance
+        return instance
+
+    def loaded(self) -> List[str]:
+        """Names of the services constructed so far"""
+        return list(self._instances)
+
+    def reset(self, name: str = None):
+        """Drop one (or every) constructed service; the next get builds it again"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+def _anomaly_service():
+    from .anomaly_service import AnomalyService
+    return AnomalyService()
+
+
+def _rulebook_service():
+    from .rulebook_service import RulebookService
+    return RulebookService()
+
+
+def _rule_generator():
+    from .rule_generator_service import RuleGeneratorService
+    return RuleGeneratorService()
+
+
+def _job_service():
+    from .job_service import JobService
+    return JobService()
+
+
+def _export_service():
+    from .result_export import ResultExportService
+    return ResultExportService()
+
+
+services = ServiceRegistry()
+services.register('anomaly', _anomaly_service)
+services.register('rulebook', _rulebook_service)
+services.register('rule_generator', _rule_generator)
+services.register('job', _job_service)
+services.register('export', _export_service)
+
+
+def get_anomaly_service():
+    return services.get('anomaly')
+
+
+def get_rulebook_service():
+    return services.get('rulebook')
+
+
+def get_rule_generator():
+    return services.get('rule_generator')
+
+
+def get_job_service():
+    return services.get('job')
+
+
+def get_export_service():
+    return services.get('export')
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import uuid
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+from ..config import Config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# File extension and media type of every export format
+EXPORT_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file')
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """Raised when the columnar writer (pyarrow) is not installed"""
+
+
+class ResultExportService:
+    """Writes validation and anomaly result tables as Parquet or Arrow IPC files for download.
+
+    Each export is stored under ``Config.EXPORTS_FOLDER`` as ``<export_id>.<ext>``
+    next to a JSON record describing it, so any worker can serve the download.
+    Exports older than ``Config.EXPORT_RETENTION_SECONDS`` are removed when a
+    new one is written.
+    """
+
+    def __init__(self, exports_dir: str = None, retention_seconds: int = None):
+        self.exports_dir = exports_dir or Config.EXPORTS_FOLDER
+        self.retention_seconds = retention_seconds or Config.EXPORT_RETENTION_SECONDS
+        os.makedirs(self.exports_dir, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+
+    def _record_path(self, export_id: str) -> str:
+        return os.path.join(self.exports_dir, f'{export_id}.json')
+
+    @staticmethod
+    def _write_batches(batches: Iterable['pd.DataFrame'], schema: Dict[str, str], path: str, export_format: str) -> int:
+        """Append each batch to the file as it arrives, so only one batch is in memory; returns the row count"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ExportUnavailable(f"Columnar export requires pyarrow: {str(e)}")
+
+        arrow_schema = pa.schema([(name, pa.type_for_alias(alias)) for name, alias in schema.items()])
+        if export_format == 'parquet':
+            writer = pq.ParquetWriter(path, arrow_schema)
+        else:
+            # The Arrow IPC file format (Feather v2)
+            writer = pa.ipc.new_file(path, arrow_schema)
+
+        rows = 0
+        with writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pandas(batch[list(schema)], schema=arrow_schema, preserve_index=False))
+                rows += len(batch)
+        return rows
+
+    def write(self, batches: Iterable['pd.DataFrame'], schema: Dict[str, str], kind: str, export_format: str,
+              **details) -> dict:
+        """Write a result table and return its export record
+
+        The table arrives as DataFrame batches whose columns have the Arrow
+        types of ``schema`` (name to type alias, e.g. 'int64' or 'string').
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}', expected one of: {', '.join(EXPORT_FORMATS)}")
+        self.prune()
+
+        extension, media_type = EXPORT_FORMATS[export_format]
+        export_id = str(uuid.uuid4())
+        filename = f'{export_id}.{extension}'
+        path = os.path.join(self.exports_dir, filename)
+
+        # Write under a temporary name so a download never sees a partial file
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            rows = self._write_batches(batches, schema, temp_path, export_format)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        record = {
+            'export_id': export_id,
+            'kind': kind,
+            'format': export_format,
+            'media_type': media_type,
+            'filename': filename,
+            'rows': rows,
+            'columns': list(schema),
+            'size': os.path.getsize(path),
+            'created_at': datetime.now().isoformat(),
+            **details
+        }
+        with open(self._record_path(export_id), 'w') as f:
+            json.dump(record, f, default=str)
+        self.logger.info(f"Exported {rows} {kind} rows to {filename}")
+        return record
+
+    def get_export(self, export_id: str) -> Optional[dict]:
+        """Get an export record by ID"""
+        record_path = self._record_path(os.path.basename(export_id))
+        if not os.path.exists(record_path):
+            return None
+        with open(record_path, 'r') as f:
+            return json.load(f)
+
+    def file_path(self, record: dict) -> str:
+        return os.path.join(self.exports_dir, record['filename'])
+
+    def prune(self):
+        """Remove exports older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        for name in os.listdir(self.exports_dir):
+            path = os.path.join(self.exports_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                continue
@@ -0,0 +1,62 @@
+import json
+import hashlib
+from datetime import datetime
+from typing import List, Optional
+from ..config import Config
+from .file_cache import FileLRUCache
+
+
+def pdf_digest(pdf_content: bytes) -> str:
+    """SHA-256 hex digest of a PDF document"""
+    return hashlib.sha256(pdf_content).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(document_digest: str, prompt: str, model_name: str) -> str:
+    """Cache key of a generation request: same document, prompt and model give the same rules"""
+    key = hashlib.sha256()
+    for part in (document_digest, prompt, model_name):
+        key.update(part.encode('utf-8'))
+        key.update(b'\0')
+    return key.hexdigest()
+
+
+class RuleGenerationCache(FileLRUCache):
+    """Persistent cache of parsed LLM rule lists keyed by content hash.
+
+    Each entry is a JSON file named after its key, kept in a FileLRUCache
+    bounded by ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        super().__init__(
+            cache_dir or Config.RULE_CACHE_FOLDER,
+            max_bytes if max_bytes is not None else Config.RULE_CACHE_MAX_BYTES,
+            suffix='.json',
+            name='rule'
+        )
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        """Get the cached rules for a key"""
+        def load(path):
+            with open(path, 'r') as f:
+                return json.load(f)['rules']
+        return self._read(key, load)
+
+    def put(self, key: str, rules: List[dict], model_name: str = None):
+        """Store the rules for a key and evict old entries past the size bound"""
+        entry = {
+            'key': key,
+            'model_name': model_name,
+            'created_at': datetime.now().isoformat(),
+            'rules': rules
+        }
+        self._write(key, lambda f: json.dump(entry, f))
@@ -0,0 +1,137 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+import pdfplumber
+from .pdf_text_extractor import extract_page_ranges
+
+
+@dataclass
+class PageChunk:
+    """Text of a contiguous page range of a PDF (1-based, inclusive)"""
+    first_page: int
+    last_page: int
+    text: str
+
+
+@dataclass
+class ChunkReport:
+    """Outcome of extracting rules from one chunk"""
+    pages: str
+    latency_ms: float = 0.0
+    attempts: int = 0
+    rules: int = 0
+    error: Optional[str] = None
+    extracted: List[dict] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            'pages': self.pages,
+            'latency_ms': self.latency_ms,
+            'attempts': self.attempts,
+            'rules': self.rules,
+            'error': self.error
+        }
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """Number of pages in a PDF"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def chunk_pdf_pages(pdf_path: str, pages_per_chunk: int, workers: int = None) -> List[PageChunk]:
+    """Split a PDF into page-range chunks of relevant text (headers, footers and page furniture removed)
+
+    Each chunk's pages are extracted by pdf_text_extractor, chunks in
+    parallel across ``workers`` processes.
+    """
+    page_count = count_pdf_pages(pdf_path)
+    ranges = [(start, min(start + pages_per_chunk, page_count)) for start in range(0, page_count, pages_per_chunk)]
+    chunks = []
+    for (first, last), lines in zip(ranges, extract_page_ranges(pdf_path, ranges, workers)):
+        text = '\n'.join(lines).strip()
+        if text:
+            chunks.append(PageChunk(first + 1, last, text))
+    return chunks
+
+
+def merge_rules(rule_lists: List[List[dict]]) -> List[dict]:
+    """Merge per-chunk rules, keeping the first rule seen for each column"""
+    merged = {}
+    for rules in rule_lists:
+        for rule in rules:
+            merged.setdefault(rule['column_name'], rule)
+    return list(merged.values())
+
+
+class RuleExtractionPipeline:
+    """Map-reduce rule extraction over the page chunks of a large document.
+
+    Chunks are sent to the model concurrently (bounded by ``max_concurrency``)
+    through ``generate_content_async``; each response is parsed with
+    ``parse_response`` and the results are merged by column name. Any object
+    with an async ``generate_content_async(parts, request_options=...)``
+    returning a response with a ``text`` attribute can act as the model.
+    """
+
+    def __init__(self, model, prompt: str, parse_response: Callable[[str], List[dict]],
+                 max_concurrency: int = 4, max_retries: int = 3, retry_delay: float = 5,
+                 timeout: int = 300):
+        self.model = model
+        self.prompt = prompt
+        self.parse_response = parse_response
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+
+    async def run(self, chunks: List[PageChunk]) -> Tuple[List[dict], List[dict]]:
+        """Extract and merge rules from every chunk.
+
+        Returns the merged rules and a per-chunk report with latencies.
+        Raises if any chunk still fails after its retries, since a partial
+        rulebook would silently skip validations.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        reports = await asyncio.gather(*(self._extract_chunk(chunk, semaphore) for chunk in chunks))
+
+        failed = [report for report in reports if report.error]
+        if failed:
+            details = '; '.join(f"pages {report.pages}: {report.error}" for report in failed)
+            raise Exception(f"Rule extraction failed for {len(failed)} of {len(reports)} chunks ({details})")
+
+        rules = merge_rules([report.extracted for report in reports])
+        return rules, [report.to_dict() for report in reports]
+
+    async def _extract_chunk(self, chunk: PageChunk, semaphore: asyncio.Semaphore) -> ChunkReport:
+        report = ChunkReport(pages=f"{chunk.first_page}-{chunk.last_page}")
+        parts = [
+            {'text': self.prompt},
+            {'text': f"Document pages {report.pages}:\n{chunk.text}"}
+        ]
+
+        async with semaphore:
+            started = time.perf_counter()
+            for attempt in range(self.max_retries):
+                report.attempts = attempt + 1
+                try:
+                    response = await self.model.generate_content_async(
+                        parts,
+                        request_options={"timeout": self.timeout}
+                    )
+                    report.extracted = self.parse_response(response.text)
+                    report.rules = len(report.extracted)
+                    report.error = None
+                    break
+                except Exception as e:
+                    report.error = str(e)
+                    self.logger.warning(f"Chunk {report.pages} attempt {attempt + 1} failed: {str(e)}")
+                    if attempt < self.max_retries - 1:
+                        await asyncio.sleep(self.retry_delay)
+            report.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        self.logger.info(f"Chunk {report.pages}: {report.rules} rules in {report.latency_ms} ms")
+        return report
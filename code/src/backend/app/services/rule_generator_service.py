@@ -1,5 +1,8 @@
 import os
+from functools import lru_cache
+from pathlib import Path
 from typing import List
+import pandas as pd
 from datetime import datetime
 import google.generativeai as genai
 from pydantic import BaseModel, ConfigDict
@@ -12,31 +15,21 @@ import io
 import yaml
 import logging
 import time
+from .rule_cache import RuleGenerationCache, cache_key, file_digest
+from .regex_safety import analyze_pattern
+from .validation_engine import ValidationEngine, clean_pattern
+from .rule_extraction_pipeline import RuleExtractionPipeline, chunk_pdf_pages, count_pdf_pages
 
-class RuleGeneratorService:
-    def __init__(self):
-        # Initialize logger first
-        self.logger = logging.getLogger(__name__)
-        
-        # Initialize Gemini model
-        api_key = Config.GOOGLE_API_KEY
-        self.logger.info(f"Initializing Gemini model with API key: {api_key[:5]}...")
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        self.logger.info("Gemini model initialized successfully")
+# Gemini model used for rule extraction
+MODEL_NAME = 'gemini-1.5-flash'
 
-    async def generate_rules(self, pdf_path: str) -> List[Rule]:
-        """Generate rules from PDF using Gemini"""
-        try:
-            # Read the PDF file
-            with open(pdf_path, 'rb') as f:
-                pdf_content = f.read()
-            
-            # Create a file-like object
-            pdf_io = io.BytesIO(pdf_content)
-            
-            # Define the prompt
-            prompt = """Analyze this regulatory document and extract ALL rules in the following YAML format:
+# Attempts per whole-document request, seconds between them and seconds allowed per attempt
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 5
+REQUEST_TIMEOUT = 300
+
+# Prompt sent along with the PDF; part of the rule cache key
+RULE_EXTRACTION_PROMPT = """Analyze this regulatory document and extract ALL rules in the following YAML format:
 rules:
   - column_name: name_of_csv_column
     description: clear description of the rule
@@ -69,177 +62,222 @@ rules:
 
 Return ONLY the YAML structure, nothing else."""
 
-            # Generate content
-            parts = [
-                {'text': prompt},
-                {'inline_data': {'mime_type': 'application/pdf', 'data': pdf_content}}
-            ]
-            
-            # Use the current event loop for the async call
-            response = await self.model.generate_content_async(
-                parts,
-                request_options={"timeout": 600}  # Set timeout to 10 minutes
-            )
+
+@lru_cache(maxsize=32)
+def _compile_engine(rule_specs: tuple) -> ValidationEngine:
+    """Validation engine of a rule list, compiled once per distinct list"""
+    return ValidationEngine([
+        {'column_name': column_name, 'description': description, 'regex_pattern': regex_pattern}
+        for column_name, description, regex_pattern in rule_specs
+    ])
+
+
+class RuleGeneratorService:
+    def __init__(self):
+        # Initialize logger first
+        self.logger = logging.getLogger(__name__)
+        
+        # Initialize Gemini model
+        api_key = Config.GOOGLE_API_KEY
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY environment variable is not set")
+        self.logger.info(f"Initializing Gemini model with API key: {api_key[:5]}...")
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(MODEL_NAME)
+        self.logger.info("Gemini model initialized successfully")
+        
+        # Identical documents are served from the content-hash cache
+        self.cache = RuleGenerationCache()
+
+    def _cache_key(self, pdf_path: str, document_digest: str = None) -> str:
+        return cache_key(document_digest or file_digest(pdf_path), RULE_EXTRACTION_PROMPT, MODEL_NAME)
+
+    def _is_large_document(self, pdf_path: str) -> bool:
+        """Whether a PDF is long enough to be extracted in page chunks"""
+        return count_pdf_pages(pdf_path) > Config.RULE_EXTRACTION_MIN_PAGES
+
+    async def generate_rules_chunked(self, pdf_path: str) -> List[dict]:
+        """Extract rules from page-range chunks of a large PDF concurrently"""
+        # Text extraction is CPU-bound; keep it off the event loop
+        chunks = await asyncio.to_thread(chunk_pdf_pages, pdf_path, Config.RULE_EXTRACTION_CHUNK_PAGES,
+                                         Config.PDF_EXTRACTION_WORKERS)
+        self.logger.info(f"Extracting rules from {len(chunks)} page chunks of {pdf_path}")
+        
+        pipeline = RuleExtractionPipeline(
+            self.model,
+            RULE_EXTRACTION_PROMPT,
+            self.parse_rules_response,
+            max_concurrency=Config.RULE_EXTRACTION_CONCURRENCY
+        )
+        rules, report = await pipeline.run(chunks)
+        
+        # One record per document, so slow or empty page ranges can be traced back to it
+        total_ms = sum(chunk['latency_ms'] for chunk in report)
+        per_chunk = ', '.join(
+            f"pages {chunk['pages']}: {chunk['rules']} rules in {chunk['latency_ms']:.0f} ms "
+            f"({chunk['attempts']} attempts)"
+            for chunk in report
+        )
+        self.logger.info(f"Merged {len(rules)} rules from {len(report)} chunks of {pdf_path} "
+                         f"({total_ms:.0f} ms of model time): {per_chunk}")
+        return rules
+
+    async def generate_rules(self, pdf_path: str, document_digest: str = None) -> List[dict]:
+        """Generate rules from PDF like generate_rules_sync, awaiting Gemini on the running event loop
+
+        Reading, hashing and splitting the PDF and the rule cache's file I/O
+        run in the default executor, so the loop only waits on model round
+        trips and can hold many ingestions in flight.
+        """
+        try:
+            # Serve identical documents from the cache
+            key = await asyncio.to_thread(self._cache_key, pdf_path, document_digest)
+            cached_rules = await asyncio.to_thread(self.cache.get, key)
+            if cached_rules is not None:
+                self.logger.info(f"Rule cache hit for {pdf_path}, skipping model call")
+                return cached_rules
             
-            # Log the raw response for debugging
-            self.logger.info(f"Raw response from LLM: {response.text}")
+            # Large documents are split into page ranges and extracted concurrently
+            if await asyncio.to_thread(self._is_large_document, pdf_path):
+                formatted_rules = await self.generate_rules_chunked(pdf_path)
+                await asyncio.to_thread(self.cache.put, key, formatted_rules, MODEL_NAME)
+                return formatted_rules
             
-            # Clean the response by removing markdown code block markers
-            cleaned_response = response.text.strip()
-            if cleaned_response.startswith('```yaml'):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.endswith('```'):
-                cleaned_response = cleaned_response[:-3]
-            cleaned_response = cleaned_response.strip()
+            pdf_file = await asyncio.to_thread(Path(pdf_path).read_bytes)
             
-            # Try to parse as YAML first
-            try:
-                rules_data = yaml.safe_load(cleaned_response)
-                if not rules_data or 'rules' not in rules_data:
-                    raise ValueError("No valid YAML structure found in response")
-                
-                rules = []
-                for rule_data in rules_data['rules']:
-                    # Validate regex pattern before creating rule
-                    try:
-                        re.compile(rule_data['regex_pattern'])
-                    except re.error as e:
-                        self.logger.warning(f"Invalid regex pattern: {rule_data['regex_pattern']}")
-                        continue
-                        
-                    rule = Rule(
-                        column_name=rule_data['column_name'],
-                        description=rule_data['description'],
-                        regex_pattern=rule_data['regex_pattern']
-                    )
-                    rules.append(rule)
-                
-                return rules
-                
-            except yaml.YAMLError as e:
-                self.logger.error(f"YAML parsing error: {str(e)}")
-                # If YAML parsing fails, try to extract JSON
+            last_error = None
+            for attempt in range(MAX_ATTEMPTS):
                 try:
-                    # Try to find JSON structure in the response
-                    json_match = re.search(r'\{.*\}', cleaned_response, re.DOTALL)
-                    if json_match:
-                        rules_data = json.loads(json_match.group())
-                        if not rules_data or 'rules' not in rules_data:
-                            raise ValueError("No valid JSON structure found in response")
-                        
-                        rules = []
-                        for rule_data in rules_data['rules']:
-                            try:
-                                re.compile(rule_data['regex_pattern'])
-                            except re.error as e:
-                                self.logger.warning(f"Invalid regex pattern: {rule_data['regex_pattern']}")
-                                continue
-                                
-                            rule = Rule(
-                                column_name=rule_data['column_name'],
-                                description=rule_data['description'],
-                                regex_pattern=rule_data['regex_pattern']
-                            )
-                            rules.append(rule)
-                        
-                        return rules
-                    else:
-                        raise ValueError("No valid JSON or YAML structure found in response")
-                except json.JSONDecodeError as e:
-                    raise ValueError(f"Failed to parse both YAML and JSON response: {str(e)}")
+                    self.logger.info(f"Generating content with Gemini model (attempt {attempt + 1}/{MAX_ATTEMPTS})...")
+                    response = await self.model.generate_content_async(
+                        self._request_parts(pdf_file),
+                        request_options={"timeout": REQUEST_TIMEOUT}
+                    )
+                    break
                 except Exception as e:
-                    raise ValueError(f"Error processing response: {str(e)}")
-                
+                    last_error = e
+                    self.logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
+                    if attempt < MAX_ATTEMPTS - 1:
+                        await asyncio.sleep(RETRY_DELAY)
+            else:
+                raise Exception(f"Failed after {MAX_ATTEMPTS} attempts. Last error: {str(last_error)}")
+            
+            formatted_rules = self.parse_rules_response(response.text)
+            self.logger.info(f"Successfully generated {len(formatted_rules)} valid rules")
+            await asyncio.to_thread(self.cache.put, key, formatted_rules, MODEL_NAME)
+            return formatted_rules
+            
         except Exception as e:
+            self.logger.error(f"Error generating rules: {str(e)}")
             raise Exception(f"Error generating rules: {str(e)}")
 
+    @staticmethod
+    def _request_parts(pdf_file: bytes) -> list:
+        return [
+            {'text': RULE_EXTRACTION_PROMPT},
+            {'inline_data': {'mime_type': 'application/pdf', 'data': pdf_file}}
+        ]
+
     def validate_transaction(self, transaction: dict, rules: List[Rule]) -> List[Rule]:
-        """Validate a single transaction against the rules"""
-        violations = []
-        for rule in rules:
-            if not self._check_rule(transaction, rule):
-                violations.append(rule)
-        return violations
+        """Validate a single transaction against the rules (empty and missing fields are not checked)"""
+        engine = _compile_engine(tuple((rule.column_name, rule.description, rule.regex_pattern) for rule in rules))
+        return [rules[index] for index in engine.violated_rules(pd.DataFrame([transaction]))]
 
-    def _check_rule(self, transaction: dict, rule: Rule) -> bool:
-        """Check if a transaction violates a specific rule using regex pattern"""
+    def parse_rules_response(self, response_text: str) -> List[dict]:
+        """Parse a YAML (or JSON) model response into validated rule dicts"""
+        # Clean the response by removing markdown code block markers
+        cleaned_response = response_text.strip()
+        if cleaned_response.startswith('```yaml'):
+            cleaned_response = cleaned_response[7:]
+        if cleaned_response.endswith('```'):
+            cleaned_response = cleaned_response[:-3]
+        cleaned_response = cleaned_response.strip()
+        
+        # Log the cleaned response for debugging
+        self.logger.info(f"Cleaned response: {cleaned_response[:200]}...")
+        
+        # Parse the response
         try:
-            pattern = re.compile(rule.regex_pattern, re.IGNORECASE)
-            # Apply regex to the specific CSV column
-            value = transaction.get(rule.column_name)
-            if value is not None:
-                if isinstance(value, str):
-                    return bool(pattern.search(value))
-                elif isinstance(value, (int, float)):
-                    # For numeric values, convert to string for regex matching
-                    return bool(pattern.search(str(value)))
-            return False
-        except re.error:
-            # If regex pattern is invalid, consider it a violation
-            return False
+            # Try parsing as YAML first
+            rules_data = yaml.safe_load(cleaned_response)
+            if not rules_data or 'rules' not in rules_data:
+                raise ValueError("No valid YAML structure found in response")
+            
+            rules = rules_data['rules']
+            self.logger.info(f"Successfully parsed {len(rules)} rules from YAML")
+        except yaml.YAMLError as e:
+            self.logger.warning(f"YAML parsing failed: {str(e)}")
+            try:
+                # If YAML parsing fails, try JSON
+                rules_data = json.loads(cleaned_response)
+                if not rules_data or 'rules' not in rules_data:
+                    raise ValueError("No valid JSON structure found in response")
+                rules = rules_data['rules']
+                self.logger.info(f"Successfully parsed {len(rules)} rules from JSON")
+            except json.JSONDecodeError as e:
+                self.logger.error(f"JSON parsing failed: {str(e)}")
+                raise ValueError("Failed to parse model response as YAML or JSON")
+        
+        # Validate and format rules
+        formatted_rules = []
+        for rule in rules:
+            if not all(key in rule for key in ['column_name', 'description', 'regex_pattern']):
+                self.logger.warning(f"Skipping invalid rule: {rule}")
+                continue
+            
+            # Validate regex pattern
+            try:
+                re.compile(rule['regex_pattern'])
+            except re.error as e:
+                self.logger.warning(f"Invalid regex pattern in rule: {rule['regex_pattern']}")
+                continue
+            
+            formatted_rule = {
+                'column_name': rule['column_name'],
+                'description': rule['description'],
+                'regex_pattern': rule['regex_pattern']
+            }
+            
+            # Flag patterns that can backtrack super-linearly; validation matches them with a time bound
+            risk = analyze_pattern(clean_pattern(rule['regex_pattern']))
+            if risk:
+                self.logger.warning(f"Super-linear regex pattern for {rule['column_name']} ({risk.reason}): {rule['regex_pattern']}")
+                formatted_rule['regex_risk'] = risk.to_dict()
+            
+            formatted_rules.append(formatted_rule)
+        
+        return formatted_rules
 
-    def generate_rules_sync(self, pdf_path):
+    def generate_rules_sync(self, pdf_path, document_digest=None):
         """Generate rules from PDF synchronously"""
         try:
-            # Read PDF file
+            # Serve identical documents from the cache
+            key = self._cache_key(pdf_path, document_digest)
+            cached_rules = self.cache.get(key)
+            if cached_rules is not None:
+                self.logger.info(f"Rule cache hit for {pdf_path}, skipping model call")
+                return cached_rules
+            
+            # Large documents are split into page ranges and extracted concurrently
+            if self._is_large_document(pdf_path):
+                formatted_rules = asyncio.run(self.generate_rules_chunked(pdf_path))
+                self.cache.put(key, formatted_rules, MODEL_NAME)
+                return formatted_rules
+            
+            # Read the PDF only when it has to be sent to the model
             self.logger.info(f"Reading PDF file: {pdf_path}")
             with open(pdf_path, 'rb') as f:
                 pdf_file = f.read()
             
-            # Create a file-like object
-            pdf_file_obj = io.BytesIO(pdf_file)
-            
-            # Define the prompt for the model
-            prompt = """Analyze this regulatory document and extract ALL rules in the following YAML format:
-rules:
-  - column_name: name_of_csv_column
-    description: clear description of the rule
-    regex_pattern: valid python regex pattern
-
-Guidelines:
-1. Extract ALL rules from the document
-2. column_name must be a valid CSV column name (no spaces, use underscores)
-3. description should be clear and concise
-4. regex_pattern must be a valid Python regex pattern that:
-   - For numbers: r"^\\d+$" or r"^\\d{1,3}(,\\d{3})*(\\.\\d{2})?$"
-   - For dates: r"^\\d{4}-\\d{2}-\\d{2}$"
-   - For text: r"(?i).*required.*"
-   - For currency: r"^\\$?\\d{1,3}(,\\d{3})*(\\.\\d{2})?$"
-   - For percentages: r"^\\d+(\\.\\d+)?%$"
-   - For email: r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}$"
-   - For phone: r"^\\+?\\d{10,15}$"
-
-Example rules:
-rules:
-  - column_name: total_assets
-    description: Total assets must be at least $100 billion
-    regex_pattern: ^\\d+$
-  - column_name: submission_date
-    description: Report must be submitted by the specified date
-    regex_pattern: ^\\d{4}-\\d{2}-\\d{2}$
-  - column_name: report_type
-    description: Report must be submitted via Reporting Central
-    regex_pattern: (?i).*reporting\\s+central.*
-
-Return ONLY the YAML structure, nothing else."""
-
             # Generate content using the model with retries
-            max_retries = 3
-            retry_delay = 5  # seconds
             last_error = None
             
-            for attempt in range(max_retries):
+            for attempt in range(MAX_ATTEMPTS):
                 try:
-                    self.logger.info(f"Generating content with Gemini model (attempt {attempt + 1}/{max_retries})...")
-                    parts = [
-                        {'text': prompt},
-                        {'inline_data': {'mime_type': 'application/pdf', 'data': pdf_file}}
-                    ]
-                    
-                    # Set a longer timeout (5 minutes)
+                    self.logger.info(f"Generating content with Gemini model (attempt {attempt + 1}/{MAX_ATTEMPTS})...")
                     response = self.model.generate_content(
-                        parts,
-                        request_options={"timeout": 300}  # 5 minutes timeout
+                        self._request_parts(pdf_file),
+                        request_options={"timeout": REQUEST_TIMEOUT}
                     )
                     self.logger.info("Received response from Gemini model")
                     break
@@ -247,66 +285,17 @@ Return ONLY the YAML structure, nothing else."""
                 except Exception as e:
                     last_error = e
                     self.logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                    if attempt < max_retries - 1:
-                        self.logger.info(f"Retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
+                    if attempt < MAX_ATTEMPTS - 1:
+                        self.logger.info(f"Retrying in {RETRY_DELAY} seconds...")
+                        time.sleep(RETRY_DELAY)
                     else:
-                        raise Exception(f"Failed after {max_retries} attempts. Last error: {str(last_error)}")
-            
-            # Clean the response by removing markdown code block markers
-            cleaned_response = response.text.strip()
-            if cleaned_response.startswith('```yaml'):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.endswith('```'):
-                cleaned_response = cleaned_response[:-3]
-            cleaned_response = cleaned_response.strip()
+                        raise Exception(f"Failed after {MAX_ATTEMPTS} attempts. Last error: {str(last_error)}")
             
-            # Log the cleaned response for debugging
-            self.logger.info(f"Cleaned response: {cleaned_response[:200]}...")
-            
-            # Parse the response
-            try:
-                # Try parsing as YAML first
-                rules_data = yaml.safe_load(cleaned_response)
-                if not rules_data or 'rules' not in rules_data:
-                    raise ValueError("No valid YAML structure found in response")
-                
-                rules = rules_data['rules']
-                self.logger.info(f"Successfully parsed {len(rules)} rules from YAML")
-            except yaml.YAMLError as e:
-                self.logger.warning(f"YAML parsing failed: {str(e)}")
-                try:
-                    # If YAML parsing fails, try JSON
-                    rules_data = json.loads(cleaned_response)
-                    if not rules_data or 'rules' not in rules_data:
-                        raise ValueError("No valid JSON structure found in response")
-                    rules = rules_data['rules']
-                    self.logger.info(f"Successfully parsed {len(rules)} rules from JSON")
-                except json.JSONDecodeError as e:
-                    self.logger.error(f"JSON parsing failed: {str(e)}")
-                    raise ValueError("Failed to parse model response as YAML or JSON")
-            
-            # Validate and format rules
-            formatted_rules = []
-            for rule in rules:
-                if not all(key in rule for key in ['column_name', 'description', 'regex_pattern']):
-                    self.logger.warning(f"Skipping invalid rule: {rule}")
-                    continue
-                
-                # Validate regex pattern
-                try:
-                    re.compile(rule['regex_pattern'])
-                except re.error as e:
-                    self.logger.warning(f"Invalid regex pattern in rule: {rule['regex_pattern']}")
-                    continue
-                
-                formatted_rules.append({
-                    'column_name': rule['column_name'],
-                    'description': rule['description'],
-                    'regex_pattern': rule['regex_pattern']
-                })
+            # Parse and validate the rules in the response
+            formatted_rules = self.parse_rules_response(response.text)
             
             self.logger.info(f"Successfully generated {len(formatted_rules)} valid rules")
+            self.cache.put(key, formatted_rules, MODEL_NAME)
             return formatted_rules
             
         except Exception as e:
@@ -0,0 +1,591 @@
+import re
+from itertools import product
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+try:
+    from re import _parser as sre
+except ImportError:  # Python < 3.11
+    import sre_parse as sre
+
+# Enumerated alternatives larger than this stay regex rules
+MAX_ENUM_VALUES = 256
+
+# Character classes with an exact str-method equivalent (\d is Unicode category Nd, like str.isdecimal)
+CLASS_PREDICATES = {
+    'digit': str.isdecimal,
+    'ascii_digit': lambda s: s.isascii() and s.isdecimal(),
+    'upper': lambda s: s.isascii() and s.isalpha() and s.isupper(),
+    'lower': lambda s: s.isascii() and s.isalpha() and s.islower(),
+    'upper_alnum': lambda s: s.isascii() and s.isalnum() and s.upper() == s,
+}
+
+# The same classes as code point ranges, exact on ASCII text
+CLASS_RANGES = {
+    'digit': ((48, 57),),
+    'ascii_digit': ((48, 57),),
+    'upper': ((65, 90),),
+    'lower': ((97, 122),),
+    'upper_alnum': ((65, 90), (48, 57)),
+}
+
+DIGIT_CLASSES = ('digit', 'ascii_digit')
+
+# Strings longer than this are checked value by value rather than as a code point matrix
+MAX_VECTOR_WIDTH = 64
+
+
+def _strip_newline(value: str) -> str:
+    """`$` also matches before a single trailing newline"""
+    return value[:-1] if value.endswith('\n') else value
+
+
+class CodePoints:
+    """Non-null strings of a column as a fixed-width matrix of code points.
+
+    The matrix is built on first use and the trailing newline `$` tolerates
+    is stripped once there. Rows with non-ASCII characters (where \\d also
+    matches other scripts' digits) and columns wider than MAX_VECTOR_WIDTH
+    are left to the per-value predicates.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self._layout = None
+
+    def _build(self):
+        lengths = np.fromiter(map(len, self.values), dtype=np.int64, count=len(self.values))
+        matrix = None
+        fallback = np.ones(len(self.values), dtype=bool)
+
+        width = max(int(lengths.max(initial=0)), 1)
+        if len(self.values) and width <= MAX_VECTOR_WIDTH:
+            matrix = self.values.astype(f'U{width}').view(np.uint32).reshape(len(self.values), width)
+            rows = np.flatnonzero(lengths)
+            newline = rows[matrix[rows, lengths[rows] - 1] == ord('\n')]
+            matrix[newline, lengths[newline] - 1] = 0
+            lengths[newline] -= 1
+            fallback = (matrix >= 128).any(axis=1)
+        self._layout = lengths, matrix, fallback
+        return self._layout
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return (self._layout or self._build())[0]
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        return (self._layout or self._build())[1]
+
+    @property
+    def fallback(self) -> np.ndarray:
+        """Rows the matrix cannot judge exactly"""
+        return (self._layout or self._build())[2]
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def width(self) -> int:
+        return self.matrix.shape[1]
+
+    def content(self) -> np.ndarray:
+        """Cells holding a character (as opposed to padding)"""
+        return np.arange(self.width) < self.lengths[:, None]
+
+    def in_class(self, char_class, columns: slice = slice(None)) -> np.ndarray:
+        cells = self.matrix[:, columns]
+        if isinstance(char_class, frozenset):
+            return ~np.isin(cells, np.fromiter(char_class, dtype=np.uint32))
+        mask = np.zeros(cells.shape, dtype=bool)
+        for low, high in CLASS_RANGES[char_class]:
+            mask |= (cells >= low) & (cells <= high)
+        return mask
+
+
+def _class_predicate(char_class) -> Callable[[str], bool]:
+    if isinstance(char_class, frozenset):
+        excluded = {chr(code) for code in char_class}
+        return excluded.isdisjoint
+    return CLASS_PREDICATES[char_class]
+
+
+def _is_class(kind) -> bool:
+    return isinstance(kind, frozenset) or kind in CLASS_RANGES
+
+
+def _class_of(op, av):
+    """Name of a supported single-character class item, or the code points a negated literal set excludes"""
+    if op == sre.NOT_LITERAL:
+        av = [(sre.NEGATE, None), (sre.LITERAL, av)]
+    elif op != sre.IN:
+        return None
+    # [^...] excluding "\n": the run cannot swallow the newline `$` tolerates
+    if av and av[0][0] == sre.NEGATE and all(item_op == sre.LITERAL for item_op, _ in av[1:]):
+        excluded = frozenset(item_av for _, item_av in av[1:])
+        return excluded if ord('\n') in excluded else None
+    items = set(av)
+    if items == {(sre.CATEGORY, sre.CATEGORY_DIGIT)}:
+        return 'digit'
+    if items == {(sre.RANGE, (48, 57))}:
+        return 'ascii_digit'
+    if items == {(sre.RANGE, (65, 90))}:
+        return 'upper'
+    if items == {(sre.RANGE, (97, 122))}:
+        return 'lower'
+    if items == {(sre.RANGE, (65, 90)), (sre.RANGE, (48, 57))}:
+        return 'upper_alnum'
+    return None
+
+
+def _run_of(op, av) -> Optional[Tuple[str, int, int]]:
+    """(class, min, max) of a class item or a greedy repeat of one"""
+    char_class = _class_of(op, av)
+    if char_class:
+        return char_class, 1, 1
+    if op == sre.MAX_REPEAT and len(av[2]) == 1:
+        char_class = _class_of(*av[2][0])
+        if char_class:
+            return char_class, av[0], av[1]
+    return None
+
+
+def _optional_literal(op, av) -> Optional[str]:
+    """The character of an optional literal ``x?``"""
+    if op == sre.MAX_REPEAT and av[:2] == (0, 1):
+        body = _unwrap(av[2])
+        if len(body) == 1 and body[0][0] == sre.LITERAL:
+            return chr(body[0][1])
+    return None
+
+
+def _is_symbol(char: str) -> bool:
+    """Currency signs and separators: one character that cannot be part of a number"""
+    return len(char) == 1 and not char.isalnum() and char not in '-.\n' and not char.isspace()
+
+
+def _grouping_of(op, av) -> Optional[Tuple[str, str, int, int, int]]:
+    """(separator, class, width, min, max) of a repeated group such as ``(,\\d{3})*``"""
+    if op != sre.MAX_REPEAT:
+        return None
+    body = _unwrap(av[2])
+    if len(body) != 2 or body[0][0] != sre.LITERAL or not _is_symbol(chr(body[0][1])):
+        return None
+    run = _run_of(*body[1])
+    if not run or run[1] != run[2] or run[1] < 1:
+        return None
+    return chr(body[0][1]), run[0], run[1], av[0], av[1]
+
+
+def _unwrap(items) -> list:
+    """Drop plain capturing groups wrapping a whole sequence"""
+    items = list(items)
+    while len(items) == 1 and items[0][0] == sre.SUBPATTERN and not any(items[0][1][1:3]):
+        items = list(items[0][1][-1])
+    return items
+
+
+def _literal_strings(items) -> Optional[set]:
+    """Every string a sequence of literals, literal sets and alternations can match"""
+    options = ['']
+    for op, av in items:
+        if op == sre.LITERAL:
+            choices = [chr(av)]
+        elif op == sre.IN and all(item_op == sre.LITERAL for item_op, _ in av):
+            choices = [chr(item_av) for _, item_av in av]
+        elif op == sre.BRANCH:
+            choices = []
+            for branch in av[1]:
+                strings = _literal_strings(branch)
+                if strings is None:
+                    return None
+                choices.extend(strings)
+        elif op == sre.SUBPATTERN and not any(av[1:3]):
+            choices = _literal_strings(av[-1])
+            if choices is None:
+                return None
+        else:
+            return None
+        options = [prefix + choice for prefix, choice in product(options, choices)]
+        if len(options) > MAX_ENUM_VALUES:
+            return None
+    return set(options)
+
+
+class TypedCheck:
+    """Exact, regex-free equivalent of ``re.match`` for one family of patterns"""
+
+    def predicate(self) -> Callable[[str], bool]:
+        """Per-value check of a string with its trailing newline stripped"""
+        raise NotImplementedError
+
+    def vector_matches(self, block: CodePoints) -> np.ndarray:
+        """Match mask over the code point matrix, exact on ASCII rows"""
+        raise NotImplementedError
+
+    def matches(self, block: CodePoints) -> np.ndarray:
+        """Match mask of non-null string values"""
+        if block.matrix is not None:
+            matched = self.vector_matches(block)
+        else:
+            matched = np.zeros(len(block), dtype=bool)
+        predicate = self.predicate()
+        for position in np.flatnonzero(block.fallback).tolist():
+            matched[position] = predicate(_strip_newline(block.values[position]))
+        return matched
+
+    def numeric_matches(self, values: np.ndarray) -> Optional[np.ndarray]:
+        """Match mask of non-null numeric values judged by value, or None to use their string form"""
+        return None
+
+
+class EnumCheck(TypedCheck):
+    """^(A|B|C)$, ^[123]$: membership in a fixed set of strings"""
+
+    def __init__(self, values: set):
+        self.values = frozenset(values)
+
+    def matches(self, block):
+        stripped = pd.Series(block.values, dtype=object).str.removesuffix('\n')
+        return stripped.isin(self.values).to_numpy()
+
+
+class RunCheck(TypedCheck):
+    """^\\d+$, ^\\d{4,6}$, ^[A-Z]{3}$: a run of one character class with a length range"""
+
+    def __init__(self, char_class: str, min_length: int, max_length: int):
+        self.char_class = char_class
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def predicate(self):
+        in_class = _class_predicate(self.char_class)
+        min_length, max_length = self.min_length, self.max_length
+        return lambda s: min_length <= len(s) <= max_length and (not s or in_class(s))
+
+    def vector_matches(self, block):
+        lengths = block.lengths
+        matched = (lengths >= self.min_length) & (lengths <= self.max_length)
+        return matched & (block.in_class(self.char_class) | ~block.content()).all(axis=1)
+
+    def numeric_matches(self, values):
+        if self.char_class not in DIGIT_CLASSES:
+            return None
+        # A whole number has between min and max digits when it lies in [10**(min-1), 10**max)
+        if values.dtype.kind in 'iu':
+            matched = values >= 0
+        else:
+            values = values.astype(float)
+            matched = np.isfinite(values) & (values >= 0) & (values == np.floor(values))
+        if self.min_length > 1:
+            matched &= values >= float(10 ** (self.min_length - 1))
+        if self.max_length != sre.MAXREPEAT:
+            matched &= values < float(10 ** self.max_length)
+        return matched
+
+
+class DecimalCheck(TypedCheck):
+    """^-?\\d+(\\.\\d{1,4})?%?$, ^\\$?\\d{1,3}(,\\d{3})*(\\.\\d{2})?$: decimal numbers, percentages, amounts
+
+    The whole part is a head run of ``min_whole`` to ``max_whole`` digits,
+    followed by ``min_groups`` to ``max_groups`` groups of ``group_width``
+    digits each led by ``separator`` (thousands grouping), and may be
+    preceded by an optional sign and a currency ``prefix``.
+    """
+
+    def __init__(self, char_class: str, signed: bool, min_fraction: int, max_fraction: int, suffix: str = '',
+                 prefix: str = '', prefix_required: bool = False, min_whole: int = 1,
+                 max_whole: int = sre.MAXREPEAT, separator: str = '', group_width: int = 0, min_groups: int = 0,
+                 max_groups: int = 0):
+        self.char_class = char_class
+        self.signed = signed
+        self.min_fraction = min_fraction
+        self.max_fraction = max_fraction
+        self.suffix = suffix
+        self.prefix = prefix
+        self.prefix_required = prefix_required
+        self.min_whole = min_whole
+        self.max_whole = max_whole
+        self.separator = separator
+        self.group_width = group_width
+        self.min_groups = min_groups
+        self.max_groups = max_groups
+
+    def predicate(self):
+        in_class = CLASS_PREDICATES[self.char_class]
+        signed, suffix, prefix, prefix_required = self.signed, self.suffix, self.prefix, self.prefix_required
+        min_fraction, max_fraction = self.min_fraction, self.max_fraction
+        min_whole, max_whole = self.min_whole, self.max_whole
+        separator, group_width, min_groups, max_groups = self.separator, self.group_width, self.min_groups, self.max_groups
+
+        def predicate(s):
+            if suffix:
+                if not s.endswith(suffix):
+                    return False
+                s = s[:-len(suffix)]
+            if signed and s.startswith('-'):
+                s = s[1:]
+            if prefix:
+                if s.startswith(prefix):
+                    s = s[len(prefix):]
+                elif prefix_required:
+                    return False
+            whole, dot, fraction = s.partition('.')
+            head, *groups = whole.split(separator) if separator else [whole]
+            if not (min_whole <= len(head) <= max_whole and in_class(head)):
+                return False
+            if not min_groups <= len(groups) <= max_groups:
+                return False
+            if not all(len(group) == group_width and in_class(group) for group in groups):
+                return False
+            return not dot or (min_fraction <= len(fraction) <= max_fraction and in_class(fraction))
+        return predicate
+
+    def vector_matches(self, block):
+        matrix, lengths = block.matrix, block.lengths
+        rows = np.arange(len(block))
+        matched = np.ones(len(block), dtype=bool)
+
+        # Number body between an optional sign and prefix, and the suffix
+        start = np.zeros(len(block), dtype=np.int64)
+        end = lengths.copy()
+        if self.suffix:
+            matched &= (lengths > 0) & (matrix[rows, np.maximum(lengths - 1, 0)] == ord(self.suffix))
+            end -= 1
+
+        def leading(char):
+            return (start < end) & (matrix[rows, np.minimum(start, block.width - 1)] == ord(char))
+
+        if self.signed:
+            start += leading('-')
+        if self.prefix:
+            has_prefix = leading(self.prefix)
+            if self.prefix_required:
+                matched &= has_prefix
+            start += has_prefix
+        columns = np.arange(block.width)
+        body = (columns >= start[:, None]) & (columns < end[:, None])
+
+        dots = body & (matrix == ord('.'))
+        dot_count = dots.sum(axis=1)
+        dot_at = np.where(dot_count > 0, dots.argmax(axis=1), end)
+        fraction = end - dot_at - 1
+        matched &= (dot_count == 0) | (
+            (dot_count == 1) & (fraction >= max(self.min_fraction, 1)) & (fraction <= self.max_fraction))
+
+        # Separators only count in the whole part; anywhere else they are invalid characters
+        separators = np.zeros(body.shape, dtype=bool)
+        if self.separator:
+            separators = body & (columns < dot_at[:, None]) & (matrix == ord(self.separator))
+        matched &= ~(body & ~dots & ~separators & ~block.in_class(self.char_class)).any(axis=1)
+
+        group_count = separators.sum(axis=1)
+        head_end = np.where(group_count > 0, separators.argmax(axis=1), dot_at)
+        head = head_end - start
+        matched &= (head >= self.min_whole) & (head <= self.max_whole)
+        if self.separator:
+            # Groups of exactly group_width digits: every separator sits a whole number of steps after the first
+            step = self.group_width + 1
+            matched &= (group_count >= self.min_groups) & (group_count <= self.max_groups)
+            matched &= dot_at - head_end == group_count * step
+            matched &= ~(separators & ((columns - head_end[:, None]) % step != 0)).any(axis=1)
+        return matched
+
+    def numeric_matches(self, values):
+        # Only reached for frames read with inferred dtypes; CSV uploads validated as text never get here
+        if self.suffix or self.prefix_required or self.min_groups:
+            return None
+        values = values.astype(float)
+        matched = np.isfinite(values)
+        if not self.signed:
+            matched &= values >= 0
+        # A number prints without grouping, so its whole part must fit the head run
+        whole = np.floor(np.abs(values))
+        if self.min_whole > 1:
+            matched &= whole >= float(10 ** (self.min_whole - 1))
+        if self.max_whole != sre.MAXREPEAT:
+            matched &= whole < float(10 ** self.max_whole)
+        if self.max_fraction != sre.MAXREPEAT:
+            matched &= np.round(values, self.max_fraction) == values
+        return matched
+
+
+class ShapeCheck(TypedCheck):
+    """^\\d{4}-\\d{2}-\\d{2}$, ^\\d{2}-\\d{7}$: fixed-width fields and literal separators"""
+
+    def __init__(self, segments: List[Tuple[str, int]]):
+        # (literal text or class name, width)
+        self.segments = segments
+        self.length = sum(width for _, width in segments)
+
+    def predicate(self):
+        checks = []
+        start = 0
+        for kind, width in self.segments:
+            if _is_class(kind):
+                checks.append((start, start + width, _class_predicate(kind), None))
+            else:
+                checks.append((start, start + width, None, kind))
+            start += width
+        length = self.length
+
+        def predicate(s):
+            if len(s) != length:
+                return False
+            for begin, end, in_class, literal in checks:
+                part = s[begin:end]
+                if not (in_class(part) if in_class else part == literal):
+                    return False
+            return True
+        return predicate
+
+    def vector_matches(self, block):
+        matched = block.lengths == self.length
+        if block.width < self.length:
+            return np.zeros(len(block), dtype=bool)
+        start = 0
+        for kind, width in self.segments:
+            columns = slice(start, start + width)
+            if _is_class(kind):
+                matched &= block.in_class(kind, columns).all(axis=1)
+            else:
+                matched &= (block.matrix[:, columns] == np.array([ord(c) for c in kind], dtype=np.uint32)).all(axis=1)
+            start += width
+        return matched
+
+
+class AnyCheck(TypedCheck):
+    """.*: matches every value, as ``re.match`` only anchors at the start"""
+
+    def matches(self, block):
+        return np.ones(len(block), dtype=bool)
+
+    def numeric_matches(self, values):
+        return np.ones(len(values), dtype=bool)
+
+
+class AnyOfCheck(TypedCheck):
+    """^A$|^B$: alternation of anchored patterns"""
+
+    def __init__(self, checks: List[TypedCheck]):
+        self.checks = checks
+
+    def matches(self, block):
+        return np.logical_or.reduce([check.matches(block) for check in self.checks])
+
+    def numeric_matches(self, values):
+        masks = [check.numeric_matches(values) for check in self.checks]
+        if any(mask is None for mask in masks):
+            return None
+        return np.logical_or.reduce(masks)
+
+
+def _lower_body(items) -> Optional[TypedCheck]:
+    items = _unwrap(items)
+    if not items:
+        return None
+
+    strings = _literal_strings(items)
+    if strings is not None:
+        return EnumCheck(strings)
+
+    # (?:A|B)$
+    if len(items) == 1 and items[0][0] == sre.BRANCH:
+        checks = [_lower_body(branch) for branch in items[0][1][1]]
+        return None if None in checks else AnyOfCheck(checks)
+
+    if len(items) == 1:
+        run = _run_of(*items[0])
+        if run:
+            return RunCheck(*run)
+
+    # [-] [$] digits [,ddd]* [. digits] [%]
+    rest = list(items)
+    signed = False
+    if rest and _optional_literal(*rest[0]) == '-':
+        signed = True
+        rest = rest[1:]
+    prefix, prefix_required = '', False
+    if rest and rest[0][0] == sre.LITERAL and _is_symbol(chr(rest[0][1])):
+        prefix, prefix_required = chr(rest[0][1]), True
+        rest = rest[1:]
+    elif rest and _is_symbol(_optional_literal(*rest[0]) or ''):
+        prefix = _optional_literal(*rest[0])
+        rest = rest[1:]
+    suffix = ''
+    if rest and rest[-1] == (sre.LITERAL, ord('%')):
+        suffix = '%'
+        rest = rest[:-1]
+    whole = _run_of(*rest[0]) if rest else None
+    if whole and whole[0] in DIGIT_CLASSES and whole[1] >= 1:
+        char_class = whole[0]
+        number = {'suffix': suffix, 'prefix': prefix, 'prefix_required': prefix_required,
+                  'min_whole': whole[1], 'max_whole': whole[2]}
+        rest = rest[1:]
+        grouping = _grouping_of(*rest[0]) if rest else None
+        grouped = bool(grouping) and grouping[1] == char_class
+        if grouped:
+            separator, _, group_width, min_groups, max_groups = grouping
+            number.update(separator=separator, group_width=group_width, min_groups=min_groups, max_groups=max_groups)
+            rest = rest[1:]
+        if not rest:
+            if signed or suffix or prefix or grouped:
+                return DecimalCheck(char_class, signed, 0, 0, **number)
+            return RunCheck(*whole)
+        op, av = rest[0]
+        if len(rest) == 1 and op == sre.MAX_REPEAT and av[:2] == (0, 1):
+            fraction = _unwrap(av[2])
+            if len(fraction) == 2 and fraction[0] == (sre.LITERAL, ord('.')):
+                run = _run_of(*fraction[1])
+                if run and run[0] == char_class and run[1] >= 1:
+                    return DecimalCheck(char_class, signed, run[1], run[2], **number)
+
+    # Fixed-width fields separated by literals
+    segments = []
+    for op, av in items:
+        if op == sre.LITERAL:
+            segments.append((chr(av), 1))
+            continue
+        run = _run_of(op, av)
+        if not run or run[1] != run[2]:
+            return None
+        segments.append((run[0], run[1]))
+    return ShapeCheck(segments)
+
+
+def lower_pattern(pattern: str) -> Optional[TypedCheck]:
+    """Translate a rule pattern into an equivalent typed check, or None to keep the regex.
+
+    Only patterns anchored with `$` (per alternative) and without inline
+    flags are lowered; the checks reproduce ``re.match`` exactly on strings,
+    including `$` accepting one trailing newline.
+    """
+    try:
+        parsed = sre.parse(pattern)
+    except (re.error, RecursionError, OverflowError):
+        return None
+    if parsed.state.flags & ~re.UNICODE:
+        return None
+
+    items = list(parsed)
+    # Without `$`, a pattern that can match the empty string matches every value
+    if all((op, av) == (sre.AT, sre.AT_BEGINNING) or (op in (sre.MAX_REPEAT, sre.MIN_REPEAT) and av[0] == 0)
+           for op, av in items):
+        return AnyCheck()
+    # ^A$|^B$ parses as ^(?:A$|B$)
+    if len(items) == 2 and items[0] == (sre.AT, sre.AT_BEGINNING) and items[1][0] == sre.BRANCH:
+        items = items[1:]
+    branches = items[0][1][1] if len(items) == 1 and items[0][0] == sre.BRANCH else [items]
+    checks = []
+    for branch in branches:
+        branch = list(branch)
+        if branch and branch[0] == (sre.AT, sre.AT_BEGINNING):
+            branch = branch[1:]
+        if not branch or branch[-1] != (sre.AT, sre.AT_END):
+            return None
+        check = _lower_body(branch[:-1])
+        if check is None:
+            return None
+        checks.append(check)
+    return checks[0] if len(checks) == 1 else AnyOfCheck(checks)
@@ -0,0 +1,87 @@
+import os
+import json
+import threading
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from ..config import Config
+from .validation_engine import ValidationEngine
+
+
+@dataclass
+class CompiledRulebook:
+    """Parsed rulebook metadata together with its compiled validation engine"""
+    metadata: dict
+    engine: ValidationEngine
+    version: Tuple[int, int]
+
+
+class CompiledRulebookCache:
+    """In-process cache of compiled rulebooks keyed by UUID.
+
+    Entries are revalidated against the mtime and size of metadata.json, so
+    writes made by other workers are picked up; writes made in this process
+    invalidate the entry explicitly.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _metadata_path(self, uuid: str) -> str:
+        return os.path.join(self.base_path, uuid, 'metadata.json')
+
+    def get(self, uuid: str) -> Optional[CompiledRulebook]:
+        """Get the compiled rulebook, loading it from disk if it changed"""
+        try:
+            stat = os.stat(self._metadata_path(uuid))
+        except (FileNotFoundError, NotADirectoryError):
+            self.invalidate(uuid)
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(uuid)
+            if entry is not None and entry.version == version:
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        with open(self._metadata_path(uuid), 'r') as f:
+            metadata = json.load(f)
+        entry = CompiledRulebook(
+            metadata=metadata,
+            engine=ValidationEngine(metadata.get('rules', [])),
+            version=version
+        )
+
+        with self._lock:
+            self._entries[uuid] = entry
+        return entry
+
+    def invalidate(self, uuid: str):
+        """Drop a rulebook from the cache"""
+        with self._lock:
+            self._entries.pop(uuid, None)
+
+    def clear(self):
+        """Drop every cached rulebook"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0
+            }
+
+
+# Shared by every RulebookService instance in the worker
+rulebook_cache = CompiledRulebookCache(Config.UPLOAD_FOLDER)
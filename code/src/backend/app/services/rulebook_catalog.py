@@ -0,0 +1,130 @@
+import os
+import json
+import sqlite3
+import logging
+from contextlib import closing
+from typing import List, Optional, Tuple
+from ..config import Config
+
+# Summary fields kept in the catalog; the full rule arrays stay in metadata.json
+SUMMARY_FIELDS = (
+    'uuid', 'rulebook_name', 'description', 'original_filename', 'status',
+    'created_at', 'rule_count', 'file_size', 'processing_error'
+)
+
+# Columns the list view may be sorted by
+SORT_FIELDS = ('created_at', 'rulebook_name', 'status', 'rule_count', 'file_size')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rulebooks (
+    uuid TEXT PRIMARY KEY,
+    rulebook_name TEXT,
+    description TEXT,
+    original_filename TEXT,
+    status TEXT,
+    created_at TEXT,
+    rule_count INTEGER NOT NULL DEFAULT 0,
+    file_size INTEGER,
+    processing_error TEXT
+);
+CREATE INDEX IF NOT EXISTS rulebooks_status ON rulebooks (status);
+CREATE INDEX IF NOT EXISTS rulebooks_created_at ON rulebooks (created_at);
+"""
+
+UPSERT = (
+    f"INSERT OR REPLACE INTO rulebooks ({', '.join(SUMMARY_FIELDS)}) "
+    f"VALUES ({', '.join('?' for _ in SUMMARY_FIELDS)})"
+)
+
+
+def summarize(metadata: dict) -> dict:
+    """Catalog row of a rulebook's metadata"""
+    created_at = metadata.get('created_at')
+    return {
+        'uuid': metadata['uuid'],
+        'rulebook_name': metadata.get('rulebook_name'),
+        'description': metadata.get('description'),
+        'original_filename': metadata.get('original_filename'),
+        'status': metadata.get('status'),
+        'created_at': None if created_at is None else str(created_at),
+        'rule_count': len(metadata.get('rules') or []),
+        'file_size': metadata.get('file_size'),
+        'processing_error': metadata.get('processing_error')
+    }
+
+
+class RulebookCatalog:
+    """SQLite index of rulebook summaries for listing without reading every metadata.json.
+
+    Every write runs in its own transaction and connections are opened per
+    call, so the catalog can be shared by threads and by gunicorn workers. A
+    new or empty catalog is rebuilt from the rulebook folders on first use.
+    """
+
+    def __init__(self, db_path: str = None, base_path: str = None):
+        self.db_path = db_path or Config.CATALOG_PATH
+        self.base_path = base_path or Config.UPLOAD_FOLDER
+        self.logger = logging.getLogger(__name__)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            empty = conn.execute('SELECT COUNT(*) FROM rulebooks').fetchone()[0] == 0
+        if empty:
+            self.rebuild()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def upsert(self, metadata: dict):
+        """Insert or replace the summary of a rulebook"""
+        row = summarize(metadata)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(UPSERT, [row[field] for field in SUMMARY_FIELDS])
+
+    def delete(self, uuid: str):
+        """Remove a rulebook from the catalog"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM rulebooks WHERE uuid = ?', (uuid,))
+
+    def list(self, status: str = None, sort: str = 'created_at', descending: bool = True,
+             limit: int = None, offset: int = 0) -> Tuple[List[dict], int]:
+        """One page of rulebook summaries and the total number matching the filter"""
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort}'; expected one of {', '.join(SORT_FIELDS)}")
+
+        where, params = ('WHERE status = ?', [status]) if status else ('', [])
+        order = 'DESC' if descending else 'ASC'
+        with closing(self._connect()) as conn:
+            total = conn.execute(f'SELECT COUNT(*) FROM rulebooks {where}', params).fetchone()[0]
+            rows = conn.execute(
+                f'SELECT * FROM rulebooks {where} ORDER BY {sort} {order}, uuid LIMIT ? OFFSET ?',
+                [*params, -1 if limit is None else limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def get(self, uuid: str) -> Optional[dict]:
+        """Summary of one rulebook"""
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT * FROM rulebooks WHERE uuid = ?', (uuid,)).fetchone()
+        return dict(row) if row else None
+
+    def rebuild(self) -> int:
+        """Re-index every rulebook folder from its metadata.json"""
+        rows = []
+        for uuid in os.listdir(self.base_path):
+            metadata_path = os.path.join(self.base_path, uuid, 'metadata.json')
+            try:
+                with open(metadata_path, 'r') as f:
+                    metadata = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            metadata.setdefault('uuid', uuid)
+            rows.append(summarize(metadata))
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM rulebooks')
+            conn.executemany(UPSERT, [[row[field] for field in SUMMARY_FIELDS] for row in rows])
+        self.logger.info(f"Indexed {len(rows)} rulebooks into the catalog")
+        return len(rows)
@@ -1,189 +1,82 @@
 import uuid
 import os
+import shutil
 import json
+import copy
 import asyncio
 from datetime import datetime
 from pathlib import Path
-from flask import current_app
-from ..models.rulebook import Rulebook, Rule
-from ..utils.file_handler import save_rulebook_file, save_metadata, get_metadata
-from .rule_generator_service import RuleGeneratorService
+from ..utils.upload import spool_upload, UploadTooLarge
+from werkzeug.utils import secure_filename
+from .registry import get_rule_generator
+from .rulebook_cache import rulebook_cache
+from .rulebook_catalog import RulebookCatalog
+from .parallel_validation import ParallelValidator
+from .validation_engine import DEFAULT_DETAIL, ValidationRun
 from ..config import Config
 import pandas as pd
-import google.generativeai as genai
-from typing import List
-import time
-import pdfplumber
+from typing import Iterator, List
 import logging
-import re
 
 class RulebookService:
     def __init__(self):
         self.base_path = Config.UPLOAD_FOLDER
+        os.makedirs(self.base_path, exist_ok=True)
         self.logger = logging.getLogger(__name__)
-        self.rule_generator = RuleGeneratorService()
+        self.cache = rulebook_cache
+        self.catalog = RulebookCatalog(Config.CATALOG_PATH, self.base_path)
         self.logger.info(f"Initialized RulebookService with base path: {self.base_path}")
 
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract relevant regulatory text from PDF file using pdfplumber"""
-        try:
-            relevant_text = []
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    # Get page dimensions
-                    page_height = page.height
-                    page_width = page.width
-                    
-                    # Extract text with word positions
-                    words = page.extract_words(
-                        keep_blank_chars=True,
-                        use_text_flow=True,
-                        horizontal_ltr=True,
-                        vertical_ttb=True,
-                        x_tolerance=3,
-                        y_tolerance=3
-                    )
-                    
-                    # Skip header and footer (typically 10% from top and bottom)
-                    header_threshold = page_height * 0.1
-                    footer_threshold = page_height * 0.9
-                    
-                    # Group words into lines
-                    current_line = []
-                    current_y = None
-                    lines = []
-                    
-                    for word in words:
-                        if current_y is None:
-                            current_y = word['top']
-                            current_line.append(word['text'])
-                        elif abs(word['top'] - current_y) < 5:  # Same line
-                            current_line.append(word['text'])
-                        else:  # New line
-                            if current_line:
-                                lines.append(' '.join(current_line))
-                            current_line = [word['text']]
-                            current_y = word['top']
-                    
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                    
-                    # Filter and process lines
-                    for line in lines:
-                        # Skip empty lines
-                        if not line.strip():
-                            continue
-                            
-                        # Skip headers and footers
-                        if any(word['top'] < header_threshold or word['top'] > footer_threshold 
-                               for word in page.extract_words()):
-                            continue
-                            
-                        # Skip page numbers and common header/footer text
-                        if any(skip in line.lower() for skip in ['page', 'confidential', 'all rights reserved']):
-                            continue
-                            
-                        # Skip lines that are too short (likely headers/footers)
-                        if len(line.strip()) < 20:
-                            continue
-                            
-                        # Skip lines that are too long (likely tables or formatting)
-                        if len(line.strip()) > 200:
-                            continue
-                            
-                        relevant_text.append(line.strip())
-            
-            # Join the filtered text
-            extracted_text = '\n'.join(relevant_text)
-            
-            # Remove excessive whitespace and normalize line breaks
-            extracted_text = '\n'.join(line for line in extracted_text.split('\n') if line.strip())
-            
-            # Remove common PDF artifacts
-            extracted_text = extracted_text.replace('\x0c', '')  # Remove form feed characters
-            extracted_text = ' '.join(extracted_text.split())  # Normalize whitespace
-            
-            return extracted_text
-            
-        except Exception as e:
-            raise Exception(f"Error extracting text from PDF: {str(e)}")
+    @property
+    def rule_generator(self):
+        """Shared Gemini rule generator, configured only when a rulebook is first processed"""
+        return get_rule_generator()
+
+    def _save_metadata(self, rulebook_uuid: str, metadata: dict):
+        """Write rulebook metadata, drop the stale compiled copy and update the catalog"""
+        metadata_path = os.path.join(self.base_path, rulebook_uuid, 'metadata.json')
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f, default=str)
+        self.cache.invalidate(rulebook_uuid)
+        self.catalog.upsert(metadata)
+        return metadata_path
 
     async def create_rulebook(self, file, rulebook_name: str, description: str) -> dict:
-        """Create a new rulebook from uploaded PDF"""
+        """Create a new rulebook from an uploaded PDF, awaiting rule generation on the running event loop"""
         try:
-            # Generate UUID for the rulebook
-            rulebook_uuid = str(uuid.uuid4())
-            rulebook_dir = os.path.join(self.base_path, rulebook_uuid)
-            os.makedirs(rulebook_dir, exist_ok=True)
-            
-            # Save the uploaded file
-            file_path = os.path.join(rulebook_dir, file.filename)
-            file.save(file_path)
-            
-            # Create initial metadata
-            metadata = {
-                'uuid': rulebook_uuid,
-                'rulebook_name': rulebook_name,
-                'description': description,
-                'file_path': file_path,
-                'created_at': datetime.utcnow().isoformat(),
-                'file_size': os.path.getsize(file_path),
-                'original_filename': file.filename,
-                'status': 'PROCESSING',
-                'rules': []
-            }
-            
-            # Save initial metadata
-            metadata_path = os.path.join(rulebook_dir, 'metadata.json')
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, default=str)
-            
-            # Generate rules from the PDF
-            try:
-                # Generate rules directly from the PDF file
-                rules = await self.rule_generator.generate_rules(file_path)
-                
-                # Update metadata with rules and status
-                metadata['rules'] = [rule.dict() for rule in rules]
-                metadata['status'] = 'COMPLETED'
-                
-                # Save updated metadata
-                with open(metadata_path, 'w') as f:
-                    json.dump(metadata, f, default=str)
-                
-            except Exception as e:
-                metadata['status'] = 'FAILED'
-                metadata['processing_error'] = str(e)
-                with open(metadata_path, 'w') as f:
-                    json.dump(metadata, f, default=str)
-                raise
-            
-            return metadata
-            
+            metadata = await asyncio.to_thread(self.register_rulebook, file, rulebook_name, description)
+            return await self.process_rulebook_async(metadata['uuid'])
+        except UploadTooLarge:
+            raise
         except Exception as e:
+            self.logger.error(f"Error creating rulebook: {str(e)}")
             raise Exception(f"Error creating rulebook: {str(e)}")
 
     def get_rulebook(self, uuid: str) -> dict:
         """Get rulebook metadata by UUID"""
         try:
-            metadata_path = os.path.join(self.base_path, uuid, 'metadata.json')
-            if not os.path.exists(metadata_path):
+            compiled = self.cache.get(uuid)
+            if not compiled:
                 return None
             
-            with open(metadata_path, 'r') as f:
-                return json.load(f)
+            # Callers reformat fields in place, so never hand out the cached dict
+            return copy.deepcopy(compiled.metadata)
         except Exception as e:
             raise Exception(f"Error retrieving rulebook: {str(e)}")
 
-    def get_all_rulebooks(self) -> List[dict]:
-        """Get all rulebooks"""
+    def get_all_rulebooks(self, status: str = None, sort: str = 'created_at', descending: bool = True,
+                          limit: int = None, offset: int = 0) -> List[dict]:
+        """Get rulebook summaries from the catalog (rules are only loaded by get_rulebook)"""
+        return self.list_rulebooks(status, sort, descending, limit, offset)[0]
+
+    def list_rulebooks(self, status: str = None, sort: str = 'created_at', descending: bool = True,
+                       limit: int = None, offset: int = 0):
+        """Get one page of rulebook summaries and the total matching the filter"""
         try:
-            rulebooks = []
-            for uuid in os.listdir(self.base_path):
-                rulebook = self.get_rulebook(uuid)
-                if rulebook:
-                    rulebooks.append(rulebook)
-            return rulebooks
+            return self.catalog.list(status=status, sort=sort, descending=descending,
+                                     limit=limit, offset=offset)
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Error retrieving rulebooks: {str(e)}")
 
@@ -205,138 +98,85 @@ class RulebookService:
             
             # Remove the directory itself
             os.rmdir(rulebook_dir)
+            self.cache.invalidate(uuid)
+            self.catalog.delete(uuid)
             return True
             
         except Exception as e:
             self.logger.error(f"Error deleting rulebook {uuid}: {str(e)}")
             raise Exception(f"Error deleting rulebook: {str(e)}")
 
-    def validate_transactions(self, csv_file, rulebook_id):
-        """Validate transactions against rulebook rules"""
+    def _validator(self, rulebook_id, chunksize: int = None, workers: int = None):
+        """Engine of a rulebook, the validator to run it with (parallel with more than one worker) and the chunk size"""
+        compiled = self.cache.get(rulebook_id)
+        if not compiled:
+            raise ValueError("Rulebook not found")
+
+        workers = workers or Config.VALIDATION_WORKERS
+        if workers > 1:
+            return compiled.engine, ParallelValidator(compiled.engine, workers), chunksize or Config.VALIDATION_PARTITION_ROWS
+        return compiled.engine, compiled.engine, chunksize or Config.VALIDATION_CHUNK_SIZE
+
+    def validate_transactions(self, csv_file, rulebook_id, chunksize: int = None, workers: int = None,
+                              detail=DEFAULT_DETAIL):
+        """Validate transactions against rulebook rules
+        
+        The CSV is streamed in chunks of ``chunksize`` rows so peak memory is
+        bounded by the chunk size rather than the file size. Cells are read as
+        raw text: per-chunk dtype inference would make the string form of a
+        value (e.g. "5" vs "5.0") depend on chunk boundaries. With more than
+        one worker, chunks of VALIDATION_PARTITION_ROWS are validated across
+        a process pool. ``detail`` selects the row records kept: 'summary',
+        'violations' (failing rows), 'full' (every row) or a ResultSink
+        paging them with a cursor.
+        """
         try:
-            # Read CSV file
-            df = pd.read_csv(csv_file)
-            total_rows = len(df)
-            
-            # Get rulebook rules
-            rulebook = self.get_rulebook(rulebook_id)
-            if not rulebook:
-                raise ValueError("Rulebook not found")
-            
-            # Initialize validation results
-            validation_results = {
-                "total_transactions": total_rows,  # Set total rows from CSV
-                "violations": {
-                    "total_rows": total_rows,  # Set total rows from CSV
-                    "valid_rows": 0,
-                    "invalid_rows": 0,
-                    "row_validations": [],
-                    "column_validations": {},
-                    "summary": {
-                        "total_columns": len(rulebook.get("rules", [])),
-                        "columns_found": len(df.columns),
-                        "columns_missing": 0,
-                        "validation_stats": {}
-                    },
-                    "validation_rate": 0.0
-                }
-            }
-            
-            # Track column validation stats
-            column_stats = {}
-            
-            # Validate each row
-            for index, row in df.iterrows():
-                row_validation = {
-                    "row_index": index + 1,
-                    "row_data": {},
-                    "is_valid": True,
-                    "errors": []
-                }
-                
-                # Convert row data to dict and handle NaN values
-                for col in df.columns:
-                    value = row.get(col)
-                    if pd.isna(value):
-                        row_validation["row_data"][col] = None
-                    else:
-                        row_validation["row_data"][col] = str(value)
-                
-                # Validate each column against rules
-                for rule in rulebook.get("rules", []):
-                    column = rule.get("column_name")
-                    if column not in df.columns:
-                        validation_results["violations"]["summary"]["columns_missing"] += 1
-                        continue
-                        
-                    value = row.get(column)
-                    pattern = rule.get("regex_pattern", "")
-                    
-                    # Clean pattern by removing r"..." format
-                    pattern = pattern.replace('r"', '').replace('"', '')
-                    
-                    # Skip validation if value is empty
-                    if pd.isna(value):
-                        continue
-                        
-                    # Convert value to string for regex matching
-                    value_str = str(value)
-                    
-                    try:
-                        if not re.match(pattern, value_str):
-                            row_validation["is_valid"] = False
-                            row_validation["errors"].append({
-                                "column": column,
-                                "value": value_str,
-                                "pattern": pattern,
-                                "description": rule.get("description", "Invalid format")
-                            })
-                            
-                            # Update column stats
-                            if column not in column_stats:
-                                column_stats[column] = {"valid": 0, "invalid": 0}
-                            column_stats[column]["invalid"] += 1
-                    except Exception as e:
-                        row_validation["is_valid"] = False
-                        row_validation["errors"].append({
-                            "column": column,
-                            "value": value_str,
-                            "pattern": pattern,
-                            "description": f"Validation error: {str(e)}"
-                        })
-                        
-                        if column not in column_stats:
-                            column_stats[column] = {"valid": 0, "invalid": 0}
-                        column_stats[column]["invalid"] += 1
-                
-                # Update row validation stats
-                if row_validation["is_valid"]:
-                    validation_results["violations"]["valid_rows"] += 1
-                else:
-                    validation_results["violations"]["invalid_rows"] += 1
-                
-                validation_results["violations"]["row_validations"].append(row_validation)
-            
-            # Update column validations
-            for column in df.columns:
-                if column not in column_stats:
-                    column_stats[column] = {"valid": 0, "invalid": 0}
-                column_stats[column]["valid"] = validation_results["violations"]["valid_rows"]
-                validation_results["violations"]["column_validations"][column] = column_stats[column]
-            
-            # Calculate validation rate
-            if total_rows > 0:
-                validation_results["violations"]["validation_rate"] = round(
-                    (validation_results["violations"]["valid_rows"] / total_rows) * 100, 2
-                )
-            
-            return validation_results
+            # Stream the CSV and evaluate every rule column-wise per chunk
+            _, validator, chunksize = self._validator(rulebook_id, chunksize, workers)
+            with pd.read_csv(csv_file, dtype=str, chunksize=chunksize) as reader:
+                return validator.validate_chunks(reader, detail)
             
         except Exception as e:
             raise ValueError(f"Validation error: {str(e)}")
 
-    def create_rulebook_sync(self, file, rulebook_name, description):
-        """Create a new rulebook synchronously"""
+    def stream_transactions(self, csv_file, rulebook_id, chunksize: int = None, workers: int = None,
+                            detail=DEFAULT_DETAIL):
+        """Validate transactions like validate_transactions, yielding record batches as each chunk is validated
+
+        Yields lists of {"type": "row_validation"} records and finally a
+        {"type": "summary"} record holding the result without row records.
+        An unknown rulebook or detail level raises ValueError before anything
+        is yielded.
+        """
+        engine, validator, chunksize = self._validator(rulebook_id, chunksize, workers)
+        run = ValidationRun(engine, detail, keep_rows=False)
+
+        def batches():
+            with pd.read_csv(csv_file, dtype=str, chunksize=chunksize) as reader:
+                for rows in validator.run_chunks(run, reader):
+                    yield [{'type': 'row_validation', 'data': row} for row in rows]
+            yield [{'type': 'summary', 'data': run.result()}]
+        return batches()
+
+    def violation_batches(self, csv_file, rulebook_id, chunksize: int = None) -> Iterator[pd.DataFrame]:
+        """Long-format violations (row_index, column, rule, pattern, description, value) of a CSV file, per chunk
+
+        Cells are read as raw text, as in validate_transactions. An unknown
+        rulebook raises ValueError before any batch is produced.
+        """
+        engine, _, chunksize = self._validator(rulebook_id, chunksize, workers=1)
+
+        def batches():
+            row_offset = 0
+            quarantined = {}
+            with pd.read_csv(csv_file, dtype=str, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    yield engine.violation_table(chunk, row_offset, quarantined)
+                    row_offset += len(chunk)
+        return batches()
+
+    def register_rulebook(self, file, rulebook_name, description):
+        """Save an uploaded PDF and record its rulebook as PENDING"""
         try:
             # Generate UUID
             rulebook_uuid = str(uuid.uuid4())
@@ -347,9 +187,10 @@ class RulebookService:
             os.makedirs(rulebook_dir, exist_ok=True)
             self.logger.info(f"Created rulebook directory: {rulebook_dir}")
             
-            # Save uploaded file
-            file_path = os.path.join(rulebook_dir, file.filename)
-            file.save(file_path)
+            # Stream the uploaded file into the rulebook directory, hashing it on the way
+            file_path = os.path.join(rulebook_dir, secure_filename(file.filename))
+            with spool_upload(file, directory=rulebook_dir, max_bytes=Config.MAX_CONTENT_LENGTH) as upload:
+                upload.persist(file_path)
             self.logger.info(f"Saved uploaded file to: {file_path}")
             
             # Create initial metadata
@@ -359,42 +200,80 @@ class RulebookService:
                 'description': description,
                 'file_path': file_path,
                 'created_at': datetime.now(),
-                'file_size': os.path.getsize(file_path),
+                'file_size': upload.size,
+                'sha256': upload.sha256,
                 'original_filename': file.filename,
-                'status': 'PROCESSING'
+                'status': 'PENDING',
+                'rules': []
             }
             
             # Save initial metadata
-            metadata_path = os.path.join(rulebook_dir, 'metadata.json')
-            with open(metadata_path, 'w') as f:
-                json.dump(metadata, f, default=str)
+            metadata_path = self._save_metadata(rulebook_uuid, metadata)
             self.logger.info(f"Saved initial metadata to: {metadata_path}")
             
-            try:
-                # Generate rules from PDF
-                self.logger.info("Starting rule generation from PDF")
-                rules = self.rule_generator.generate_rules_sync(file_path)
-                self.logger.info(f"Generated {len(rules)} rules from PDF")
-                
-                # Update metadata with generated rules
-                metadata['rules'] = rules
-                metadata['status'] = 'COMPLETED'
-                
-                # Save updated metadata
-                with open(metadata_path, 'w') as f:
-                    json.dump(metadata, f, default=str)
-                self.logger.info("Updated metadata with generated rules")
-                
-                return metadata
-                
-            except Exception as e:
-                self.logger.error(f"Error during rule generation: {str(e)}")
-                metadata['status'] = 'FAILED'
-                metadata['processing_error'] = str(e)
-                with open(metadata_path, 'w') as f:
-                    json.dump(metadata, f, default=str)
-                raise Exception(f"Error generating rules: {str(e)}")
+            return metadata
             
+        except UploadTooLarge:
+            shutil.rmtree(rulebook_dir, ignore_errors=True)
+            raise
+        except Exception as e:
+            self.logger.error(f"Error creating rulebook: {str(e)}")
+            raise Exception(f"Error creating rulebook: {str(e)}")
+
+    def _start_processing(self, rulebook_uuid) -> dict:
+        metadata = self.get_rulebook(rulebook_uuid)
+        if not metadata:
+            raise ValueError(f"Rulebook {rulebook_uuid} not found")
+        
+        metadata['status'] = 'PROCESSING'
+        self._save_metadata(rulebook_uuid, metadata)
+        self.logger.info("Starting rule generation from PDF")
+        return metadata
+
+    def _finish_processing(self, rulebook_uuid, metadata: dict, rules: List[dict] = None, error: Exception = None) -> dict:
+        """Record generated rules (COMPLETED) or the generation error (FAILED)"""
+        if error is not None:
+            self.logger.error(f"Error during rule generation: {str(error)}")
+            metadata['status'] = 'FAILED'
+            metadata['processing_error'] = str(error)
+        else:
+            self.logger.info(f"Generated {len(rules)} rules from PDF")
+            metadata['rules'] = rules
+            metadata['status'] = 'COMPLETED'
+        self._save_metadata(rulebook_uuid, metadata)
+        return metadata
+
+    def fail_abandoned(self, rulebook_uuid, error: str):
+        """Record as FAILED a rulebook still PENDING or PROCESSING whose rule generation can no longer finish"""
+        metadata = self.get_rulebook(rulebook_uuid)
+        if metadata and metadata['status'] in ('PENDING', 'PROCESSING'):
+            self._finish_processing(rulebook_uuid, metadata, error=RuntimeError(error))
+
+    def process_rulebook(self, rulebook_uuid):
+        """Generate rules for a registered rulebook and record the outcome"""
+        metadata = self._start_processing(rulebook_uuid)
+        try:
+            rules = self.rule_generator.generate_rules_sync(metadata['file_path'], metadata.get('sha256'))
+        except Exception as e:
+            self._finish_processing(rulebook_uuid, metadata, error=e)
+            raise Exception(f"Error generating rules: {str(e)}")
+        return self._finish_processing(rulebook_uuid, metadata, rules)
+
+    async def process_rulebook_async(self, rulebook_uuid):
+        """process_rulebook for an event loop: Gemini is awaited, metadata and catalog writes run in threads"""
+        metadata = await asyncio.to_thread(self._start_processing, rulebook_uuid)
+        try:
+            rules = await self.rule_generator.generate_rules(metadata['file_path'], metadata.get('sha256'))
+        except Exception as e:
+            await asyncio.to_thread(self._finish_processing, rulebook_uuid, metadata, error=e)
+            raise Exception(f"Error generating rules: {str(e)}")
+        return await asyncio.to_thread(self._finish_processing, rulebook_uuid, metadata, rules)
+
+    def create_rulebook_sync(self, file, rulebook_name, description):
+        """Create a new rulebook synchronously"""
+        try:
+            metadata = self.register_rulebook(file, rulebook_name, description)
+            return self.process_rulebook(metadata['uuid'])
         except Exception as e:
             self.logger.error(f"Error creating rulebook: {str(e)}")
-            raise Exception(f"Error creating rulebook: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"Error creating rulebook: {str(e)}") 
@@ -0,0 +1,39 @@
+import hashlib
+from typing import Optional
+import numpy as np
+from ..config import Config
+from .file_cache import FileLRUCache
+
+
+def score_key(file_digest: str, model_digest: str) -> str:
+    """Cache key of a score vector: the same file scored by the same model gives the same scores"""
+    key = hashlib.sha256()
+    for part in (file_digest, model_digest):
+        key.update(part.encode('utf-8'))
+        key.update(b'\0')
+    return key.hexdigest()
+
+
+class ScoreCache(FileLRUCache):
+    """Persistent cache of per-row anomaly score vectors keyed by content hash.
+
+    Each entry is a .npy file named after its key, readable by every worker
+    and kept in a FileLRUCache bounded by ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        super().__init__(
+            cache_dir or Config.SCORE_CACHE_FOLDER,
+            max_bytes if max_bytes is not None else Config.SCORE_CACHE_MAX_BYTES,
+            suffix='.npy',
+            name='score'
+        )
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get the cached scores for a key"""
+        return self._read(key, lambda path: np.load(path, allow_pickle=False))
+
+    def put(self, key: str, scores: np.ndarray):
+        """Store the scores for a key and evict old entries past the size bound"""
+        scores = np.asarray(scores, dtype=np.float64)
+        self._write(key, lambda f: np.save(f, scores, allow_pickle=False), mode='wb')
@@ -0,0 +1,608 @@
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from ..config import Config
+from .detail_levels import DEFAULT_DETAIL
+from .regex_safety import EXPONENTIAL, RegexRisk, analyze_pattern, compile_guarded
+from .rule_lowering import CodePoints, TypedCheck, lower_pattern
+
+
+@dataclass
+class CompiledRule:
+    """A rulebook rule with its regex pattern sanitized and compiled once"""
+    column_name: str
+    description: str
+    pattern: str
+    regex: Optional[re.Pattern] = None
+    compile_error: Optional[str] = None
+    # Super-linear backtracking risk, the time-bounded `regex` pattern used for it and why the rule is skipped
+    risk: Optional[RegexRisk] = None
+    guarded: Optional[object] = None
+    # Set when compiling: the rule is never evaluated (a super-linear pattern with no safe engine)
+    quarantined: Optional[str] = None
+    # Regex-free equivalent of the pattern, when it belongs to a recognized family
+    check: Optional[TypedCheck] = None
+    # Match cost accumulated by this worker
+    values_checked: int = 0
+    match_seconds: float = 0.0
+
+    def error_description(self) -> str:
+        if self.regex is None:
+            return f"Validation error: {self.compile_error}"
+        return self.description
+
+    def engine(self) -> str:
+        if self.check is not None:
+            return 'typed'
+        return 'regex' if self.guarded is not None else 're'
+
+    def cost_report(self) -> dict:
+        return {
+            'column_name': self.column_name,
+            'pattern': self.pattern,
+            'risk': self.risk.to_dict() if self.risk else None,
+            'engine': self.engine(),
+            'quarantined': self.quarantined,
+            'values_checked': self.values_checked,
+            'match_ms': round(self.match_seconds * 1000, 3),
+            'us_per_value': round(self.match_seconds * 1e6 / self.values_checked, 3) if self.values_checked else None
+        }
+
+
+@dataclass
+class PartitionResult:
+    """Validation statistics of one partition (row range) of a file"""
+    columns: List[str]
+    rows: int
+    invalid_rows: int
+    column_invalid: Dict[str, int]
+    row_validations: List[dict]
+    # Rows after the sink's cursor that qualified for a record, whether or not one was built
+    matched_rows: int = 0
+    # (values checked, seconds) per rule index, rules quarantined while validating and values left unevaluated
+    rule_costs: Dict[int, Tuple[int, float]] = field(default_factory=dict)
+    quarantined: Dict[int, str] = field(default_factory=dict)
+    unevaluated: Dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class Evaluation:
+    """Outcome of evaluating every rule over one DataFrame"""
+    row_failed: np.ndarray
+    # (rule, failure mask) of every rule some row fails
+    failures: List[Tuple[CompiledRule, np.ndarray]]
+    column_values: Dict[str, 'ColumnValues']
+    rule_costs: Dict[int, Tuple[int, float]] = field(default_factory=dict)
+    # Rules newly quarantined (index -> reason) and values of each rule that could not be evaluated
+    quarantined: Dict[int, str] = field(default_factory=dict)
+    unevaluated: Dict[int, int] = field(default_factory=dict)
+
+
+class ColumnValues:
+    """Null mask and typed view of one column, with its string form computed only if a rule needs it"""
+
+    def __init__(self, series: pd.Series):
+        self.series = series
+        self.not_null = series.notna().to_numpy()
+        # Numeric columns can be judged by value by typed checks instead of by their str() form
+        self.numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        self._strings = None
+        self._code_points = None
+
+    @property
+    def strings(self) -> np.ndarray:
+        if self._strings is None:
+            values = np.empty(len(self.series), dtype=object)
+            present = self.series[self.not_null]
+            # Columns read as text are already strings
+            if pd.api.types.infer_dtype(present, skipna=False) != 'string':
+                present = present.astype(str)
+            values[self.not_null] = present.to_numpy()
+            self._strings = values
+        return self._strings
+
+    def present_strings(self) -> np.ndarray:
+        return self.strings[self.not_null]
+
+    def code_points(self) -> CodePoints:
+        """Code point matrix of the present strings, shared by the typed checks of the column"""
+        if self._code_points is None:
+            self._code_points = CodePoints(self.present_strings())
+        return self._code_points
+
+    def present_numbers(self) -> np.ndarray:
+        return self.series.to_numpy()[self.not_null]
+
+    def value(self, position: int) -> str:
+        return self.strings[position]
+
+
+def clean_pattern(pattern: str) -> str:
+    """Remove the r"..." quoting the model wraps around generated patterns"""
+    return (pattern or '').replace('r"', '').replace('"', '')
+
+
+def compile_rules(rules: List[dict]) -> List[CompiledRule]:
+    """Sanitize and compile every rule of a rulebook"""
+    compiled = []
+    for rule in rules:
+        pattern = clean_pattern(rule.get('regex_pattern', ''))
+        regex = None
+        compile_error = None
+        risk = None
+        guarded = None
+        quarantined = None
+        check = None
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            # Invalid patterns fail every non-empty value, like the row-wise matcher did
+            compile_error = str(e)
+        else:
+            # Super-linear patterns run on the time-bounded engine when it is installed
+            risk = analyze_pattern(pattern)
+            if risk:
+                guarded = compile_guarded(pattern)
+                if guarded is None and risk.severity == EXPONENTIAL:
+                    quarantined = f"{risk.reason}; no time-bounded regex engine is installed"
+            else:
+                check = lower_pattern(pattern)
+        compiled.append(CompiledRule(
+            column_name=rule.get('column_name'),
+            description=rule.get('description', 'Invalid format'),
+            pattern=pattern,
+            regex=regex,
+            compile_error=compile_error,
+            risk=risk,
+            guarded=guarded,
+            quarantined=quarantined,
+            check=check
+        ))
+    return compiled
+
+
+def row_errors(failures, column_values, positions: np.ndarray) -> Dict[int, List[dict]]:
+    """Error records of the failing rows among ``positions``, keyed by position in the partition"""
+    errors = {}
+    for rule, failed in failures:
+        values = column_values[rule.column_name]
+        description = rule.error_description()
+        for position in positions[failed[positions]].tolist():
+            errors.setdefault(position, []).append({
+                "column": rule.column_name,
+                "value": values.value(position),
+                "pattern": rule.pattern,
+                "description": description
+            })
+    return errors
+
+
+def row_records(df: pd.DataFrame, positions: np.ndarray, errors: Dict[int, List[dict]], row_offset: int) -> List[dict]:
+    """Row validation records of the rows at ``positions``"""
+    if not len(positions):
+        return []
+    rows = df.iloc[positions]
+    row_data = rows.astype(str).where(rows.notna(), None).to_dict('records')
+    return [
+        {
+            "row_index": row_offset + position + 1,
+            "row_data": data,
+            "is_valid": position not in errors,
+            "errors": errors.get(position, [])
+        }
+        for position, data in zip(positions.tolist(), row_data)
+    ]
+
+
+class ResultSink:
+    """Decides which row validation records a run builds, so callers only pay for the detail they use.
+
+    Records are paged with ``cursor`` (the last row index already returned)
+    and ``limit``; only the records of the requested page are built.
+    """
+    detail = None
+
+    def __init__(self, cursor: int = 0, limit: int = None):
+        if cursor < 0 or (limit is not None and limit < 1):
+            raise ValueError("cursor must be >= 0 and limit >= 1")
+        self.cursor = cursor
+        self.limit = limit
+
+    def candidates(self, row_failed: np.ndarray) -> np.ndarray:
+        """Positions of the partition rows this sink reports"""
+        raise NotImplementedError
+
+    def partition_rows(self, df, row_failed, failures, column_values, row_offset: int,
+                       remaining: int = None) -> Tuple[List[dict], int]:
+        """Records of the reported rows after the cursor (at most ``remaining``) and how many rows qualified"""
+        positions = self.candidates(row_failed)
+        positions = positions[positions + row_offset + 1 > self.cursor]
+        selected = positions if remaining is None else positions[:remaining]
+        if not len(selected):
+            return [], len(positions)
+        return row_records(df, selected, row_errors(failures, column_values, selected), row_offset), len(positions)
+
+
+class SummarySink(ResultSink):
+    """Statistics only"""
+    detail = 'summary'
+
+    def candidates(self, row_failed):
+        return np.empty(0, dtype=np.int64)
+
+
+class ViolationsSink(ResultSink):
+    """Records of failing rows only"""
+    detail = 'violations'
+
+    def candidates(self, row_failed):
+        return np.flatnonzero(row_failed)
+
+
+class FullSink(ResultSink):
+    """Records of every row, valid ones included"""
+    detail = 'full'
+
+    def candidates(self, row_failed):
+        return np.arange(len(row_failed))
+
+
+SINKS = {sink.detail: sink for sink in (SummarySink, ViolationsSink, FullSink)}
+
+# Columns of the long-format violations table
+VIOLATION_TABLE_DTYPES = {
+    'row_index': 'int64', 'column': object, 'rule': 'int64', 'pattern': object, 'description': object, 'value': object
+}
+
+# Arrow types of the same columns, for exports written chunk by chunk
+VIOLATION_TABLE_SCHEMA = {
+    'row_index': 'int64', 'column': 'string', 'rule': 'int64', 'pattern': 'string', 'description': 'string',
+    'value': 'string'
+}
+
+
+def get_sink(detail: Union[str, ResultSink], cursor: int = 0, limit: int = None) -> ResultSink:
+    """Sink of a detail level name (a sink is returned as is)"""
+    if isinstance(detail, ResultSink):
+        return detail
+    sink = SINKS.get(detail)
+    if sink is None:
+        raise ValueError(f"Unknown detail level '{detail}', expected one of: {', '.join(SINKS)}")
+    return sink(cursor, limit)
+
+
+class ValidationEngine:
+    """Column-oriented regex validation of a DataFrame against rulebook rules.
+
+    Every rule is evaluated over a whole column at once and produces a boolean
+    violation mask; row-level error records are only built for failing rows.
+    Patterns of common families (digit runs, decimals, fixed-width shapes,
+    enumerations) are lowered to typed checks that skip the regex engine.
+    Rules flagged by the regex safety analyzer are matched with a per-value
+    timeout (or a value length bound without the `regex` engine). A rule that
+    exceeds it, or averages more than ``max_ms_per_value``, is quarantined for
+    the rest of the file: its remaining values are only matched up to the
+    length bound. Values left unevaluated pass and are counted per rule.
+    Quarantine is state of one validation run, never of the shared engine.
+    """
+
+    def __init__(self, rules: List[dict], match_timeout: float = None, max_risky_length: int = None,
+                 max_ms_per_value: float = None):
+        self.match_timeout = match_timeout or Config.RULE_MATCH_TIMEOUT
+        self.max_risky_length = max_risky_length or Config.RULE_MAX_RISKY_VALUE_LENGTH
+        self.max_ms_per_value = max_ms_per_value or Config.RULE_MAX_MS_PER_VALUE
+
+        # Plain rule dicts, cheap to ship to validation worker processes
+        self.rule_specs = [dict(rule) for rule in rules]
+        self.rules = compile_rules(rules)
+
+        # Bind rules to the columns they validate
+        self.column_rules = {}
+        for rule in self.rules:
+            self.column_rules.setdefault(rule.column_name, []).append(rule)
+
+    def validate(self, df: pd.DataFrame, detail: Union[str, ResultSink] = DEFAULT_DETAIL) -> dict:
+        """Validate a DataFrame and return the rulebook validation result
+
+        ``detail`` is a detail level name ('summary', 'violations', 'full') or
+        a ResultSink, which also carries the page of records to build.
+        """
+        return self.validate_chunks([df], detail)
+
+    def validate_chunks(self, chunks: Iterable[pd.DataFrame], detail: Union[str, ResultSink] = DEFAULT_DETAIL) -> dict:
+        """Validate DataFrame chunks one at a time, merging statistics incrementally"""
+        run = ValidationRun(self, detail)
+        for _ in self.run_chunks(run, chunks):
+            pass
+        return run.result()
+
+    def run_chunks(self, run: 'ValidationRun', chunks: Iterable[pd.DataFrame]) -> Iterator[List[dict]]:
+        """Validate chunks into ``run``, yielding the row records each one adds to the result"""
+        for chunk in chunks:
+            yield run.add(chunk)
+
+    def validate_partition(self, df: pd.DataFrame, row_offset: int = 0, detail: Union[str, ResultSink] = DEFAULT_DETAIL,
+                           remaining: int = None, quarantined: Dict[int, str] = None) -> PartitionResult:
+        """Validate one partition whose first row is row ``row_offset`` of the file, building at most ``remaining`` records
+
+        ``quarantined`` holds the rules quarantined earlier in the same file.
+        """
+        sink = get_sink(detail)
+        evaluation = self.evaluate(df, quarantined)
+        column_invalid = {}
+        for rule, failed in evaluation.failures:
+            column = rule.column_name
+            column_invalid[column] = column_invalid.get(column, 0) + int(failed.sum())
+        row_validations, matched_rows = sink.partition_rows(
+            df, evaluation.row_failed, evaluation.failures, evaluation.column_values, row_offset,
+            sink.limit if remaining is None else remaining
+        )
+
+        return PartitionResult(
+            columns=list(df.columns),
+            rows=len(df),
+            invalid_rows=int(evaluation.row_failed.sum()),
+            column_invalid=column_invalid,
+            row_validations=row_validations,
+            matched_rows=matched_rows,
+            rule_costs=evaluation.rule_costs,
+            quarantined=evaluation.quarantined,
+            unevaluated=evaluation.unevaluated
+        )
+
+    def evaluate(self, df: pd.DataFrame, quarantined: Dict[int, str] = None) -> Evaluation:
+        """Evaluate every rule over a DataFrame.
+
+        Rules in ``quarantined`` (index -> reason, from earlier chunks of the
+        same file) are matched with the length-bounded fallback only.
+        """
+        quarantined = quarantined or {}
+        evaluation = Evaluation(np.zeros(len(df), dtype=bool), [], {})
+
+        for index, rule in enumerate(self.rules):
+            column = rule.column_name
+            if column not in df.columns:
+                continue
+            if column not in evaluation.column_values:
+                evaluation.column_values[column] = ColumnValues(df[column])
+            values = evaluation.column_values[column]
+            checked = int(values.not_null.sum())
+            if rule.quarantined:
+                evaluation.unevaluated[index] = checked
+                continue
+
+            started = time.perf_counter()
+            failed = self._violation_mask(index, rule, values, index in quarantined, evaluation)
+            elapsed = time.perf_counter() - started
+            evaluation.rule_costs[index] = (checked, elapsed)
+
+            if (index not in quarantined and index not in evaluation.quarantined
+                    and elapsed * 1000 > self.max_ms_per_value * max(checked, 1000)):
+                evaluation.quarantined[index] = f"averaged {elapsed * 1000 / max(checked, 1):.2f} ms per value"
+            if not failed.any():
+                continue
+
+            evaluation.row_failed |= failed
+            evaluation.failures.append((rule, failed))
+
+        return evaluation
+
+    def _violation_mask(self, index: int, rule: CompiledRule, values: ColumnValues, quarantined: bool,
+                        evaluation: Evaluation) -> np.ndarray:
+        """Boolean mask of rows whose non-empty value does not match the rule"""
+        not_null = values.not_null
+        if rule.regex is None:
+            return not_null.copy()
+
+        unevaluated = 0
+        if quarantined:
+            matched, unevaluated = self._fallback_match(rule, values.present_strings())
+        elif rule.check is not None:
+            # Numeric columns are judged by value when the check supports it (1e+07 is a whole number)
+            matched = rule.check.numeric_matches(values.present_numbers()) if values.numeric else None
+            if matched is None:
+                matched = rule.check.matches(values.code_points())
+        elif rule.risk:
+            matched, unevaluated, reason = self._bounded_match(rule, values.present_strings())
+            if reason:
+                evaluation.quarantined[index] = reason
+        else:
+            matched = pd.Series(values.present_strings(), dtype=object).str.match(rule.regex).to_numpy(dtype=bool)
+
+        if unevaluated:
+            evaluation.unevaluated[index] = unevaluated
+        failed = np.zeros(len(not_null), dtype=bool)
+        failed[not_null] = ~matched
+        return failed
+
+    def _bounded_match(self, rule: CompiledRule, values: np.ndarray) -> Tuple[np.ndarray, int, Optional[str]]:
+        """Match a super-linear rule without letting one value stall the worker
+
+        Returns the match mask, the number of values left unevaluated and why
+        the rule got quarantined, if it did.
+        """
+        if rule.guarded is not None:
+            matched = np.zeros(len(values), dtype=bool)
+            for position, value in enumerate(values):
+                try:
+                    matched[position] = rule.guarded.match(value, timeout=self.match_timeout) is not None
+                except TimeoutError:
+                    # The value is not evaluated; the rest of the column falls back to the length bound
+                    matched[position] = True
+                    matched[position + 1:], unevaluated = self._fallback_match(rule, values[position + 1:])
+                    return matched, unevaluated + 1, f"{rule.risk.reason}; a match took longer than {self.match_timeout}s"
+            return matched, 0, None
+
+        # Without a time-bounded engine, bound the input length instead
+        matched, unevaluated = self._fallback_match(rule, values)
+        if unevaluated:
+            return matched, unevaluated, f"{rule.risk.reason}; values longer than {self.max_risky_length} characters"
+        return matched, 0, None
+
+    def _fallback_match(self, rule: CompiledRule, values: np.ndarray) -> Tuple[np.ndarray, int]:
+        """Match only values up to ``max_risky_length`` characters (with the timeout when the `regex` engine is installed)
+
+        Values left unevaluated count as matching; returns the mask and how many there were.
+        """
+        matched = np.ones(len(values), dtype=bool)
+        within = np.fromiter(map(len, values), dtype=np.int64, count=len(values)) <= self.max_risky_length
+        unevaluated = int((~within).sum())
+        if rule.guarded is not None:
+            for position in np.flatnonzero(within):
+                try:
+                    matched[position] = rule.guarded.match(values[position], timeout=self.match_timeout) is not None
+                except TimeoutError:
+                    unevaluated += 1
+        elif within.any():
+            matched[within] = pd.Series(values[within], dtype=object).str.match(rule.regex).to_numpy(dtype=bool)
+        return matched, unevaluated
+
+    def violation_table(self, df: pd.DataFrame, row_offset: int = 0, quarantined: Dict[int, str] = None) -> pd.DataFrame:
+        """Long-format violations of a DataFrame: one row per failing (row, rule) pair
+
+        ``quarantined`` carries the rules quarantined so far in the file and
+        is updated with those quarantined by this chunk.
+        """
+        evaluation = self.evaluate(df, quarantined)
+        if quarantined is not None:
+            quarantined.update(evaluation.quarantined)
+        failures, column_values = evaluation.failures, evaluation.column_values
+        indices = {id(rule): index for index, rule in enumerate(self.rules)}
+        parts = []
+        for rule, failed in failures:
+            positions = np.flatnonzero(failed)
+            parts.append(pd.DataFrame({
+                'row_index': positions + row_offset + 1,
+                'column': rule.column_name,
+                'rule': indices[id(rule)],
+                'pattern': rule.pattern,
+                'description': rule.error_description(),
+                'value': column_values[rule.column_name].strings[positions]
+            }))
+        if not parts:
+            return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in VIOLATION_TABLE_DTYPES.items()})
+        # Rules are evaluated one at a time; order the table by row like the row records
+        table = pd.concat(parts, ignore_index=True).astype(VIOLATION_TABLE_DTYPES)
+        return table.sort_values(['row_index', 'rule'], kind='stable', ignore_index=True)
+
+    def violated_rules(self, df: pd.DataFrame) -> List[int]:
+        """Indices of the rules that at least one row of a DataFrame violates"""
+        failed = {id(rule) for rule, _ in self.evaluate(df).failures}
+        return [index for index, rule in enumerate(self.rules) if id(rule) in failed]
+
+    def rule_costs(self) -> List[dict]:
+        """Per-rule risk, engine, quarantine state and accumulated match cost"""
+        return [rule.cost_report() for rule in self.rules]
+
+
+class ValidationRun:
+    """Accumulates validation statistics over the chunks of one file"""
+
+    def __init__(self, engine: ValidationEngine, detail: Union[str, ResultSink] = DEFAULT_DETAIL,
+                 keep_rows: bool = True):
+        self.engine = engine
+        self.sink = get_sink(detail)
+        # Streaming runs hand row records to the caller instead of keeping them
+        self.keep_rows = keep_rows
+        self.columns = []
+        self.total_rows = 0
+        self.invalid_rows = 0
+        self.column_invalid = {}
+        self.row_validations = []
+        self.returned = 0
+        self.last_row_index = None
+        self.matched_rows = 0
+        # Rules quarantined in this file (index -> reason) and values each rule left unevaluated
+        self.quarantined = {}
+        self.unevaluated = {}
+
+    def remaining(self) -> Optional[int]:
+        """Records still missing from the requested page (None when unlimited)"""
+        if self.sink.limit is None:
+            return None
+        return max(self.sink.limit - self.returned, 0)
+
+    def add(self, df: pd.DataFrame) -> List[dict]:
+        """Validate one chunk and merge its statistics"""
+        return self.merge(self.engine.validate_partition(df, self.total_rows, self.sink, self.remaining(), self.quarantined))
+
+    def merge(self, partition: PartitionResult) -> List[dict]:
+        """Merge the statistics of the next partition of the file and return the row records it adds"""
+        if not self.columns:
+            self.columns = partition.columns
+
+        for column, invalid in partition.column_invalid.items():
+            self.column_invalid[column] = self.column_invalid.get(column, 0) + invalid
+
+        # Partitions validated concurrently may each have built up to a full page
+        rows = partition.row_validations[:self.remaining()]
+        if self.keep_rows:
+            self.row_validations.extend(rows)
+        if rows:
+            self.returned += len(rows)
+            self.last_row_index = rows[-1]["row_index"]
+        self.matched_rows += partition.matched_rows
+        self.total_rows += partition.rows
+        self.invalid_rows += partition.invalid_rows
+
+        # Match costs accumulate on the engine, including those measured in worker processes
+        rules = self.engine.rules
+        for index, (checked, seconds) in partition.rule_costs.items():
+            rules[index].values_checked += checked
+            rules[index].match_seconds += seconds
+        for index, reason in partition.quarantined.items():
+            self.quarantined.setdefault(index, reason)
+        for index, count in partition.unevaluated.items():
+            self.unevaluated[index] = self.unevaluated.get(index, 0) + count
+        return rows
+
+    def result(self) -> dict:
+        """Build the rulebook validation result from the merged statistics"""
+        rules = self.engine.rules
+        valid_rows = self.total_rows - self.invalid_rows
+        columns_missing = sum(
+            len(column_rules) for column, column_rules in self.engine.column_rules.items()
+            if column not in self.columns
+        )
+
+        return {
+            "total_transactions": self.total_rows,
+            "violations": {
+                "total_rows": self.total_rows,
+                "valid_rows": valid_rows,
+                "invalid_rows": self.invalid_rows,
+                "row_validations": self.row_validations,
+                "column_validations": {
+                    column: {"valid": valid_rows, "invalid": self.column_invalid.get(column, 0)}
+                    for column in self.columns
+                },
+                "summary": {
+                    "total_columns": len(rules),
+                    "columns_found": len(self.columns),
+                    "columns_missing": columns_missing,
+                    "quarantined_rules": [
+                        {"column": rule.column_name, "pattern": rule.pattern,
+                         "reason": rule.quarantined or self.quarantined[index],
+                         "unevaluated_values": self.unevaluated.get(index, 0)}
+                        for index, rule in enumerate(rules) if rule.quarantined or index in self.quarantined
+                    ],
+                    "validation_stats": {}
+                },
+                "validation_rate": round((valid_rows / self.total_rows) * 100, 2) if self.total_rows > 0 else 0.0,
+                "page": self.page()
+            }
+        }
+
+    def page(self) -> dict:
+        """Detail level and cursor position of the returned row validations"""
+        more = self.matched_rows > self.returned
+        return {
+            "detail": self.sink.detail,
+            "cursor": self.sink.cursor,
+            "limit": self.sink.limit,
+            "returned": self.returned,
+            "next_cursor": self.last_row_index if more else None
+        }
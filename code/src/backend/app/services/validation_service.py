@@ -1,11 +1,10 @@
 import pandas as pd
-import json
-import re
-from datetime import datetime
+from .validation_engine import ValidationEngine
 
 class ValidationService:
     def __init__(self):
         self.rulebooks = {}
+        self.engines = {}
         self.load_rulebooks()
 
     def load_rulebooks(self):
@@ -54,131 +53,38 @@ class ValidationService:
         """Get list of available rulebooks."""
         return list(self.rulebooks.keys())
 
-    def validate_data(self, csv_file, rulebook_id):
-        """Validate CSV data against rulebook rules"""
-        try:
-            # Read CSV file
-            df = pd.read_csv(csv_file)
-            
-            # Get rulebook rules
+    def get_rulebook(self, rulebook_id):
+        """Get a rulebook as rule dicts (column_name, regex_pattern, description)."""
+        columns = self.rulebooks.get(rulebook_id)
+        if columns is None:
+            return None
+        return {
+            "rules": [
+                {"column_name": column, "regex_pattern": rule["regex"], "description": rule["description"]}
+                for column, rule in columns.items()
+            ]
+        }
+
+    def get_engine(self, rulebook_id):
+        """Compiled validation engine of a rulebook, built once."""
+        if rulebook_id not in self.engines:
             rulebook = self.get_rulebook(rulebook_id)
             if not rulebook:
+                return None
+            self.engines[rulebook_id] = ValidationEngine(rulebook["rules"])
+        return self.engines[rulebook_id]
+
+    def validate_data(self, csv_file, rulebook_id, detail='full'):
+        """Validate CSV data against rulebook rules"""
+        try:
+            engine = self.get_engine(rulebook_id)
+            if not engine:
                 raise ValueError("Rulebook not found")
-            
-            # Initialize validation results
-            validation_results = {
-                "total_transactions": len(df),
-                "violations": {
-                    "total_rows": len(df),
-                    "valid_rows": 0,
-                    "invalid_rows": 0,
-                    "row_validations": [],
-                    "column_validations": {},
-                    "summary": {
-                        "total_columns": len(rulebook.get("rules", [])),
-                        "columns_found": len(df.columns),
-                        "columns_missing": 0,
-                        "validation_stats": {}
-                    },
-                    "validation_rate": 0.0
-                }
-            }
-            
-            # Track column validation stats
-            column_stats = {}
-            
-            # Validate each row
-            for index, row in df.iterrows():
-                row_validation = {
-                    "row_index": index + 1,
-                    "row_data": row.to_dict(),
-                    "is_valid": True,
-                    "errors": []
-                }
-                
-                # Validate each column against rules
-                for rule in rulebook.get("rules", []):
-                    column = rule.get("column_name")
-                    if column not in df.columns:
-                        validation_results["violations"]["summary"]["columns_missing"] += 1
-                        continue
-                        
-                    value = row.get(column)
-                    pattern = rule.get("regex_pattern", "")
-                    
-                    # Clean pattern by removing r"..." format
-                    pattern = pattern.replace('r"', '').replace('"', '')
-                    
-                    # Skip validation if value is empty
-                    if pd.isna(value):
-                        continue
-                        
-                    # Convert value to string for regex matching
-                    value_str = str(value)
-                    
-                    try:
-                        if not re.match(pattern, value_str):
-                            row_validation["is_valid"] = False
-                            row_validation["errors"].append({
-                                "column": column,
-                                "value": value_str,
-                                "pattern": pattern,
-                                "description": rule.get("description", "Invalid format")
-                            })
-                            
-                            # Update column stats
-                            if column not in column_stats:
-                                column_stats[column] = {"valid": 0, "invalid": 0}
-                            column_stats[column]["invalid"] += 1
-                    except Exception as e:
-                        row_validation["is_valid"] = False
-                        row_validation["errors"].append({
-                            "column": column,
-                            "value": value_str,
-                            "pattern": pattern,
-                            "description": f"Validation error: {str(e)}"
-                        })
-                        
-                        if column not in column_stats:
-                            column_stats[column] = {"valid": 0, "invalid": 0}
-                        column_stats[column]["invalid"] += 1
-                
-                # Update row validation stats
-                if row_validation["is_valid"]:
-                    validation_results["violations"]["valid_rows"] += 1
-                else:
-                    validation_results["violations"]["invalid_rows"] += 1
-                
-                validation_results["violations"]["row_validations"].append(row_validation)
-            
-            # Update column validations
-            for column in df.columns:
-                if column not in column_stats:
-                    column_stats[column] = {"valid": 0, "invalid": 0}
-                column_stats[column]["valid"] = validation_results["violations"]["valid_rows"]
-                validation_results["violations"]["column_validations"][column] = column_stats[column]
-            
-            # Calculate validation rate
-            total_rows = validation_results["violations"]["total_rows"]
-            if total_rows > 0:
-                validation_results["violations"]["validation_rate"] = round(
-                    (validation_results["violations"]["valid_rows"] / total_rows) * 100, 2
-                )
-            
-            # Convert NaN values to None or 0
-            def clean_nan(obj):
-                if isinstance(obj, dict):
-                    return {k: clean_nan(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [clean_nan(item) for item in obj]
-                elif pd.isna(obj):
-                    return None
-                return obj
-            
-            validation_results = clean_nan(validation_results)
-            
-            return validation_results
-            
+
+            # Numeric columns keep their dtype so typed rules can judge them by value
+            df = pd.read_csv(csv_file)
+            return engine.validate(df, detail)
+
         except Exception as e:
             raise ValueError(f"Validation error: {str(e)}")
 
@@ -1,12 +1,13 @@
 import os
 import json
-import magic
 from pathlib import Path
 from werkzeug.utils import secure_filename
 from flask import current_app
 
 def is_pdf(file_stream):
     """Check if file is actually a PDF using python-magic"""
+    import magic
+
     mime = magic.from_buffer(file_stream.read(2048), mime=True)
     file_stream.seek(0)  # Reset file pointer
     return mime == 'application/pdf'
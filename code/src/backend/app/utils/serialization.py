@@ -0,0 +1,79 @@
+import json
+import logging
+from typing import TYPE_CHECKING, Iterable, Iterator, List
+from flask import Response, stream_with_context
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+logger = logging.getLogger(__name__)
+
+
+def column_values(series: 'pd.Series') -> list:
+    """JSON-ready values of one column: NaN/NaT become None, timestamps strings"""
+    import pandas as pd
+
+    missing = series.isna()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.strftime(TIMESTAMP_FORMAT)
+    return series.astype(object).where(~missing, None).tolist()
+
+
+def frame_to_records(df: 'pd.DataFrame', columns: Iterable[str] = None) -> List[dict]:
+    """Convert a DataFrame to a list of records, one column at a time"""
+    columns = list(df.columns) if columns is None else list(columns)
+    values = [column_values(df[column]) for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _default(obj):
+    """Fallback encoder for numpy and pandas scalars when orjson is unavailable"""
+    # Only reached with objects the json module cannot encode, which come from numpy or pandas
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.strftime(TIMESTAMP_FORMAT)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Encode an object as JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default).encode('utf-8')
+
+
+def json_response(obj, status: int = 200) -> Response:
+    """Flask response with a pre-encoded JSON body"""
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+def ndjson_lines(batches: Iterable[List[dict]]) -> Iterator[bytes]:
+    """Encode batches of records as newline-delimited JSON, one write per batch.
+
+    The status line has already been sent when producing a batch fails, so
+    the error is reported as a final {"type": "error"} record instead.
+    """
+    try:
+        for batch in batches:
+            if batch:
+                yield b''.join(dumps(record) + b'\n' for record in batch)
+    except Exception as e:
+        logger.exception("Streaming response failed")
+        yield dumps({'type': 'error', 'message': str(e)}) + b'\n'
+
+
+def ndjson_response(batches: Iterable[List[dict]]) -> Response:
+    """Streaming Flask response writing each batch of records as soon as it is produced"""
+    return Response(stream_with_context(ndjson_lines(batches)), mimetype='application/x-ndjson')
@@ -0,0 +1,68 @@
+import os
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from werkzeug.utils import secure_filename
+from ..config import Config
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds its size limit"""
+
+
+class SpooledUpload:
+    """An uploaded file streamed to a uniquely named file on disk.
+
+    ``size`` and ``sha256`` are computed while the request body is written,
+    so services never need to read the file back just to hash or measure it.
+    """
+
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self.persisted = False
+
+    def persist(self, destination: str) -> str:
+        """Move the spooled file to its permanent location (a rename on the same filesystem)"""
+        os.replace(self.path, destination)
+        self.path = destination
+        self.persisted = True
+        return destination
+
+
+@contextmanager
+def spool_upload(file, directory: str = None, max_bytes: int = None, chunk_size: int = None):
+    """Stream an uploaded file into a unique temporary file, hashing and size-checking it on the fly.
+
+    The temporary file is removed when the block exits, even on error, unless
+    it was moved elsewhere with ``SpooledUpload.persist``. Raises
+    UploadTooLarge as soon as more than ``max_bytes`` have been received.
+    """
+    chunk_size = chunk_size or Config.UPLOAD_CHUNK_SIZE
+    suffix = os.path.splitext(secure_filename(file.filename or ''))[1]
+    fd, path = tempfile.mkstemp(prefix='upload-', suffix=suffix, dir=directory or Config.UPLOAD_SPOOL_FOLDER)
+    upload = None
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                chunk = file.stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLarge(f"File exceeds the maximum size of {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+
+        upload = SpooledUpload(path, file.filename, size, digest.hexdigest())
+        yield upload
+    finally:
+        if not (upload and upload.persisted):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -1,64 +1,72 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import IsolationForest
-from sklearn.neighbors import LocalOutlierFactor
-from sklearn.svm import OneClassSVM
-from sklearn.cluster import DBSCAN
+"""Train the anomaly detection pipeline served by AnomalyService.
 
-# -----------------------------
-# Step 1: Data Loading
-# -----------------------------
-data_path = "CorpLoanTransaction.csv"
-df = pd.read_csv(data_path)
+Headless wrapper around app.services.model_training: the CSV is read in
+chunks, the scaler + IsolationForest pipeline is fitted on (a sample of) its
+complete rows and published as a new version of the model registry, which
+running workers switch to on their next request.
 
-# -----------------------------
-# Step 2: Feature Selection
-# -----------------------------
-# For anomaly detection, we select numeric features that represent key transaction parameters.
-# You can modify this list as needed.
-numeric_features = df.select_dtypes(include=[np.number]).columns
+Usage:
 
-# Ensure no missing values in selected features
-df_model = df[numeric_features].dropna().copy()
+    python code/src/training/anomalydetection.py CorpLoanTransaction.csv [--max-samples 0.1] [--sample-rows 500000]
+    python code/src/training/anomalydetection.py DatasetAnomaly.csv --bundle   # rewrite the shipped fallback model
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
 
-# -----------------------------
-# Step 3: Data Preparation (Scaling)
-# -----------------------------
-scaler = StandardScaler()
-X = scaler.fit_transform(df_model)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
 
-# -----------------------------
-# Step 4: Anomaly Detection Models
-# -----------------------------
+from app.services.model_registry import BUNDLED_MODEL_PATH, ModelRegistry, dump_model_artifact
+from app.services.model_training import parse_max_samples, train_pipeline
 
-# a) IsolationForest
-iso_model = IsolationForest(contamination=0.15, random_state=42)
-iso_model.fit(X)
-# IsolationForest returns -1 for anomalies; convert them to 1 (anomaly) and 0 (normal)
-iso_pred = np.where(iso_model.predict(X) == -1, 1, 0)
-iso_anomaly_pct = iso_pred.mean() * 100
 
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("data_path", nargs="?", default="CorpLoanTransaction.csv")
+    parser.add_argument("--chunksize", type=int, help="CSV rows read per chunk")
+    parser.add_argument("--sample-rows", type=int, help="Most rows the forest is fitted on (uniform sample)")
+    parser.add_argument("--max-samples", default="auto", type=parse_max_samples,
+                        help="Rows drawn per tree: 'auto', a count or a fraction")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--contamination", type=float, default=0.15)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--no-activate", action="store_true", help="Publish without serving the new version")
+    parser.add_argument("--bundle", action="store_true",
+                        help=f"Write {BUNDLED_MODEL_PATH.name} (served when nothing is published) instead of publishing")
+    parser.add_argument("--plot", metavar="PNG", help="Save a histogram of the training scores")
+    args = parser.parse_args()
 
-# -----------------------------
-# Step 5: Results Comparison
-# -----------------------------
-print("Anomaly Detection Summary:")
-print(f"IsolationForest flagged {iso_anomaly_pct:.2f}% of records as anomalies.")
+    pipeline, features, stats = train_pipeline(
+        args.data_path, chunksize=args.chunksize, sample_rows=args.sample_rows, max_samples=args.max_samples,
+        n_estimators=args.n_estimators, contamination=args.contamination, random_state=args.random_state
+    )
 
-# -----------------------------
-# Step 6: Visualizing Decision Scores (if available)
-# -----------------------------
-# For IsolationForest, we can plot the decision_function scores.
-try:
-    iso_scores = iso_model.decision_function(X)
-    plt.figure(figsize=(10, 6))
-    plt.hist(iso_scores, bins=30, edgecolor='black', alpha=0.7)
-    plt.title("IsolationForest Decision Function Score Distribution")
-    plt.xlabel("Score")
-    plt.ylabel("Frequency")
-    plt.grid(True)
-    plt.show()
-except Exception as e:
-    print("IsolationForest decision function not available:", e)
+    if args.bundle:
+        dump_model_artifact(pipeline, features, BUNDLED_MODEL_PATH)
+        print(f"Saved pipeline with {len(features)} features to {BUNDLED_MODEL_PATH}")
+    else:
+        metadata = ModelRegistry().publish(pipeline, features, {**stats, "features": features},
+                                           activate=not args.no_activate)
+        print(f"Published model version {metadata['version']}")
+    print(json.dumps(stats, indent=2))
+
+    if args.plot:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import pandas as pd
+
+        X = pd.read_csv(args.data_path, nrows=stats["params"]["sample_rows"])[features].dropna()
+        plt.figure(figsize=(10, 6))
+        plt.hist(pipeline.decision_function(X), bins=30, edgecolor="black", alpha=0.7)
+        plt.title("IsolationForest Decision Function Score Distribution")
+        plt.xlabel("Score")
+        plt.ylabel("Frequency")
+        plt.grid(True)
+        plt.savefig(args.plot)
+        print(f"Saved score histogram to {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark PDF text extraction throughput (pages/sec).
+
+Compares the legacy per-line header/footer check, which re-extracted every
+word of the page for each line, with the single-pass extractor that
+chunk_pdf_pages uses to build the rule extraction chunks.
+
+Usage:
+
+    python code/test/bench_pdf_extraction.py [--legacy-pages 3] [--workers 4]
+"""
+import os
+import sys
+import time
+import argparse
+import pdfplumber
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.backend.app.services.pdf_text_extractor import extract_page_range, extract_text
+
+RULEBOOK_PDF = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'Rulebook.pdf')
+
+
+def legacy_page_lines(page):
+    """The pre-rewrite per-page loop, kept as the benchmark baseline"""
+    relevant_text = []
+    page_height = page.height
+    words = page.extract_words(
+        keep_blank_chars=True,
+        use_text_flow=True,
+        horizontal_ltr=True,
+        vertical_ttb=True,
+        x_tolerance=3,
+        y_tolerance=3
+    )
+    header_threshold = page_height * 0.1
+    footer_threshold = page_height * 0.9
+
+    current_line = []
+    current_y = None
+    lines = []
+    for word in words:
+        if current_y is None:
+            current_y = word['top']
+            current_line.append(word['text'])
+        elif abs(word['top'] - current_y) < 5:
+            current_line.append(word['text'])
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+            current_line = [word['text']]
+            current_y = word['top']
+    if current_line:
+        lines.append(' '.join(current_line))
+
+    for line in lines:
+        if not line.strip():
+            continue
+        if any(word['top'] < header_threshold or word['top'] > footer_threshold
+               for word in page.extract_words()):
+            continue
+        if any(skip in line.lower() for skip in ['page', 'confidential', 'all rights reserved']):
+            continue
+        if len(line.strip()) < 20 or len(line.strip()) > 200:
+            continue
+        relevant_text.append(line.strip())
+    return relevant_text
+
+
+def run_legacy(pdf_path, pages):
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[:pages]:
+            legacy_page_lines(page)
+
+
+def timed(label, pages, func, *args):
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {pages:>4} pages  {elapsed:8.2f} s  {pages / elapsed:8.2f} pages/sec")
+    return pages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pdf', default=RULEBOOK_PDF)
+    parser.add_argument('--legacy-pages', type=int, default=3,
+                        help='pages timed with the legacy loop (it is quadratic per page)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with pdfplumber.open(args.pdf) as pdf:
+        page_count = len(pdf.pages)
+    legacy_pages = min(args.legacy_pages, page_count)
+
+    before = timed('legacy (per-line re-extraction)', legacy_pages, run_legacy, args.pdf, legacy_pages)
+    after_same = timed('single pass, same pages', legacy_pages, extract_page_range, args.pdf, 0, legacy_pages)
+    timed('single pass, serial', page_count, extract_page_range, args.pdf, 0, page_count)
+    after = timed(f'single pass, {args.workers} processes', page_count, extract_text, args.pdf, args.workers)
+
+    print(f"speedup on the same pages: {after_same / before:.1f}x, full document: {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import os
+import unittest
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.anomaly_aggregator import AnomalyAggregator
+
+
+class TestAnomalyAggregator(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'origination_date': ['2024-01-01', '2024-01-01', '2024-01-02', None, 'not a date'],
+            'country': ['DE', 'FR', 'DE', 'DE', None],
+            'credit_facility_type': ['Loan', 'Loan', 'Bond', None, 'Bond'],
+            'anomaly_label': [0, 1, 1, 0, 0]
+        })
+
+    def test_charts(self):
+        charts = AnomalyAggregator().update(self.df).charts()
+        self.assertEqual(charts['time_series'], {
+            'timestamps': ['2024-01-01', '2024-01-02'],
+            'normal_count': [1, 0],
+            'anomaly_count': [1, 1]
+        })
+        self.assertEqual(charts['regional_distribution'], {
+            'regions': ['DE', 'FR'],
+            'total_transactions': [3, 1],
+            'anomalies': [1, 1]
+        })
+        self.assertEqual(charts['transaction_types'], {
+            'types': ['Bond', 'Loan'],
+            'normal_count': [1, 1],
+            'anomaly_count': [1, 1]
+        })
+
+    def test_incremental_updates_match_single_batch(self):
+        columns = list(self.df.columns)
+        aggregator = AnomalyAggregator().update(self.df.iloc[:2]).update(self.df.iloc[2:])
+        self.assertEqual(aggregator.charts(), AnomalyAggregator().update(self.df).charts())
+        self.assertEqual(list(self.df.columns), columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.anomaly_service import AnomalyService
+from src.backend.app.services.score_cache import ScoreCache
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'DatasetAnomaly.csv')
+
+
+class TestAnomalyPipeline(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = AnomalyService()
+        cls.df = pd.read_csv(DATASET)
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.service.score_cache = ScoreCache(cache_dir=cls.cache_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.cache_dir)
+
+    def test_scores_do_not_depend_on_batch(self):
+        X = self.service._feature_matrix(self.df)
+        batch_scores = self.service.pipeline.decision_function(X)
+        single_scores = [self.service.pipeline.decision_function(X.iloc[[i]])[0] for i in range(5)]
+        for i, score in enumerate(single_scores):
+            self.assertAlmostEqual(score, batch_scores[i])
+
+    def test_missing_feature_columns_raise(self):
+        with self.assertRaises(ValueError):
+            self.service._feature_matrix(self.df.drop(columns=[self.service.features[0]]))
+
+    def test_labels_follow_scores(self):
+        X = self.service._feature_matrix(self.df)
+        scores, labels = self.service.score_labels(X)
+        np.testing.assert_array_equal(labels, self.service.predict_labels(X))
+        np.testing.assert_array_equal(labels, scores < 0)
+
+    def test_rethreshold_cached_scores(self):
+        result = self.service.predict_anomalies(DATASET, file_hash='dataset')
+        default = self.service.rethreshold('dataset')
+        self.assertEqual(default['statistics']['anomaly_count'], result['statistics']['anomaly_count'])
+
+        scored = len(self.service._feature_matrix(self.df))
+        tuned = self.service.rethreshold('dataset', contamination=0.05, include_rows=True)
+        self.assertEqual(tuned['statistics']['anomaly_count'], int(np.ceil(0.05 * scored)))
+        self.assertEqual(len(tuned['anomaly_rows']), tuned['statistics']['anomaly_count'])
+        self.assertIsNone(self.service.rethreshold('unknown'))
+        with self.assertRaises(ValueError):
+            self.service.rethreshold('dataset', contamination=0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+from werkzeug.datastructures import FileStorage
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from starlette.testclient import TestClient
+
+from src.backend.app.asgi import create_asgi_app
+from src.backend.app.config import Config
+from src.backend.app.services.job_service import JobService
+from src.backend.app.services.registry import get_rule_generator, services
+from src.backend.app.services.rule_cache import RuleGenerationCache
+from src.backend.app.services.rulebook_cache import CompiledRulebookCache
+from src.backend.app.services.rulebook_service import RulebookService
+
+RULEBOOK_PDF = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'Rulebook.pdf')
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Local stand-in for the Gemini client that records how many requests overlap"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content_async(self, parts, request_options=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return FakeResponse("rules:\n  - column_name: amount\n    description: Amount is numeric\n    regex_pattern: ^\\d+$\n")
+        finally:
+            self.in_flight -= 1
+
+
+class TestAsyncIngestion(unittest.TestCase):
+    def setUp(self):
+        """Serve rulebooks, jobs and cached rules from a temporary folder"""
+        self.root = tempfile.mkdtemp()
+        self.generator = get_rule_generator()
+        self.original = self.generator.model, self.generator.cache
+        self.generator.model = FakeModel()
+        self.generator.cache = RuleGenerationCache(os.path.join(self.root, 'rule_cache'))
+
+        with mock.patch.multiple(Config, UPLOAD_FOLDER=os.path.join(self.root, 'rulebooks'),
+                                 CATALOG_PATH=os.path.join(self.root, 'catalog.sqlite3')):
+            self.service = RulebookService()
+        self.service.cache = CompiledRulebookCache(self.service.base_path)
+        self.job_service = JobService(jobs_dir=os.path.join(self.root, 'jobs'))
+        self.services = mock.patch.dict(services._instances, {'rulebook': self.service, 'job': self.job_service})
+        self.services.start()
+
+    def tearDown(self):
+        self.services.stop()
+        self.generator.model, self.generator.cache = self.original
+        self.job_service.executor.shutdown(wait=True)
+        shutil.rmtree(self.root)
+
+    def register(self, name):
+        with open(RULEBOOK_PDF, 'rb') as f:
+            rulebook = self.service.register_rulebook(FileStorage(f, filename='Rulebook.pdf'), name, 'test')
+        return rulebook['uuid']
+
+    def test_rule_generations_overlap_on_one_loop(self):
+        uuids = [self.register(f'async-{i}') for i in range(20)]
+        # Long enough for every ingestion to reach the model while the first ones wait on it
+        self.generator.model.latency = 1.0
+
+        async def ingest():
+            return await asyncio.gather(*(self.service.process_rulebook_async(uuid) for uuid in uuids))
+
+        results = asyncio.run(ingest())
+        self.assertEqual({result['status'] for result in results}, {'COMPLETED'})
+        self.assertEqual(results[0]['rules'][0]['column_name'], 'amount')
+        self.assertEqual(self.generator.model.max_in_flight, 20)
+
+    def test_asgi_upload_and_poll(self):
+        with TestClient(create_asgi_app()) as client:
+            with open(RULEBOOK_PDF, 'rb') as f:
+                response = client.post('/rulebooks/upload-pdf', files={'file': ('Rulebook.pdf', f, 'application/pdf')},
+                                       data={'rulebook_name': 'async-upload'})
+            self.assertEqual(response.status_code, 202)
+            body = response.json()
+            self.assertEqual(body['status_url'], f"/rulebooks/jobs/{body['job']['job_id']}")
+
+            # Job status is served by the Flask app mounted behind the async routes
+            deadline = time.time() + 10
+            while True:
+                job = client.get(body['status_url']).json()
+                if job['status'] not in ('PENDING', 'PROCESSING') or time.time() > deadline:
+                    break
+                time.sleep(0.02)
+            self.assertEqual(job['status'], 'COMPLETED')
+            self.assertEqual(job['rulebook_status'], 'COMPLETED')
+
+    def test_asgi_rejects_non_pdf(self):
+        with TestClient(create_asgi_app()) as client:
+            response = client.post('/rulebooks/upload-pdf', files={'file': ('rules.pdf', b'not a pdf', 'application/pdf')},
+                                   data={'rulebook_name': 'bad'})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['message'], 'File must be a PDF')
+
+    def test_async_jobs_are_recorded(self):
+        rulebook_uuid = self.register('async-job')
+
+        async def run():
+            job = await self.job_service.submit_async('rule_generation', rulebook_uuid,
+                                                      self.service.process_rulebook_async, rulebook_uuid)
+            await asyncio.gather(*self.job_service._tasks)
+            return job
+
+        job = asyncio.run(run())
+        self.assertEqual(job['status'], 'PENDING')
+        self.assertEqual(self.job_service.get_job(job['job_id'])['status'], 'COMPLETED')
+        self.assertEqual(os.listdir(self.job_service.jobs_dir), [f"{job['job_id']}.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
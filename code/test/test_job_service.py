@@ -0,0 +1,109 @@
+import os
+import io
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+from werkzeug.datastructures import FileStorage
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app import create_app
+from src.backend.app.config import Config
+from src.backend.app.services.job_service import JobService
+from src.backend.app.services.registry import services
+from src.backend.app.services.rulebook_cache import CompiledRulebookCache
+from src.backend.app.services.rulebook_service import RulebookService
+
+RULEBOOK_PDF = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'Rulebook.pdf')
+
+
+class StubGenerator:
+    """Local stand-in for the Gemini rule generator"""
+
+    def generate_rules_sync(self, pdf_path, document_digest=None):
+        return [{'column_name': 'amount', 'description': 'Amount is numeric', 'regex_pattern': '^\\d+$'}]
+
+
+def isolated_rulebook_service(root: str) -> RulebookService:
+    """RulebookService storing rulebooks, catalog and compiled copies under ``root``"""
+    with mock.patch.multiple(Config, UPLOAD_FOLDER=os.path.join(root, 'rulebooks'),
+                             CATALOG_PATH=os.path.join(root, 'catalog.sqlite3')):
+        service = RulebookService()
+    service.cache = CompiledRulebookCache(service.base_path)
+    return service
+
+
+class TestJobService(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.jobs = JobService(jobs_dir=os.path.join(self.root, 'jobs'), max_workers=1)
+
+    def tearDown(self):
+        self.jobs.executor.shutdown(wait=True)
+        shutil.rmtree(self.root)
+
+    def test_submit_records_outcome(self):
+        def fail():
+            raise RuntimeError('no rules found')
+
+        completed = self.jobs.submit('rule_generation', 'rulebook-1', lambda: None)
+        failed = self.jobs.submit('rule_generation', 'rulebook-2', fail)
+        self.assertEqual(completed['status'], 'PENDING')
+        self.jobs.executor.shutdown(wait=True)
+
+        self.assertEqual(self.jobs.get_job(completed['job_id'])['status'], 'COMPLETED')
+        job = self.jobs.get_job(failed['job_id'])
+        self.assertEqual((job['status'], job['error']), ('FAILED', 'no rules found'))
+        self.assertIsNotNone(job['finished_at'])
+
+    def test_job_of_dead_worker_is_failed(self):
+        """Test that a job whose worker exited is failed, and so is its rulebook"""
+        rulebooks = isolated_rulebook_service(self.root)
+        with open(RULEBOOK_PDF, 'rb') as f:
+            rulebook_uuid = rulebooks.register_rulebook(FileStorage(f, filename='Rulebook.pdf'), 'dead', 'test')['uuid']
+        worker = subprocess.Popen([sys.executable, '-c', 'pass'])
+        worker.wait()
+        job = self.jobs._new_job('rule_generation', rulebook_uuid)
+        self.jobs._update_job(job, status='PROCESSING', worker_pid=worker.pid)
+
+        with mock.patch.dict(services._instances, {'rulebook': rulebooks}):
+            job = self.jobs.get_job(job['job_id'])
+        error = 'Worker process exited before the job finished'
+        self.assertEqual((job['status'], job['error']), ('FAILED', error))
+        with open(self.jobs._job_path(job['job_id'])) as f:
+            self.assertEqual(json.load(f)['status'], 'FAILED')
+        rulebook = rulebooks.catalog.get(rulebook_uuid)
+        self.assertEqual((rulebook['status'], rulebook['processing_error']), ('FAILED', error))
+        self.assertEqual(rulebooks.list_rulebooks(status='FAILED')[1], 1)
+        self.assertIsNone(self.jobs.get_job('missing'))
+
+    def test_prune_removes_expired_jobs(self):
+        stale = self.jobs._new_job('rule_generation', 'rulebook-1')
+        os.utime(self.jobs._job_path(stale['job_id']), (0, 0))
+
+        fresh = self.jobs._new_job('rule_generation', 'rulebook-2')
+        self.assertEqual(os.listdir(self.jobs.jobs_dir), [f"{fresh['job_id']}.json"])
+
+    def test_upload_returns_status_url(self):
+        instances = {'rulebook': isolated_rulebook_service(self.root), 'job': self.jobs,
+                     'rule_generator': StubGenerator()}
+        with mock.patch.dict(services._instances, instances):
+            client = create_app().test_client()
+            with open(RULEBOOK_PDF, 'rb') as f:
+                response = client.post('/rulebooks/upload-pdf', content_type='multipart/form-data',
+                                       data={'file': (io.BytesIO(f.read()), 'Rulebook.pdf'), 'rulebook_name': 'upload'})
+            self.assertEqual(response.status_code, 202)
+            body = response.get_json()
+            self.assertEqual(body['status_url'], f"/rulebooks/jobs/{body['job']['job_id']}")
+
+            self.jobs.executor.shutdown(wait=True)
+            job = client.get(body['status_url']).get_json()
+        self.assertEqual((job['status'], job['rulebook_status']), ('COMPLETED', 'COMPLETED'))
+
+
+if __name__ == '__main__':
+    unittest.main()
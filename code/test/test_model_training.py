@@ -0,0 +1,126 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.anomaly_service import AnomalyService
+from src.backend.app.services.forest_scorer import CompiledForest
+from src.backend.app.services.model_registry import BUNDLED_MODEL_PATH, AnomalyModel, ModelRegistry
+from src.backend.app.services.model_training import train_pipeline
+
+TRAINING_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'src', 'training', 'anomalydetection.py')
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'DatasetAnomaly.csv')
+
+
+class TestModelTraining(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.registry = ModelRegistry(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_chunked_training_matches_single_read(self):
+        pipeline, features, stats = train_pipeline(DATASET, chunksize=70)
+
+        df = pd.read_csv(DATASET)
+        X = df[list(df.select_dtypes(include=[np.number]).columns)].dropna()
+        reference = Pipeline([
+            ('scaler', StandardScaler()),
+            ('model', IsolationForest(contamination=0.15, random_state=42))
+        ]).fit(X)
+        self.assertEqual(features, list(X.columns))
+        self.assertEqual((stats['rows_seen'], stats['rows_trained']), (len(df), len(X)))
+        np.testing.assert_allclose(pipeline.decision_function(X), reference.decision_function(X), atol=1e-12)
+
+    def test_sampled_training(self):
+        _, _, stats = train_pipeline(DATASET, chunksize=50, sample_rows=60, max_samples=32)
+        self.assertEqual(stats['rows_trained'], 60)
+        self.assertEqual(stats['params']['max_samples_drawn'], 32)
+
+    def test_published_forest_is_memory_mapped(self):
+        pipeline, features, stats = train_pipeline(DATASET)
+        version = self.registry.publish(pipeline, features, stats)['version']
+        model = AnomalyModel.load(self.registry.artifact_path(version), version, mmap_mode='r')
+
+        self.assertIsInstance(model.forest.threshold, np.memmap)
+        df = pd.read_csv(DATASET)
+        X = df[features].dropna()
+        np.testing.assert_allclose(model.forest.decision_function(X.to_numpy()), pipeline.decision_function(X), atol=1e-12)
+
+    def test_bundled_forest_is_memory_mapped(self):
+        model = AnomalyModel.load(BUNDLED_MODEL_PATH, mmap_mode='r')
+
+        self.assertIsInstance(model.forest.threshold, np.memmap)
+        df = pd.read_csv(DATASET)
+        X = df[model.features].dropna()
+        np.testing.assert_allclose(model.forest.decision_function(X.to_numpy()), model.pipeline.decision_function(X),
+                                   atol=1e-12)
+
+    def test_mismatched_forest_falls_back_to_pipeline(self):
+        """Test that a compiled forest scoring unlike its pipeline is not used, and CSV and JSON scores agree"""
+        with mock.patch.object(CompiledForest, 'decision_function', lambda forest, X: np.zeros(len(X))):
+            model = AnomalyModel.load(BUNDLED_MODEL_PATH, mmap_mode='r')
+        self.assertIsNone(model.forest)
+
+        service = AnomalyService(registry=self.registry)
+        service.model = model
+        df = pd.read_csv(DATASET)
+        X = service._feature_matrix(df)
+        scores, labels = service.score_labels(X)
+        np.testing.assert_allclose(scores, model.pipeline.decision_function(X), atol=1e-12)
+        self.assertEqual(labels.tolist(), np.where(model.pipeline.predict(X) == -1, 1, 0).tolist())
+        results = service.score_records(df.loc[X.index].to_dict('records'))
+        np.testing.assert_allclose([result['anomaly_score'] for result in results], scores, atol=1e-12)
+
+    def test_csv_labels_use_compiled_forest(self):
+        model = AnomalyModel.load(BUNDLED_MODEL_PATH, mmap_mode='r')
+        self.assertTrue(model.forest.matches(model.pipeline, model.features))
+        service = AnomalyService(registry=self.registry)
+        service.model = model
+        with mock.patch.object(type(model.pipeline), 'decision_function', side_effect=AssertionError):
+            result = service.predict_anomalies(DATASET)
+        self.assertGreater(result['statistics']['anomaly_count'], 0)
+
+    def test_service_hot_swaps_published_versions(self):
+        service = AnomalyService(registry=self.registry)
+        self.assertIsNone(service.current_model().version)
+        record = pd.read_csv(DATASET, nrows=1).to_dict('records')[0]
+        bundled_score = service.score_records(record)[0]['anomaly_score']
+
+        pipeline, features, stats = train_pipeline(DATASET, max_samples=16, random_state=7)
+        first = self.registry.publish(pipeline, features, stats)['version']
+        model = service.current_model()
+        self.assertEqual(model.version, first)
+        self.assertNotEqual(service.score_records(record)[0]['anomaly_score'], bundled_score)
+
+        second = self.registry.publish(pipeline, features, stats, activate=False)['version']
+        self.assertIs(service.current_model(), model)
+        self.registry.activate(second)
+        self.assertEqual(service.current_model().version, second)
+        self.assertEqual([metadata['version'] for metadata in self.registry.versions()], [first, second])
+        with self.assertRaises(ValueError):
+            self.registry.activate('missing')
+
+
+    def test_training_script_runs_without_api_key(self):
+        """Test that publishing a model needs neither the Gemini key nor the web app configuration"""
+        env = {key: value for key, value in os.environ.items() if key != 'GOOGLE_API_KEY'}
+        result = subprocess.run([sys.executable, TRAINING_SCRIPT, DATASET, '--no-activate'], capture_output=True,
+                                text=True, timeout=300, env={**env, 'MODEL_REGISTRY_FOLDER': self.root})
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertEqual(len(self.registry.versions()), 1)
+        self.assertIsNone(self.registry.current_version())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import unittest
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.validation_engine import ValidationEngine
+from src.backend.app.services.parallel_validation import ParallelValidator
+from src.backend.app.services.process_pool import get_process_pool
+
+
+class TestParallelValidator(unittest.TestCase):
+    def setUp(self):
+        """Set up sample rules and a file split into uneven partitions"""
+        self.engine = ValidationEngine([
+            {'column_name': 'customer_id', 'description': 'Customer ID format', 'regex_pattern': '^CUST\\d+$'},
+            {'column_name': 'amount', 'description': 'Whole amount', 'regex_pattern': '^\\d+$'}
+        ])
+        df = pd.DataFrame({
+            'customer_id': ['CUST1', 'BAD2', 'CUST3', None, 'CUST5'] * 7,
+            'amount': ['100', '2.5', 'abc', '40', '50'] * 7
+        })
+        self.partitions = [df.iloc[start:start + 4] for start in range(0, len(df), 4)]
+
+    def test_matches_serial_validation(self):
+        """Test that merged partition results equal a serial run, row indices included"""
+        expected = self.engine.validate_chunks(self.partitions)
+        result = ParallelValidator(self.engine, workers=2, max_pending=3).validate_chunks(self.partitions)
+        self.assertEqual(result, expected)
+        self.assertEqual(result['violations']['row_validations'][-1]['row_index'], 33)
+
+    def test_single_partition_runs_in_process(self):
+        """Test that a single partition is validated without a pool"""
+        result = ParallelValidator(self.engine, workers=2).validate_chunks(self.partitions[:1])
+        self.assertEqual(result, self.engine.validate(self.partitions[0]))
+
+    def test_pool_is_reused_and_never_forks(self):
+        """Test that validations share one pool whose workers are not forked from the server"""
+        ParallelValidator(self.engine, workers=2).validate_chunks(self.partitions)
+        pool = get_process_pool(2)
+
+        ParallelValidator(self.engine, workers=2).validate_chunks(self.partitions)
+        self.assertIs(get_process_pool(2), pool)
+        self.assertNotEqual(pool._mp_context.get_start_method(), 'fork')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import unittest
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.pdf_text_extractor import extract_page_ranges, page_lines
+
+RULEBOOK_PDF = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'Rulebook.pdf')
+
+
+class FakePage:
+    """Local stand-in for a pdfplumber page that records the crop box"""
+
+    def __init__(self, words, bbox=(0, 0, 600, 800)):
+        self.words = words
+        self.bbox = bbox
+        self.cropped = None
+
+    def crop(self, bbox):
+        self.cropped = bbox
+        x0, top, x1, bottom = bbox
+        return FakePage([word for word in self.words if top <= word['top'] < bottom], bbox)
+
+    def extract_words(self, **kwargs):
+        return self.words
+
+
+def word(text, top):
+    return {'text': text, 'top': top}
+
+
+class TestPageLines(unittest.TestCase):
+    def test_groups_words_by_y_coordinate(self):
+        """Test that words less than LINE_TOLERANCE apart vertically form one line"""
+        page = FakePage([
+            word('Institutions must report', 200), word('total assets quarterly', 202.5),
+            word('Submissions are due within thirty days', 230)
+        ])
+
+        self.assertEqual(page_lines(page), [
+            'Institutions must report total assets quarterly',
+            'Submissions are due within thirty days'
+        ])
+
+    def test_crops_header_and_footer_bands(self):
+        """Test that the top and bottom 10% of the page are cropped away"""
+        page = FakePage([
+            word('Federal Reserve Board quarterly reporting form', 20),
+            word('Reports must be filed through Reporting Central', 400),
+            word('Internal use only, distributed to institutions', 780)
+        ])
+
+        self.assertEqual(page_lines(page), ['Reports must be filed through Reporting Central'])
+        self.assertEqual(page.cropped, (0, 80, 600, 720))
+
+    def test_filters_page_furniture_and_short_lines(self):
+        """Test that page markers, headings and table rows are dropped"""
+        page = FakePage([
+            word('Schedule A', 100),
+            word('See page 12 of the instructions for details', 150),
+            word('Each loan must have a unique identifier assigned', 200),
+            word('x' * 201, 250)
+        ])
+
+        self.assertEqual(page_lines(page), ['Each loan must have a unique identifier assigned'])
+
+    def test_page_ranges_match_whole_document(self):
+        """Test that parallel page ranges are joined in page order"""
+        ranges = [(0, 2), (2, 4)]
+        serial = extract_page_ranges(RULEBOOK_PDF, ranges, workers=1)
+
+        self.assertEqual(extract_page_ranges(RULEBOOK_PDF, ranges, workers=2), serial)
+        self.assertTrue(all(serial))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import json
+import time
+import unittest
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app import create_app
+from src.backend.app.services.anomaly_service import AnomalyService
+from src.backend.app.services.forest_scorer import CompiledForest
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'DatasetAnomaly.csv')
+
+# Median latency budget of one single-transaction request, end to end through Flask
+LATENCY_BUDGET_MS = 10.0
+
+
+class TestRealtimeScoring(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = AnomalyService()
+        cls.df = pd.read_csv(DATASET)
+        cls.records = json.loads(cls.df.to_json(orient='records'))
+
+    def test_compiled_forest_matches_pipeline(self):
+        X = self.service._feature_matrix(self.df)
+        forest = CompiledForest.from_pipeline(self.service.pipeline)
+        np.testing.assert_allclose(forest.decision_function(X.to_numpy()), self.service.pipeline.decision_function(X),
+                                   rtol=0, atol=1e-12)
+
+    def test_records_scored_like_csv_upload(self):
+        results = self.service.score_records(self.records)
+        X = self.service._feature_matrix(self.df)
+        scores, labels = self.service.score_labels(X)
+
+        self.assertEqual([results[i]['anomaly_label'] for i in X.index], labels.tolist())
+        np.testing.assert_allclose([results[i]['anomaly_score'] for i in X.index], scores, rtol=0, atol=1e-12)
+        unscoreable = self.df.index.difference(X.index)
+        self.assertTrue(all(results[i] == {'anomaly_label': 0, 'anomaly_score': None} for i in unscoreable))
+
+    def test_invalid_payloads(self):
+        for payload in (None, [], {'amount': 1}, ['not a record']):
+            with self.assertRaises(ValueError):
+                self.service.score_records(payload)
+
+    def test_single_transaction_latency(self):
+        client = create_app().test_client()
+        record = self.records[0]
+        client.post('/anomalies/score', json=record)
+
+        timings = []
+        for _ in range(200):
+            started = time.perf_counter()
+            response = client.post('/anomalies/score', json=record)
+            timings.append((time.perf_counter() - started) * 1000)
+            self.assertEqual(response.status_code, 200)
+        self.assertLess(np.median(timings), LATENCY_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
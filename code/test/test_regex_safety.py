@@ -0,0 +1,73 @@
+import os
+import unittest
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services import regex_safety
+from src.backend.app.services.regex_safety import EXPONENTIAL, POLYNOMIAL, analyze_pattern
+from src.backend.app.services.validation_engine import ValidationEngine
+
+
+class TestRegexSafety(unittest.TestCase):
+    def test_flags_super_linear_patterns(self):
+        """Test detection of nested, ambiguous and overlapping quantifiers"""
+        self.assertEqual(analyze_pattern(r'(a+)+$').severity, EXPONENTIAL)
+        self.assertEqual(analyze_pattern(r'(\w+\s?)+$').severity, EXPONENTIAL)
+        self.assertEqual(analyze_pattern(r'^(a|aa)+$').severity, EXPONENTIAL)
+        self.assertEqual(analyze_pattern(r'(?i).*required.*').severity, POLYNOMIAL)
+
+    def test_accepts_typical_rule_patterns(self):
+        """Test that common generated patterns are not flagged"""
+        for pattern in [r'^\d+$', r'^\d+(\.\d+)?$', r'^\d{4}-\d{2}-\d{2}$', r'^[A-Z]{2}$',
+                        r'^[\w\s]+$', r'.*', r'^\d{2}-\d{7}$|^\d{9}$|NA$', r'^(\d{3}-?)+$']:
+            self.assertIsNone(analyze_pattern(pattern), pattern)
+
+    @unittest.skipIf(regex_safety.regex is None, 'regex engine not installed')
+    def test_slow_rule_is_quarantined(self):
+        """Test that a catastrophic match times out and the rule is skipped"""
+        engine = ValidationEngine([
+            {'column_name': 'code', 'description': 'Code', 'regex_pattern': '^(a|aa)+$'},
+            {'column_name': 'id', 'description': 'Digits', 'regex_pattern': '^\\d+$'}
+        ], match_timeout=0.05)
+        df = pd.DataFrame({'code': ['aaaa', 'a' * 60 + 'b'], 'id': ['1', 'x']})
+
+        violations = engine.validate(df)['violations']
+        self.assertEqual(violations['invalid_rows'], 1)
+        self.assertEqual([rule['column'] for rule in violations['summary']['quarantined_rules']], ['code'])
+
+    @unittest.skipIf(regex_safety.regex is None, 'regex engine not installed')
+    def test_quarantine_is_per_file(self):
+        """Test that validating the same file twice gives the same result and rows after a timeout are still checked"""
+        engine = ValidationEngine([
+            {'column_name': 'code', 'description': 'Code', 'regex_pattern': '^(a|aa)+$'}
+        ], match_timeout=0.05)
+        chunks = [pd.DataFrame({'code': ['aa', 'b']}), pd.DataFrame({'code': ['a' * 60 + 'b', 'aaa', 'c']})]
+
+        first = engine.validate_chunks(chunks)['violations']
+        second = engine.validate_chunks(chunks)['violations']
+        self.assertEqual(first['invalid_rows'], 2)
+        self.assertEqual([row['row_index'] for row in first['row_validations']], [2, 5])
+        self.assertEqual(second, first)
+        self.assertEqual(first['summary']['quarantined_rules'][0]['unevaluated_values'], 1)
+        self.assertIsNone(engine.rules[0].quarantined)
+
+        # Chunk boundaries do not change the verdicts
+        whole = engine.validate(pd.concat(chunks, ignore_index=True))['violations']
+        self.assertEqual(whole['invalid_rows'], 2)
+
+    def test_long_values_are_not_evaluated_without_timeout(self):
+        """Test that values over the length bound are counted as unevaluated, not failed or skipped silently"""
+        engine = ValidationEngine([
+            {'column_name': 'text', 'description': 'Required', 'regex_pattern': '(?i).*required.*'}
+        ], max_risky_length=10)
+        engine.rules[0].guarded = None
+        df = pd.DataFrame({'text': ['required', 'no', 'x' * 20]})
+
+        violations = engine.validate(df)['violations']
+        self.assertEqual(violations['invalid_rows'], 1)
+        self.assertEqual(violations['summary']['quarantined_rules'][0]['unevaluated_values'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.anomaly_service import AnomalyService
+from src.backend.app.services.result_export import ResultExportService
+from src.backend.app.services.score_cache import ScoreCache
+from src.backend.app.services.validation_engine import VIOLATION_TABLE_SCHEMA
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'DatasetAnomaly.csv')
+SCHEMA = {name: VIOLATION_TABLE_SCHEMA[name] for name in ('row_index', 'column', 'value')}
+
+
+class TestResultExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.service = ResultExportService(exports_dir=self.directory)
+        self.table = pd.DataFrame({
+            'row_index': [2, 7],
+            'column': ['country', 'amount'],
+            'value': ['usa', None]
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        for export_format, read in (('parquet', pd.read_parquet), ('arrow', pd.read_feather)):
+            record = self.service.write([self.table], SCHEMA, 'violations', export_format)
+            self.assertEqual(self.service.get_export(record['export_id']), record)
+            self.assertEqual(record['rows'], 2)
+            pd.testing.assert_frame_equal(read(self.service.file_path(record)), self.table)
+
+    def test_batches_keep_one_schema(self):
+        """Test that batches are appended under the declared types, even a batch whose values are all missing"""
+        batches = [self.table.iloc[1:], self.table.iloc[:1], self.table.iloc[:0]]
+        record = self.service.write(iter(batches), SCHEMA, 'violations', 'parquet')
+
+        self.assertEqual(record['rows'], 2)
+        pd.testing.assert_frame_equal(pd.read_parquet(self.service.file_path(record)),
+                                      pd.concat(batches, ignore_index=True))
+
+    def test_anomaly_batches_match_single_pass(self):
+        """Test that an anomaly export scored in chunks holds every row with the labels of a single pass"""
+        service = AnomalyService()
+        service.score_cache = ScoreCache(cache_dir=os.path.join(self.directory, 'scores'))
+        schema, batches = service.score_batches(DATASET, columns=['obligor_name', 'exposure_at_default'], chunksize=70)
+        record = self.service.write(batches, schema, 'anomalies', 'arrow')
+
+        exported = pd.read_feather(self.service.file_path(record))
+        df = pd.read_csv(DATASET)
+        labelled = df.copy()
+        service._label(labelled, service.current_model())
+        self.assertEqual(record['rows'], len(df))
+        self.assertEqual(list(exported.columns), list(schema))
+        self.assertEqual(exported['anomaly_label'].tolist(), labelled['anomaly_label'].tolist())
+        self.assertEqual(exported['row_index'].tolist(), list(range(1, len(df) + 1)))
+        self.assertEqual(exported['obligor_name'].fillna('').tolist(), df['obligor_name'].fillna('').tolist())
+
+    def test_unknown_format_and_export(self):
+        with self.assertRaises(ValueError):
+            self.service.write([self.table], SCHEMA, 'violations', 'csv')
+        self.assertIsNone(self.service.get_export('missing'))
+
+    def test_prune_removes_expired_exports(self):
+        stale = os.path.join(self.directory, 'old.json')
+        with open(stale, 'w') as f:
+            json.dump({}, f)
+        os.utime(stale, (0, 0))
+        self.service.prune()
+        self.assertFalse(os.path.exists(stale))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.rule_cache import RuleGenerationCache, cache_key, pdf_digest
+
+
+class TestRuleGenerationCache(unittest.TestCase):
+    def setUp(self):
+        """Create an empty cache directory"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.rules = [{'column_name': 'amount', 'description': 'Number', 'regex_pattern': '^\\d+$'}]
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_key_depends_on_document_prompt_and_model(self):
+        """Test that every key component changes the key"""
+        digest = pdf_digest(b'%PDF-1.4 sample')
+        key = cache_key(digest, 'prompt', 'model-a')
+
+        self.assertEqual(key, cache_key(digest, 'prompt', 'model-a'))
+        self.assertNotEqual(key, cache_key(pdf_digest(b'%PDF-1.4 other'), 'prompt', 'model-a'))
+        self.assertNotEqual(key, cache_key(digest, 'other prompt', 'model-a'))
+        self.assertNotEqual(key, cache_key(digest, 'prompt', 'model-b'))
+
+    def test_round_trip(self):
+        """Test storing and reading back a rule list"""
+        cache = RuleGenerationCache(self.cache_dir, max_bytes=1024 * 1024)
+        self.assertIsNone(cache.get('missing'))
+
+        cache.put('key', self.rules, 'model-a')
+        self.assertEqual(cache.get('key'), self.rules)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = RuleGenerationCache(self.cache_dir, max_bytes=1024 * 1024)
+        cache.put('first', self.rules)
+        cache.put('second', self.rules)
+        entry_size = cache.stats()['size_bytes'] // 2
+
+        # Touch the older entry so the newer one becomes least recently used
+        past = time.time() - 60
+        os.utime(os.path.join(self.cache_dir, 'second.json'), (past, past))
+        cache.get('first')
+
+        cache.max_bytes = entry_size * 2
+        cache.put('third', self.rules)
+
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(cache.get('first'), self.rules)
+        self.assertEqual(cache.get('third'), self.rules)
+
+    def test_failed_write_keeps_previous_entry(self):
+        """Test that an entry failing to serialize leaves neither a partial file nor a temporary one"""
+        cache = RuleGenerationCache(self.cache_dir, max_bytes=1024 * 1024)
+        cache.put('key', self.rules)
+
+        with self.assertRaises(TypeError):
+            cache.put('key', [{'column_name': object()}])
+        self.assertEqual(os.listdir(self.cache_dir), ['key.json'])
+        self.assertEqual(cache.get('key'), self.rules)
+
+
+if __name__ == '__main__':
+    unittest.main()
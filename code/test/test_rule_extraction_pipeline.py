@@ -0,0 +1,108 @@
+import os
+import asyncio
+import unittest
+from unittest import mock
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.rule_extraction_pipeline import (
+    PageChunk, RuleExtractionPipeline, chunk_pdf_pages, merge_rules
+)
+from src.backend.app.services.rule_generator_service import RuleGeneratorService, RULE_EXTRACTION_PROMPT
+
+RULEBOOK_PDF = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'Rulebook.pdf')
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Local stand-in for the Gemini client that records concurrency"""
+
+    def __init__(self, fail_pages=None):
+        self.fail_pages = fail_pages
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def generate_content_async(self, parts, request_options=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            pages = parts[1]['text'].split(':')[0].split()[-1]
+            if pages == self.fail_pages:
+                raise TimeoutError('deadline exceeded')
+            return FakeResponse(
+                "```yaml\nrules:\n"
+                "  - column_name: shared_column\n"
+                f"    description: seen in pages {pages}\n"
+                "    regex_pattern: ^\\d+$\n"
+                f"  - column_name: column_{pages.replace('-', '_')}\n"
+                "    description: chunk specific\n"
+                "    regex_pattern: ^[A-Z]{2}$\n```"
+            )
+        finally:
+            self.in_flight -= 1
+
+
+class TestRuleExtractionPipeline(unittest.TestCase):
+    def setUp(self):
+        """Set up page chunks and a response parser"""
+        self.parser = RuleGeneratorService().parse_rules_response
+        self.chunks = [PageChunk(start, start + 9, f'text of pages {start}') for start in range(1, 60, 10)]
+
+    def test_chunked_generation_logs_each_chunk(self):
+        """Test that the per-chunk pages, latency and rule count are logged with the document"""
+        generator = RuleGeneratorService()
+        generator.model = FakeModel()
+        with mock.patch('src.backend.app.services.rule_generator_service.chunk_pdf_pages', return_value=self.chunks), \
+                self.assertLogs(generator.logger, 'INFO') as logs:
+            rules = asyncio.run(generator.generate_rules_chunked('rulebook.pdf'))
+
+        summary = logs.output[-1]
+        self.assertIn(f'Merged {len(rules)} rules from 6 chunks of rulebook.pdf', summary)
+        self.assertIn('pages 1-10: 2 rules in', summary)
+        self.assertIn('pages 51-60: 2 rules in', summary)
+
+    def test_merge_rules(self):
+        """Test that the first rule for a column wins"""
+        merged = merge_rules([
+            [{'column_name': 'a', 'description': 'first'}],
+            [{'column_name': 'a', 'description': 'second'}, {'column_name': 'b', 'description': 'other'}]
+        ])
+        self.assertEqual([rule['description'] for rule in merged], ['first', 'other'])
+
+    def test_concurrent_extraction(self):
+        """Test bounded fan-out, merging and per-chunk latency report"""
+        model = FakeModel()
+        pipeline = RuleExtractionPipeline(model, RULE_EXTRACTION_PROMPT, self.parser, max_concurrency=2)
+        rules, report = asyncio.run(pipeline.run(self.chunks))
+
+        self.assertEqual(model.calls, 6)
+        self.assertLessEqual(model.max_in_flight, 2)
+        self.assertEqual(len(rules), 7)
+        self.assertEqual(rules[0]['description'], 'seen in pages 1-10')
+        self.assertEqual([chunk['pages'] for chunk in report][:2], ['1-10', '11-20'])
+        self.assertTrue(all(chunk['latency_ms'] > 0 for chunk in report))
+
+    def test_failed_chunk(self):
+        """Test that a chunk failing every retry fails the extraction"""
+        pipeline = RuleExtractionPipeline(FakeModel(fail_pages='21-30'), RULE_EXTRACTION_PROMPT,
+                                          self.parser, max_retries=2, retry_delay=0)
+        with self.assertRaisesRegex(Exception, 'pages 21-30'):
+            asyncio.run(pipeline.run(self.chunks))
+
+    def test_chunk_pdf_pages(self):
+        """Test page-range chunking of a real rulebook"""
+        chunks = chunk_pdf_pages(RULEBOOK_PDF, 25)
+
+        self.assertEqual([(chunk.first_page, chunk.last_page) for chunk in chunks], [(1, 25), (26, 50), (51, 59)])
+        self.assertTrue(all(chunk.text for chunk in chunks))
+
+
+if __name__ == '__main__':
+    unittest.main()
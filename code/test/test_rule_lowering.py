@@ -0,0 +1,92 @@
+import os
+import re
+import random
+import unittest
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.rule_lowering import (
+    AnyCheck, CodePoints, DecimalCheck, EnumCheck, RunCheck, ShapeCheck, lower_pattern
+)
+from src.backend.app.services.validation_engine import ValidationEngine
+
+
+class TestRuleLowering(unittest.TestCase):
+    SAMPLES = np.array([
+        '', '1', '12', '123', '2024', '-5', '1.5', '1.', '.5', '1.2.3', '12.3456', '10%', '-10%', '1e+07',
+        '2024-01-02', '2024-1-02', 'NA', 'NB', 'na', 'USD', 'usd', 'US', '12\n', '12\n\n', 'ab\x00',
+        '٣٤', '²', 'É', 'a,b', 'x' * 100
+    ], dtype=object)
+
+    def test_recognizes_common_families(self):
+        """Test that generated rule shapes are lowered to the matching check"""
+        self.assertIsInstance(lower_pattern(r'^\d+$'), RunCheck)
+        self.assertIsInstance(lower_pattern(r'^[A-Z]{3}$'), RunCheck)
+        self.assertIsInstance(lower_pattern(r'^\d{4}-\d{2}-\d{2}$'), ShapeCheck)
+        self.assertIsInstance(lower_pattern(r'^\d+(\.\d+)?%$'), DecimalCheck)
+        self.assertIsInstance(lower_pattern(r'^-?\d+(\.\d{1,2})?$'), DecimalCheck)
+        self.assertIsInstance(lower_pattern(r'^\$?\d{1,3}(,\d{3})*(\.\d{2})?$'), DecimalCheck)
+        self.assertIsInstance(lower_pattern(r'^\d{1,3}(\.\d{1,2})?$'), DecimalCheck)
+        self.assertIsInstance(lower_pattern(r'^(LOCOM|FVO|NA)$'), EnumCheck)
+        self.assertIsInstance(lower_pattern(r'.*'), AnyCheck)
+
+    def test_keeps_regex_when_not_equivalent(self):
+        """Test that unanchored, flagged or unsupported patterns are not lowered"""
+        for pattern in [r'^\d+', r'^1|2$', r'(?i)^[a-z]+$', r'^[\w\s]+$', r'^[^,]{2}$', r'^(\d+']:
+            self.assertIsNone(lower_pattern(pattern), pattern)
+
+    def test_matches_like_regex(self):
+        """Test that lowered checks agree with re.match, including Unicode digits and a trailing newline"""
+        patterns = [r'^\d+$', r'^\d{4,6}$', r'^[0-9]+$', r'^[A-Z]{2}$', r'^\d{4}-\d{2}-\d{2}$', r'^\d+(\.\d+)?%$',
+                    r'^-?\d+(\.\d+)?$', r'^\d+(\.\d{1,4})?$', r'^(NA|NB)$', r'^[^\r\n,]*$', r'^\d{9}$|^(NA)$',
+                    r'^(?:\d+|NA)$', r'.*']
+        for pattern in patterns:
+            compiled = re.compile(pattern)
+            expected = [compiled.match(value) is not None for value in self.SAMPLES]
+            actual = lower_pattern(pattern).matches(CodePoints(self.SAMPLES))
+            self.assertEqual(actual.tolist(), expected, pattern)
+
+    def test_currency_amounts_match_like_regex(self):
+        """Test grouped-digit and bounded decimal amounts against re.match on random and formatted values"""
+        rng = random.Random(0)
+        values = {''.join(rng.choice('0123456789,.$-%€٣ \n') for _ in range(rng.randint(0, 12))) for _ in range(5000)}
+        for _ in range(2000):
+            amount = f'{rng.randint(0, 10 ** 10):,}' + rng.choice(['', '.5', '.25', '.125'])
+            values.add(rng.choice(['', '$', '-', '-$', '$-']) + amount)
+        values = np.array(sorted(values), dtype=object)
+
+        patterns = [r'^\$?\d{1,3}(,\d{3})*(\.\d{2})?$', r'^\d{1,3}(\.\d{1,2})?$', r'^-?\$?\d{1,3}(?:,\d{3})*(?:\.\d{2})?$',
+                    r'^\$\d+(\.\d{2})?$', r'^\d{1,3}(,\d{3}){0,2}$', r'^\d+(,\d{3})+$', r'^€?\d{1,3}(\.\d{2})?$',
+                    r'^-?\d{2,4}%$']
+        for pattern in patterns:
+            compiled = re.compile(pattern)
+            expected = [compiled.match(value) is not None for value in values]
+            check = lower_pattern(pattern)
+            self.assertIsInstance(check, DecimalCheck, pattern)
+            self.assertEqual(check.matches(CodePoints(values)).tolist(), expected, pattern)
+            predicate = check.predicate()
+            self.assertEqual([predicate(value.removesuffix('\n')) for value in values], expected, pattern)
+
+        check = lower_pattern(r'^\d{1,3}(\.\d{1,2})?$')
+        self.assertEqual(check.numeric_matches(np.array([999.5, 1000.0, 12.345, -1.0])).tolist(),
+                         [True, False, False, False])
+
+    def test_numeric_columns_are_judged_by_value(self):
+        """Test that floats such as 1e+07 pass digit rules instead of failing on their str() form"""
+        engine = ValidationEngine([
+            {'column_name': 'amount', 'description': 'Whole amount', 'regex_pattern': '^\\d+$'},
+            {'column_name': 'rate', 'description': 'Two decimals', 'regex_pattern': '^\\d+(\\.\\d{1,2})?$'}
+        ])
+        df = pd.DataFrame({'amount': [1e7, 12.0, 1.5, np.nan], 'rate': [0.25, 3.0, -1.0, 0.125]})
+
+        violations = engine.validate(df)['violations']
+        self.assertEqual(violations['invalid_rows'], 2)
+        errors = {row['row_index']: [e['column'] for e in row['errors']] for row in violations['row_validations']}
+        self.assertEqual(errors, {3: ['amount', 'rate'], 4: ['rate']})
+        self.assertEqual({rule['engine'] for rule in engine.rule_costs()}, {'typed'})
+
+
+if __name__ == '__main__':
+    unittest.main()
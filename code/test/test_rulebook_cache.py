@@ -0,0 +1,59 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.rulebook_cache import CompiledRulebookCache
+
+
+class TestCompiledRulebookCache(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary rulebook folder"""
+        self.base_path = tempfile.mkdtemp()
+        self.uuid = 'rulebook-1'
+        os.makedirs(os.path.join(self.base_path, self.uuid))
+        self.write_rules([{'column_name': 'amount', 'description': 'Number', 'regex_pattern': '^\\d+$'}])
+        self.cache = CompiledRulebookCache(self.base_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def write_rules(self, rules):
+        with open(os.path.join(self.base_path, self.uuid, 'metadata.json'), 'w') as f:
+            json.dump({'uuid': self.uuid, 'rules': rules}, f)
+
+    def test_hit_after_first_load(self):
+        """Test that repeated lookups reuse the compiled rulebook"""
+        first = self.cache.get(self.uuid)
+        second = self.cache.get(self.uuid)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_reload_after_write(self):
+        """Test that a metadata file changed by another worker is recompiled without invalidation"""
+        first = self.cache.get(self.uuid)
+        self.write_rules([
+            {'column_name': 'amount', 'description': 'Number', 'regex_pattern': '^\\d+$'},
+            {'column_name': 'country', 'description': 'Code', 'regex_pattern': '^[A-Z]{2}$'}
+        ])
+        # Filesystems with coarse timestamps could otherwise keep the old mtime
+        metadata_path = os.path.join(self.base_path, self.uuid, 'metadata.json')
+        os.utime(metadata_path, ns=(first.version[0] + 10 ** 9, first.version[0] + 10 ** 9))
+
+        second = self.cache.get(self.uuid)
+        self.assertIsNot(second, first)
+        self.assertEqual(len(second.engine.rules), 2)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_missing_rulebook(self):
+        """Test lookups of unknown rulebooks"""
+        self.assertIsNone(self.cache.get('unknown'))
+
+
+if __name__ == '__main__':
+    unittest.main()
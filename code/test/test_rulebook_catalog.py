@@ -0,0 +1,62 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.rulebook_catalog import RulebookCatalog
+
+
+class TestRulebookCatalog(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary rulebook folder with one rulebook on disk"""
+        self.base_path = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.base_path, 'catalog.sqlite3')
+        os.makedirs(os.path.join(self.base_path, 'existing'))
+        with open(os.path.join(self.base_path, 'existing', 'metadata.json'), 'w') as f:
+            json.dump(self.metadata('existing', 'COMPLETED', '2024-01-01T00:00:00', rules=2), f)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    @staticmethod
+    def metadata(uuid, status, created_at, rules=0):
+        return {
+            'uuid': uuid,
+            'rulebook_name': f'Rulebook {uuid}',
+            'status': status,
+            'created_at': created_at,
+            'file_size': 10,
+            'rules': [{'column_name': f'col{i}'} for i in range(rules)]
+        }
+
+    def test_new_catalog_indexes_existing_rulebooks(self):
+        catalog = RulebookCatalog(self.db_path, self.base_path)
+        rulebooks, total = catalog.list()
+        self.assertEqual(total, 1)
+        self.assertEqual(rulebooks[0]['rule_count'], 2)
+        self.assertNotIn('rules', rulebooks[0])
+
+    def test_paging_filtering_and_sorting(self):
+        catalog = RulebookCatalog(self.db_path, self.base_path)
+        catalog.upsert(self.metadata('b', 'FAILED', '2024-01-03T00:00:00'))
+        catalog.upsert(self.metadata('c', 'COMPLETED', '2024-01-02T00:00:00', rules=5))
+
+        rulebooks, total = catalog.list(limit=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([rulebook['uuid'] for rulebook in rulebooks], ['b', 'c'])
+
+        rulebooks, total = catalog.list(status='COMPLETED', sort='rule_count', descending=False, limit=1, offset=1)
+        self.assertEqual(total, 2)
+        self.assertEqual([rulebook['uuid'] for rulebook in rulebooks], ['c'])
+
+        catalog.delete('c')
+        self.assertIsNone(catalog.get('c'))
+        with self.assertRaises(ValueError):
+            catalog.list(sort='uuid; DROP TABLE rulebooks')
+
+
+if __name__ == '__main__':
+    unittest.main()
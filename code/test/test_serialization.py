@@ -0,0 +1,48 @@
+import os
+import json
+import unittest
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.utils.serialization import dumps, frame_to_records, ndjson_lines
+
+
+class TestFrameToRecords(unittest.TestCase):
+    def test_missing_values_and_timestamps(self):
+        df = pd.DataFrame({
+            'amount': [1.5, np.nan],
+            'count': [1, 2],
+            'name': ['a', None],
+            'date': pd.to_datetime(['2024-01-02', None])
+        })
+        records = frame_to_records(df)
+        self.assertEqual(records, [
+            {'amount': 1.5, 'count': 1, 'name': 'a', 'date': '2024-01-02 00:00:00'},
+            {'amount': None, 'count': 2, 'name': None, 'date': None}
+        ])
+        self.assertEqual(json.loads(dumps(records)), records)
+
+    def test_column_projection(self):
+        df = pd.DataFrame({'a': [1], 'b': [2], 'c': [3]})
+        self.assertEqual(frame_to_records(df, ['c', 'a']), [{'c': 3, 'a': 1}])
+
+
+class TestNdjsonLines(unittest.TestCase):
+    def test_one_line_per_record(self):
+        lines = b''.join(ndjson_lines(iter([[{'n': 1}, {'n': 2}], [], [{'n': 3}]]))).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{'n': 1}, {'n': 2}, {'n': 3}])
+
+    def test_failure_ends_stream_with_error_record(self):
+        def batches():
+            yield [{'n': 1}]
+            raise RuntimeError('boom')
+
+        lines = [json.loads(line) for line in b''.join(ndjson_lines(batches())).splitlines()]
+        self.assertEqual(lines[0], {'n': 1})
+        self.assertEqual(lines[-1]['type'], 'error')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import unittest
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app import create_app
+from src.backend.app.services.registry import ServiceRegistry, services
+
+
+class TestServiceRegistry(unittest.TestCase):
+    def test_constructs_once_on_first_use(self):
+        built = []
+        registry = ServiceRegistry()
+        registry.register('counter', lambda: built.append(1) or object())
+
+        self.assertEqual(registry.loaded(), [])
+        first = registry.get('counter')
+        self.assertIs(registry.get('counter'), first)
+        self.assertEqual(len(built), 1)
+
+        registry.reset('counter')
+        self.assertIsNot(registry.get('counter'), first)
+        self.assertEqual(len(built), 2)
+
+    def test_app_startup_builds_no_services(self):
+        services.reset()
+        create_app()
+        self.assertEqual(services.loaded(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
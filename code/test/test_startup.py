@@ -0,0 +1,62 @@
+import os
+import re
+import sys
+import subprocess
+import unittest
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.services.detail_levels import DETAIL_LEVELS
+from src.backend.app.services.validation_engine import SINKS
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend')
+
+# Cumulative import time of the app package plus create_app(), measured cold in a fresh interpreter
+STARTUP_BUDGET_MS = 1000.0
+
+# Libraries only the code paths that use them may import
+HEAVY_MODULES = ('pandas', 'numpy', 'sklearn', 'joblib', 'pdfplumber', 'google.generativeai', 'yaml', 'magic', 'regex')
+
+IMPORT_LINE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def cold_start():
+    """Modules imported by a cold `create_app()` and the import time in ms of each top-level app module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from app import create_app; create_app()'],
+        cwd=BACKEND_DIR, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'},
+        capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr[-2000:])
+    modules, app_ms = set(), {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules.add(match.group(3))
+            # Controllers are imported inside create_app(), so they show up as top-level imports too
+            if not match.group(2) and match.group(3).split('.')[0] == 'app':
+                app_ms[match.group(3)] = int(match.group(1)) / 1000
+    return modules, app_ms
+
+
+class TestStartup(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.modules, cls.app_ms = cold_start()
+
+    def test_heavy_libraries_are_deferred(self):
+        loaded = [name for name in HEAVY_MODULES if name in self.modules]
+        self.assertEqual(loaded, [], f"create_app() imported {', '.join(loaded)}")
+
+    def test_import_time_budget(self):
+        startup_ms = sum(self.app_ms.values())
+        slowest = sorted(self.app_ms.items(), key=lambda item: -item[1])[:5]
+        self.assertLess(startup_ms, STARTUP_BUDGET_MS, f"Slowest imports (ms): {slowest}")
+
+    def test_detail_levels_match_sinks(self):
+        self.assertEqual(tuple(SINKS), DETAIL_LEVELS)
+
+
+if __name__ == '__main__':
+    unittest.main()
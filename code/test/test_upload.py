@@ -0,0 +1,52 @@
+import io
+import os
+import shutil
+import hashlib
+import tempfile
+import unittest
+from werkzeug.datastructures import FileStorage
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.utils.upload import UploadTooLarge, spool_upload
+
+
+class TestSpoolUpload(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.content = b'amount,currency\n' + b'10,USD\n' * 1000
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def upload(self, filename='transactions.csv'):
+        return FileStorage(io.BytesIO(self.content), filename=filename)
+
+    def test_hashes_and_removes_spool_file(self):
+        with spool_upload(self.upload(), directory=self.directory, chunk_size=100) as upload:
+            self.assertEqual(upload.size, len(self.content))
+            self.assertEqual(upload.sha256, hashlib.sha256(self.content).hexdigest())
+            with open(upload.path, 'rb') as f:
+                self.assertEqual(f.read(), self.content)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_concurrent_uploads_with_the_same_name_do_not_collide(self):
+        with spool_upload(self.upload(), directory=self.directory) as first, \
+                spool_upload(self.upload(), directory=self.directory) as second:
+            self.assertNotEqual(first.path, second.path)
+
+    def test_size_limit_and_cleanup_on_error(self):
+        with self.assertRaises(UploadTooLarge):
+            with spool_upload(self.upload(), directory=self.directory, max_bytes=100, chunk_size=64):
+                pass
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_persisted_file_is_kept(self):
+        destination = os.path.join(self.directory, 'kept.csv')
+        with spool_upload(self.upload(), directory=self.directory) as upload:
+            upload.persist(destination)
+        self.assertEqual(os.listdir(self.directory), ['kept.csv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
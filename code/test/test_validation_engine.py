@@ -0,0 +1,144 @@
+import os
+import unittest
+from unittest import mock
+import pandas as pd
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app.config import Config
+from src.backend.app.services.detail_levels import buffered_page_limit
+from src.backend.app.services.validation_engine import ValidationEngine, ValidationRun, clean_pattern, get_sink
+
+
+class TestValidationEngine(unittest.TestCase):
+    def setUp(self):
+        """Set up sample rules and transactions"""
+        self.rules = [
+            {'column_name': 'customer_id', 'description': 'Customer ID format', 'regex_pattern': 'r"^CUST\\d+$"'},
+            {'column_name': 'country', 'description': 'ISO country code', 'regex_pattern': 'r"^[A-Z]{2}$"'},
+            {'column_name': 'amount', 'description': 'Whole amount', 'regex_pattern': '^\\d+$'},
+            {'column_name': 'zip_code', 'description': 'Missing column', 'regex_pattern': '^\\d{5}$'}
+        ]
+        self.df = pd.DataFrame({
+            'customer_id': ['CUST1', 'CUST2', 'BAD3', 'CUST4'],
+            'country': ['US', 'usa', None, 'IN'],
+            'amount': ['100', '250', '30', 'abc']
+        })
+
+    def test_clean_pattern(self):
+        """Test removal of r"..." quoting"""
+        self.assertEqual(clean_pattern('r"^\\d+$"'), '^\\d+$')
+        self.assertEqual(clean_pattern(None), '')
+
+    def test_counts(self):
+        """Test row and column statistics"""
+        result = ValidationEngine(self.rules).validate(self.df)
+        violations = result['violations']
+
+        self.assertEqual(result['total_transactions'], 4)
+        self.assertEqual(violations['valid_rows'], 1)
+        self.assertEqual(violations['invalid_rows'], 3)
+        self.assertEqual(violations['validation_rate'], 25.0)
+        self.assertEqual(violations['column_validations']['country'], {'valid': 1, 'invalid': 1})
+        self.assertEqual(violations['summary']['columns_missing'], 1)
+
+    def test_only_failing_rows_reported(self):
+        """Test that row records are produced for failing rows only"""
+        result = ValidationEngine(self.rules).validate(self.df)
+        rows = result['violations']['row_validations']
+
+        self.assertEqual([row['row_index'] for row in rows], [2, 3, 4])
+        self.assertEqual(rows[1]['row_data']['country'], None)
+        self.assertEqual(rows[1]['errors'], [{
+            'column': 'customer_id',
+            'value': 'BAD3',
+            'pattern': '^CUST\\d+$',
+            'description': 'Customer ID format'
+        }])
+
+    def test_chunked_validation(self):
+        """Test that chunked validation merges to the single-pass result"""
+        engine = ValidationEngine(self.rules)
+        chunks = [self.df.iloc[:3], self.df.iloc[3:]]
+
+        self.assertEqual(engine.validate_chunks(chunks), engine.validate(self.df))
+
+    def test_detail_levels(self):
+        """Test that the summary, violations and full sinks share statistics but differ in row records"""
+        engine = ValidationEngine(self.rules)
+        results = {detail: engine.validate(self.df, detail)['violations'] for detail in ('summary', 'violations', 'full')}
+
+        self.assertEqual(results['summary']['row_validations'], [])
+        self.assertEqual(len(results['violations']['row_validations']), 3)
+        full = results['full']['row_validations']
+        self.assertEqual([row['is_valid'] for row in full], [True, False, False, False])
+        self.assertEqual(full[1:], results['violations']['row_validations'])
+        for detail in ('summary', 'full'):
+            self.assertEqual(results[detail]['column_validations'], results['violations']['column_validations'])
+        with self.assertRaises(ValueError):
+            engine.validate(self.df, 'everything')
+
+    def test_cursor_pages_through_violations(self):
+        """Test that cursor pages cover every violation once, across chunk boundaries"""
+        engine = ValidationEngine(self.rules)
+        chunks = [self.df.iloc[:2], self.df.iloc[2:]]
+        pages, cursor = [], 0
+        while cursor is not None:
+            violations = engine.validate_chunks(chunks, get_sink('violations', cursor, 2))['violations']
+            pages.append([row['row_index'] for row in violations['row_validations']])
+            cursor = violations['page']['next_cursor']
+
+        self.assertEqual(pages, [[2, 3], [4]])
+        self.assertEqual(violations['invalid_rows'], 3)
+        with self.assertRaises(ValueError):
+            get_sink('violations', limit=0)
+
+    def test_buffered_pages_are_bounded(self):
+        """Test that buffered responses page violations by VALIDATION_PAGE_LIMIT when no limit is given"""
+        engine = ValidationEngine(self.rules)
+        with mock.patch.object(Config, 'VALIDATION_PAGE_LIMIT', 2):
+            self.assertEqual(buffered_page_limit(5), 2)
+            self.assertEqual(buffered_page_limit(1), 1)
+            violations = engine.validate(self.df, get_sink('violations', 0, buffered_page_limit()))['violations']
+
+        self.assertEqual([row['row_index'] for row in violations['row_validations']], [2, 3])
+        self.assertEqual(violations['page']['next_cursor'], 3)
+
+    def test_run_chunks_streams_rows(self):
+        """Test that rows streamed per chunk equal the buffered row validations"""
+        engine = ValidationEngine(self.rules)
+        run = ValidationRun(engine, get_sink('violations'), keep_rows=False)
+        streamed = [row for rows in engine.run_chunks(run, [self.df.iloc[:2], self.df.iloc[2:]]) for row in rows]
+
+        buffered = engine.validate(self.df)['violations']
+        self.assertEqual(streamed, buffered['row_validations'])
+        self.assertEqual(run.result()['violations']['invalid_rows'], buffered['invalid_rows'])
+
+    def test_violation_table(self):
+        """Test the long-format table has one row per failing (row, rule) pair"""
+        table = ValidationEngine(self.rules).violation_table(self.df, row_offset=10)
+
+        self.assertEqual(table[['row_index', 'column', 'rule', 'value']].values.tolist(), [
+            [12, 'country', 1, 'usa'], [13, 'customer_id', 0, 'BAD3'], [14, 'amount', 2, 'abc']
+        ])
+        self.assertEqual(len(ValidationEngine(self.rules).violation_table(self.df.iloc[3:0])), 0)
+
+    def test_violated_rules(self):
+        """Test rule-level results for a single transaction"""
+        engine = ValidationEngine(self.rules)
+        violated = engine.violated_rules(pd.DataFrame([{'customer_id': 'CUST9', 'country': 'usa', 'amount': None}]))
+
+        self.assertEqual(violated, [1])
+
+    def test_invalid_pattern(self):
+        """Test that an uncompilable pattern fails every non-empty value"""
+        rules = [{'column_name': 'amount', 'description': 'Broken', 'regex_pattern': '^(\\d+$'}]
+        result = ValidationEngine(rules).validate(self.df)
+
+        self.assertEqual(result['violations']['invalid_rows'], 4)
+        error = result['violations']['row_validations'][0]['errors'][0]
+        self.assertTrue(error['description'].startswith('Validation error:'))
+
+
+if __name__ == '__main__':
+    unittest.main()
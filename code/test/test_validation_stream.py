@@ -0,0 +1,90 @@
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from werkzeug.datastructures import FileStorage
+
+os.environ.setdefault('GOOGLE_API_KEY', 'test-key')
+
+from src.backend.app import create_app
+from src.backend.app.config import Config
+from src.backend.app.services.registry import services
+from src.backend.app.services.rulebook_cache import CompiledRulebookCache
+from src.backend.app.services.rulebook_service import RulebookService
+
+RULEBOOK_PDF = os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'dataset', 'Rulebook.pdf')
+TEMPLATE = os.path.join(os.path.dirname(__file__), '..', 'src', 'backend', 'app', 'templates', 'data_validation.html')
+
+
+class StubGenerator:
+    """Local stand-in for the Gemini rule generator"""
+
+    def generate_rules_sync(self, pdf_path, document_digest=None):
+        return [{'column_name': 'amount', 'description': 'Whole amount', 'regex_pattern': '^\\d+$'}]
+
+
+class TestValidationStream(unittest.TestCase):
+    def setUp(self):
+        """Register a rulebook in a temporary folder and a CSV with more failing rows than one page"""
+        self.root = tempfile.mkdtemp()
+        with mock.patch.multiple(Config, UPLOAD_FOLDER=os.path.join(self.root, 'rulebooks'),
+                                 CATALOG_PATH=os.path.join(self.root, 'catalog.sqlite3')):
+            service = RulebookService()
+        service.cache = CompiledRulebookCache(service.base_path)
+        self.services = mock.patch.dict(services._instances, {'rulebook': service, 'rule_generator': StubGenerator()})
+        self.services.start()
+
+        with open(RULEBOOK_PDF, 'rb') as f:
+            self.rulebook_id = service.register_rulebook(FileStorage(f, filename='Rulebook.pdf'), 'stream', 'test')['uuid']
+        service.process_rulebook(self.rulebook_id)
+
+        self.failing = Config.VALIDATION_PAGE_LIMIT + 500
+        amounts = ['12.5'] * self.failing + ['100'] * 100
+        self.csv = ('amount\n' + '\n'.join(amounts) + '\n').encode()
+        self.client = create_app().test_client()
+
+    def tearDown(self):
+        self.services.stop()
+        shutil.rmtree(self.root)
+
+    def post(self, url):
+        return self.client.post(url, content_type='multipart/form-data',
+                                data={'csv_file': (io.BytesIO(self.csv), 'transactions.csv')})
+
+    def test_dashboard_request_gets_every_failing_row(self):
+        """Test that the stream the dashboard reads returns every failing row, unlike one buffered page"""
+        with open(TEMPLATE) as f:
+            self.assertIn('fetch(`/validation/validate/${rulebookId}/stream`', f.read())
+
+        response = self.post(f'/validation/validate/{self.rulebook_id}/stream')
+        self.assertEqual(response.status_code, 200)
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line.strip()]
+        rows = [record['data'] for record in records if record['type'] == 'row_validation']
+        summary = records[-1]
+
+        self.assertEqual(summary['type'], 'summary')
+        self.assertEqual(summary['data']['violations']['invalid_rows'], self.failing)
+        self.assertEqual([row['row_index'] for row in rows], list(range(1, self.failing + 1)))
+
+        page = self.post(f'/rulebooks/rulebook/{self.rulebook_id}/validate').get_json()['violations']['violations']
+        self.assertEqual(len(page['row_validations']), Config.VALIDATION_PAGE_LIMIT)
+        self.assertEqual(page['page']['next_cursor'], Config.VALIDATION_PAGE_LIMIT)
+
+    def test_uploads_are_spooled_within_the_size_limit(self):
+        """Test that CSV uploads past the size limit are rejected and leave no spool file"""
+        spool = os.path.join(self.root, 'spool')
+        os.makedirs(spool)
+        with mock.patch.multiple(Config, MAX_CONTENT_LENGTH=100, UPLOAD_SPOOL_FOLDER=spool):
+            for url in (f'/validation/validate/{self.rulebook_id}', f'/validation/validate/{self.rulebook_id}/stream',
+                        f'/rulebooks/rulebook/{self.rulebook_id}/validate'):
+                response = self.post(url)
+                self.assertEqual(response.status_code, 413, url)
+                self.assertIn('maximum size of 100 bytes', response.get_data(as_text=True))
+        self.assertEqual(os.listdir(spool), [])
+
+
+if __name__ == '__main__':
+    unittest.main()